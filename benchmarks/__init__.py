@@ -0,0 +1,4 @@
+"""
+Нагрузочные замеры API. Каждый модуль запускается отдельно (python -m benchmarks.<модуль>) и работает на временной
+тестовой базе, которая создается рядом с основной и удаляется после замера.
+"""
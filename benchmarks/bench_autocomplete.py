@@ -0,0 +1,64 @@
+"""
+Задержка подсказок goals/autocomplete по названиям целей и категорий: префикс, опечатка и короткий запрос.
+
+    python -m benchmarks.bench_autocomplete --goals 1000000
+"""
+from benchmarks.utils import (analyze, benchmark_database, get_parser, measure,
+                              print_table, save_results, setup_django)
+
+
+def run(goals: int, limit: int, repeat: int) -> list[dict]:
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from goals.dataset import seed_board, seed_user
+    from goals.models import Goal
+    from goals.views import AutocompleteView
+
+    user = seed_user('benchmark')
+    seed_board(user, categories=100, goals=goals)
+    analyze()
+
+    title = Goal.objects.order_by('id').values_list('title', flat=True)[goals // 2]
+    # Названия синтетических целей имеют вид 'Goal 000123456', поэтому префикс берется почти целиком
+    queries = {'prefix': title[:-2], 'typo': title[:5] + title[6:], 'short': title[:2], 'miss': 'zzzzzz'}
+
+    factory = APIRequestFactory()
+    view = AutocompleteView.as_view()
+
+    def request(params: dict):
+        def call():
+            req = factory.get('/goals/autocomplete', params)
+            force_authenticate(req, user)
+            response = view(req)
+            assert response.status_code == 200, response.data
+            response.render()
+        return call
+
+    results = []
+    for name, query in queries.items():
+        for kind in ('goal', 'category'):
+            timing = measure(request({'q': query, 'type': kind, 'limit': limit}), repeat)
+            results.append({'query': name, 'q': query, 'type': kind, 'timing': timing})
+    return results
+
+
+def main():
+    parser = get_parser(__doc__)
+    parser.add_argument('--goals', type=int, default=1_000_000)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database(keepdb=args.keepdb):
+        results = run(args.goals, args.limit, args.repeat)
+
+    print_table(
+        ['query', 'q', 'type', 'p50, ms', 'p95, ms', 'p99, ms'],
+        [[r['query'], r['q'], r['type'], r['timing']['p50'], r['timing']['p95'], r['timing']['p99']] for r in results],
+    )
+    save_results(args.output, 'autocomplete', vars(args) | {'output': str(args.output)}, results)
+
+
+if __name__ == '__main__':
+    main()
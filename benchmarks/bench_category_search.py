@@ -0,0 +1,74 @@
+"""
+Задержка goals/goal_category/list с поиском (?search=) и фильтрами по доске и автору на досках с десятками тысяч
+категорий.
+
+    python -m benchmarks.bench_category_search --boards 5 --categories 50000
+"""
+from benchmarks.utils import (analyze, benchmark_database, get_parser, measure,
+                              print_table, save_results, setup_django)
+
+
+def run(boards: int, categories: int, page_size: int, repeat: int) -> list[dict]:
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from goals.dataset import seed_board, seed_user
+    from goals.models import BoardParticipant
+    from goals.views import GoalCategoryListView
+
+    user = seed_user('benchmark')
+    board_ids = []
+    for i in range(boards):
+        owner = user if i == 0 else seed_user(f'benchmark-{i}')
+        board = seed_board(owner, categories=categories, goals=0, seed=i)
+        if owner != user:
+            BoardParticipant.objects.create(board=board, user=user, role=BoardParticipant.Role.reader)
+        board_ids.append(board.id)
+    analyze()
+
+    # Названия синтетических категорий имеют вид 'Category <номер>'
+    cases = {
+        'list': {},
+        'search (one match)': {'search': f'Category {categories - 1}'},
+        'search (many matches)': {'search': 'Category 1'},
+        'board': {'board': board_ids[-1]},
+        'user': {'user': user.id},
+        'board + search': {'board': board_ids[-1], 'search': f'Category {categories // 2}'},
+    }
+
+    factory = APIRequestFactory()
+    view = GoalCategoryListView.as_view()
+
+    def request(params: dict):
+        def call():
+            req = factory.get('/goals/goal_category/list', params | {'limit': page_size})
+            force_authenticate(req, user)
+            response = view(req)
+            assert response.status_code == 200, response.data
+            response.render()
+        return call
+
+    return [{'case': name, 'params': params, 'timing': measure(request(params), repeat)}
+            for name, params in cases.items()]
+
+
+def main():
+    parser = get_parser(__doc__)
+    parser.add_argument('--boards', type=int, default=5)
+    parser.add_argument('--categories', type=int, default=50_000, help='Число категорий в каждой доске')
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database(keepdb=args.keepdb):
+        results = run(args.boards, args.categories, args.page_size, args.repeat)
+
+    print_table(
+        ['case', 'p50, ms', 'p95, ms', 'p99, ms'],
+        [[r['case'], r['timing']['p50'], r['timing']['p95'], r['timing']['p99']] for r in results],
+    )
+    save_results(args.output, 'category_search', vars(args) | {'output': str(args.output)}, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,315 @@
+"""
+Задержка, пропускная способность и число запросов к БД для эндпоинтов goals/urls.py, core/urls.py и bot/urls.py.
+Запросы проходят через URL-маршрутизацию и middleware приложения (APIClient) на базе с синтетическими данными,
+Telegram Bot API заменяется локальной заглушкой (benchmarks.tg_stub), поэтому замер не требует сети.
+
+С --concurrency > 1 эндпоинты чтения дополнительно нагружаются несколькими потоками в течение --duration секунд.
+С --baseline результаты сравниваются с сохраненным ранее файлом --output.
+
+    python -m benchmarks.bench_endpoints --goals 100000 --output results/endpoints.json
+    python -m benchmarks.bench_endpoints --goals 100000 --baseline results/endpoints.json
+"""
+import json
+import statistics
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.utils import (analyze, benchmark_database, get_parser,
+                              print_table, save_results, setup_django)
+
+PASSWORD = 'Benchmark-password-1'  # noqa: S105
+
+
+def percentiles(timings: list[float]) -> dict[str, float]:
+    timings = sorted(timings)
+    return {
+        'p50': statistics.median(timings),
+        'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'p99': timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+        'max': timings[-1],
+    }
+
+
+def seed(goals: int, background_goals: int) -> dict:
+    """
+    Создает доску пользователя замера с goals целями и фоновый набор данных других пользователей, в части досок
+    которого пользователь замера - читатель. Возвращает объекты, на которые ссылаются сценарии.
+    """
+    from django.contrib.auth.hashers import make_password
+
+    from bot.models import TgUser
+    from core.models import User
+    from goals.dataset import DatasetGenerator, seed_board, seed_user
+    from goals.models import BoardParticipant, CascadeJob
+
+    user, password_user = seed_user('benchmark'), seed_user('benchmark-password')
+    user.password = password_user.password = make_password(PASSWORD)
+    User.objects.bulk_update([user, password_user], ['password'])
+    board = seed_board(user, categories=50, goals=goals, comments=goals)
+
+    generator = DatasetGenerator(seed=0)
+    generator.create_users(1000, prefix='benchmark-background-')
+    generator.create_boards(1000, categories=5, max_participants=50)
+    generator.create_goals(background_goals, comments_per_goal=1.0)
+    BoardParticipant.objects.bulk_create([
+        BoardParticipant(board_id=board_id, user=user, role=BoardParticipant.Role.reader)
+        for board_id, *_ in generator.boards[:20]
+    ])
+
+    member = seed_user('benchmark-member')
+    BoardParticipant.objects.create(board=board, user=member, role=BoardParticipant.Role.writer)
+    tg_user = TgUser.objects.create(chat_id=1, verification_code='benchmark')
+    analyze()
+
+    goal = board.goals.order_by('id').first()
+    return {
+        'user': user,
+        'password_user': password_user,
+        'board': board,
+        'category': board.categories.order_by('id').first(),
+        'goal': goal,
+        'goal_ids': list(board.goals.order_by('id').values_list('id', flat=True)[:50]),
+        'member': member,
+        'tg_user': tg_user,
+        'cascade': CascadeJob.objects.create(board=board, status=CascadeJob.Status.done),
+        'goals': goals,
+    }
+
+
+def get_cases(ctx: dict) -> list[dict]:
+    """
+    Сценарии замера: name, method, url, params или data (значение или функция номера итерации), expected - ожидаемый
+    статус ответа, anonymous - запрос без сессии, user - другой пользователь сессии, prepare - действие с клиентом
+    перед каждой итерацией вне замера.
+    """
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.urls import reverse
+    from django.utils import timezone
+
+    from goals import sync
+
+    board, category, goal = ctx['board'], ctx['category'], ctx['goal']
+    passwords = (PASSWORD, PASSWORD + '-new')
+    # Курсор синхронизации после заполнения базы: передаются только изменения, сделанные во время замера
+    sync_cursor = sync.encode_cursor(board.id, dict.fromkeys([*sync.SOURCES, sync.DELETED], (timezone.now(), 0)))
+    import_file = '\n'.join(json.dumps({'title': f'Imported {i}', 'category': category.id}) for i in range(20))
+
+    def login(client, i: int) -> None:
+        # Смена пароля сбрасывает сессию, поэтому пользователь входит заново перед каждой итерацией
+        ctx['password_user'].refresh_from_db(fields=('password',))
+        client.force_login(ctx['password_user'])
+
+    return [
+        # core
+        {'name': 'core: signup', 'method': 'post', 'url': reverse('core:signup'), 'anonymous': True, 'expected': 201,
+         'data': lambda i: {'username': f'signup-{time.time_ns()}-{i}', 'password': PASSWORD,
+                            'password_repeat': PASSWORD}},
+        {'name': 'core: login', 'method': 'post', 'url': reverse('core:login'), 'anonymous': True,
+         'data': {'username': ctx['user'].username, 'password': PASSWORD}},
+        {'name': 'core: profile', 'method': 'get', 'url': reverse('core:profile')},
+        {'name': 'core: update password', 'method': 'put', 'url': reverse('core:update-password'),
+         'user': ctx['password_user'], 'prepare': login,
+         'data': lambda i: {'old_password': passwords[i % 2], 'new_password': passwords[(i + 1) % 2]}},
+        # boards
+        {'name': 'board: create', 'method': 'post', 'url': reverse('goals:create-board'), 'expected': 201,
+         'data': {'title': 'Benchmark'}},
+        {'name': 'board: list', 'method': 'get', 'url': reverse('goals:list-boards')},
+        {'name': 'board: retrieve', 'method': 'get',
+         'url': reverse('goals:retrieve-update-destroy-boards', args=[board.id])},
+        {'name': 'board: changes', 'method': 'get', 'url': reverse('goals:board-changes', args=[board.id]),
+         'params': {'cursor': sync_cursor, 'limit': 100}},
+        {'name': 'board: stats', 'method': 'get', 'url': reverse('goals:board-stats', args=[board.id])},
+        {'name': 'board: participant', 'method': 'get',
+         'url': reverse('goals:participant', args=[board.id, ctx['member'].username])},
+        {'name': 'board: cascade status', 'method': 'get', 'url': reverse('goals:cascade', args=[ctx['cascade'].id])},
+        # categories
+        {'name': 'category: create', 'method': 'post', 'url': reverse('goals:create-category'), 'expected': 201,
+         'data': {'title': 'Benchmark', 'board': board.id}},
+        {'name': 'category: list by board', 'method': 'get', 'url': reverse('goals:list-categories'),
+         'params': {'board': board.id}},
+        {'name': 'category: search', 'method': 'get', 'url': reverse('goals:list-categories'),
+         'params': {'search': 'Category 1'}},
+        {'name': 'category: retrieve', 'method': 'get', 'url': reverse('goals:category', args=[category.id])},
+        # goals
+        {'name': 'goal: create', 'method': 'post', 'url': reverse('goals:create-goal'), 'expected': 201,
+         'data': {'title': 'Benchmark', 'category': category.id}},
+        {'name': 'goal: list', 'method': 'get', 'url': reverse('goals:list-goals'), 'params': {'limit': 50}},
+        {'name': 'goal: list deep offset', 'method': 'get', 'url': reverse('goals:list-goals'),
+         'params': {'limit': 50, 'offset': int(ctx['goals'] * 0.9)}},
+        {'name': 'goal: list cursor', 'method': 'get', 'url': reverse('goals:list-goals'),
+         'params': {'limit': 50, 'cursor': ''}},
+        {'name': 'goal: list filtered', 'method': 'get', 'url': reverse('goals:list-goals'),
+         'params': {'limit': 50, 'category': category.id, 'priority__in': '3,4'}},
+        {'name': 'goal: search', 'method': 'get', 'url': reverse('goals:list-goals'),
+         'params': {'limit': 50, 'search': 'goal'}},
+        {'name': 'goal: retrieve', 'method': 'get', 'url': reverse('goals:goal', args=[goal.id])},
+        {'name': 'goal: update', 'method': 'patch', 'url': reverse('goals:goal', args=[goal.id]),
+         'data': lambda i: {'title': f'Renamed {i}'}},
+        {'name': 'goal: bulk update 50', 'method': 'post', 'url': reverse('goals:bulk-goals'),
+         'data': lambda i: {'operations': [{'op': 'update', 'id': goal_id, 'data': {'priority': i % 4 + 1}}
+                                           for goal_id in ctx['goal_ids']]}},
+        {'name': 'goal: autocomplete', 'method': 'get', 'url': reverse('goals:autocomplete'), 'params': {'q': 'goal 00'}},
+        {'name': 'goal: export category', 'method': 'get', 'url': reverse('goals:export-goals'),
+         'params': {'category': category.id, 'comments': 'true'}},
+        {'name': 'goal: import 20', 'method': 'post', 'url': reverse('goals:import-goals'), 'expected': 201,
+         'format': 'multipart',
+         'data': lambda i: {'file': SimpleUploadedFile('goals.ndjson', import_file.encode())}},
+        # comments
+        {'name': 'comment: create', 'method': 'post', 'url': reverse('goals:create-comment'), 'expected': 201,
+         'data': {'goal': goal.id, 'text': 'Benchmark'}},
+        {'name': 'comment: list by goal', 'method': 'get', 'url': reverse('goals:list-comment'),
+         'params': {'goal': goal.id}},
+        # bot
+        {'name': 'bot: verify', 'method': 'patch', 'url': reverse('bot:verify-user'),
+         'data': {'verification_code': ctx['tg_user'].verification_code}},
+    ]
+
+
+def make_client(ctx: dict, case: dict):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    if not case.get('anonymous'):
+        client.force_login(case.get('user', ctx['user']))
+    return client
+
+
+def call(client, case: dict, i: int):
+    method, data = case['method'], case.get('data', case.get('params'))
+    data = data(i) if callable(data) else data
+    if method == 'get':
+        response = client.get(case['url'], data)
+    else:
+        response = getattr(client, method)(case['url'], data, format=case.get('format', 'json'))
+    if response.streaming:
+        b''.join(response.streaming_content)
+    expected = case.get('expected', 200)
+    assert response.status_code == expected, f'{case["name"]}: {response.status_code} {response.content[:300]}'
+    return response
+
+
+def measure_case(ctx: dict, case: dict, repeat: int, warmup: int = 2) -> dict:
+    """
+    Выполняет сценарий последовательно и возвращает перцентили задержки, пропускную способность одного потока и
+    среднее число запросов к БД на один HTTP-запрос.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    client = make_client(ctx, case)
+    timings, queries = [], []
+    for i in range(warmup + repeat):
+        if case.get('prepare'):
+            case['prepare'](client, i)
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            call(client, case, i)
+            elapsed = (time.perf_counter() - start) * 1000
+        if i >= warmup:
+            timings.append(elapsed)
+            queries.append(len(captured))
+
+    return {
+        'case': case['name'],
+        'method': case['method'].upper(),
+        'url': case['url'],
+        'latency_ms': percentiles(timings),
+        'rps': 1000 * len(timings) / sum(timings),
+        'queries': statistics.mean(queries),
+    }
+
+
+def load_case(ctx: dict, case: dict, concurrency: int, duration: float) -> dict:
+    """
+    Нагружает эндпоинт concurrency потоками в течение duration секунд, каждый поток со своим клиентом и
+    соединением с БД.
+    """
+    from django.db import connection
+
+    timings, errors, lock = [], [], threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        client, local = make_client(ctx, case), []
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                call(client, case, len(local))
+                local.append((time.perf_counter() - start) * 1000)
+        except AssertionError as error:
+            errors.append(str(error))
+        finally:
+            connection.close()
+            with lock:
+                timings.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors[0]
+    return {'latency_ms': percentiles(timings), 'rps': len(timings) / duration}
+
+
+def run(ctx: dict, repeat: int, concurrency: int, duration: float) -> list[dict]:
+    from django.test.utils import override_settings
+
+    from benchmarks.tg_stub import tg_stub
+
+    results = []
+    with tg_stub() as stub, override_settings(TG_API_URL=stub.url):
+        for case in get_cases(ctx):
+            result = measure_case(ctx, case, repeat)
+            if concurrency > 1 and case['method'] == 'get':
+                result['load'] = {'concurrency': concurrency, **load_case(ctx, case, concurrency, duration)}
+            results.append(result)
+    return results
+
+
+def compare(results: list[dict], baseline: Path) -> None:
+    """
+    Печатает изменение p50 и числа запросов к БД относительно сохраненных результатов.
+    """
+    previous = {result['case']: result for result in json.loads(baseline.read_text())['results']}
+    rows = []
+    for result in results:
+        old = previous.get(result['case'])
+        if old is None:
+            continue
+        p50, old_p50 = result['latency_ms']['p50'], old['latency_ms']['p50']
+        rows.append([result['case'], old_p50, p50, f'{(p50 - old_p50) / old_p50:+.0%}', old['queries'],
+                     result['queries']])
+    print_table(['case', 'baseline p50, ms', 'p50, ms', 'change', 'baseline queries', 'queries'], rows)
+
+
+def main():
+    parser = get_parser(__doc__)
+    parser.add_argument('--goals', type=int, default=100_000, help='Число целей в доске пользователя замера')
+    parser.add_argument('--background-goals', type=int, default=100_000, help='Число целей в досках других пользователей')
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--duration', type=float, default=10.0, help='Длительность нагрузки на эндпоинт, секунд')
+    parser.add_argument('--baseline', type=Path, help='Файл результатов предыдущего запуска для сравнения')
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database(keepdb=args.keepdb):
+        ctx = seed(args.goals, args.background_goals)
+        results = run(ctx, args.repeat, args.concurrency, args.duration)
+
+    print_table(
+        ['case', 'p50, ms', 'p95, ms', 'p99, ms', 'rps', 'queries', 'load rps', 'load p95, ms'],
+        [[r['case'], r['latency_ms']['p50'], r['latency_ms']['p95'], r['latency_ms']['p99'], r['rps'], r['queries'],
+          r['load']['rps'] if 'load' in r else '', r['load']['latency_ms']['p95'] if 'load' in r else '']
+         for r in results],
+    )
+    if args.baseline:
+        compare(results, args.baseline)
+    save_results(args.output, 'endpoints', vars(args) | {'output': str(args.output), 'baseline': str(args.baseline)},
+                 results)
+
+
+if __name__ == '__main__':
+    main()
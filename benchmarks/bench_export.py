@@ -0,0 +1,96 @@
+"""
+Время и пиковая память выгрузки всех целей доски потоком (goals/goal/export) в сравнении с обходом
+goals/goal/list по страницам.
+
+    python -m benchmarks.bench_export --goals 200000 --comments 200000
+"""
+import time
+import tracemalloc
+from collections.abc import Callable
+from functools import partial
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.utils import (analyze, benchmark_database, get_parser,
+                              print_table, save_results, setup_django)
+
+
+def trace(func: Callable[[], int]) -> dict[str, float]:
+    """
+    Выполняет func и возвращает время в секундах, пиковую память Python в МБ и объем ответа в МБ.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = func()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': seconds, 'peak_mb': peak / 2 ** 20, 'size_mb': size / 2 ** 20}
+
+
+def export(user, params: dict) -> int:
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from goals.views import GoalExportView
+
+    request = APIRequestFactory().get('/goals/goal/export', params)
+    force_authenticate(request, user)
+    response = GoalExportView.as_view()(request)
+    assert response.status_code == 200
+    return sum(len(block) for block in response.streaming_content)
+
+
+def paginate(user, page_size: int) -> int:
+    """
+    Обходит goals/goal/list по курсору до последней страницы и возвращает суммарный объем ответов.
+    """
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from goals.views import GoalListView
+
+    size, params = 0, {'ordering': 'created', 'limit': page_size, 'cursor': ''}
+    while params:
+        request = APIRequestFactory().get('/goals/goal/list', params)
+        force_authenticate(request, user)
+        response = GoalListView.as_view()(request)
+        assert response.status_code == 200, response.data
+        size += len(response.render().content)
+        params = parse_qs(urlsplit(response.data['next']).query) if response.data['next'] else None
+    return size
+
+
+def run(goals: int, comments: int, page_size: int) -> list[dict]:
+    from goals.dataset import seed_board, seed_user
+
+    user = seed_user('benchmark')
+    seed_board(user, categories=100, goals=goals, comments=comments)
+    analyze()
+
+    cases = {
+        'export ndjson': partial(export, user, {}),
+        'export csv': partial(export, user, {'file_format': 'csv'}),
+        'export ndjson + comments': partial(export, user, {'comments': 'true'}),
+        f'list pages of {page_size}': partial(paginate, user, page_size),
+    }
+    return [{'case': name, **trace(func)} for name, func in cases.items()]
+
+
+def main():
+    parser = get_parser(__doc__)
+    parser.add_argument('--goals', type=int, default=200_000)
+    parser.add_argument('--comments', type=int, default=200_000)
+    parser.add_argument('--page-size', type=int, default=100)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database(keepdb=args.keepdb):
+        results = run(args.goals, args.comments, args.page_size)
+
+    print_table(
+        ['case', 'seconds', 'peak, MB', 'size, MB'],
+        [[r['case'], r['seconds'], r['peak_mb'], r['size_mb']] for r in results],
+    )
+    save_results(args.output, 'export', vars(args) | {'output': str(args.output)}, results)
+
+
+if __name__ == '__main__':
+    main()
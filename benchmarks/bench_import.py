@@ -0,0 +1,76 @@
+"""
+Скорость импорта целей с комментариями через goals.importer (COPY FROM STDIN) в сравнении с созданием целей по одной
+через GoalCreateSerializer.
+
+    python -m benchmarks.bench_import --goals 100000 --comments-per-goal 1
+"""
+import json
+import time
+
+from benchmarks.utils import (benchmark_database, get_parser, print_table,
+                              save_results, setup_django)
+
+
+def make_lines(category_id: int, goals: int, comments: int) -> list[str]:
+    return [
+        json.dumps({
+            'title': f'Imported goal {i}',
+            'description': 'x' * (i % 200),
+            'category': category_id,
+            'priority': i % 4 + 1,
+            'comments': [{'text': f'Comment {j}'} for j in range(comments)],
+        }) + '\n'
+        for i in range(goals)
+    ]
+
+
+def run(goals: int, comments: int, serializer_goals: int) -> list[dict]:
+    from rest_framework.test import APIRequestFactory
+
+    from goals.dataset import seed_board, seed_user
+    from goals.importer import import_goals, read_records
+    from goals.serializers import GoalCreateSerializer
+
+    user = seed_user('benchmark')
+    category = seed_board(user, categories=1, goals=0).categories.get()
+    lines = make_lines(category.id, goals, comments)
+
+    result = import_goals(user, read_records(lines, 'ndjson'))
+    assert not result['errors'], result['errors'][:5]
+    results = [{'case': 'import_goals (COPY)', 'rows': result['goals'] + result['comments'],
+                'seconds': result['seconds'], 'rows_per_second': result['rows_per_second']}]
+
+    request = APIRequestFactory().post('/goals/goal/create')
+    request.user = user
+    start = time.perf_counter()
+    for line in lines[:serializer_goals]:
+        serializer = GoalCreateSerializer(data=json.loads(line), context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+    seconds = time.perf_counter() - start
+    results.append({'case': 'GoalCreateSerializer', 'rows': serializer_goals, 'seconds': seconds,
+                    'rows_per_second': round(serializer_goals / seconds)})
+    return results
+
+
+def main():
+    parser = get_parser(__doc__)
+    parser.add_argument('--goals', type=int, default=100_000)
+    parser.add_argument('--comments-per-goal', type=int, default=1)
+    parser.add_argument('--serializer-goals', type=int, default=2000,
+                        help='Число целей для замера создания по одной')
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database(keepdb=args.keepdb):
+        results = run(args.goals, args.comments_per_goal, args.serializer_goals)
+
+    print_table(
+        ['case', 'rows', 'seconds', 'rows/s'],
+        [[r['case'], r['rows'], r['seconds'], r['rows_per_second']] for r in results],
+    )
+    save_results(args.output, 'import', vars(args) | {'output': str(args.output)}, results)
+
+
+if __name__ == '__main__':
+    main()
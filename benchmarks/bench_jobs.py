@@ -0,0 +1,81 @@
+"""
+Пропускная способность очереди jobs: N исполнителей в отдельных процессах разбирают заранее поставленные задачи.
+Задача по умолчанию пустая (накладные расходы очереди), --work-ms добавляет имитацию работы обработчика.
+
+    python -m benchmarks.bench_jobs --jobs 20000 --workers 1 2 4 8
+"""
+import multiprocessing
+import time
+
+from benchmarks.utils import (benchmark_database, get_parser, print_table,
+                              save_results, setup_django)
+
+WORK_SECONDS = 0.0
+
+
+def noop() -> None:
+    if WORK_SECONDS:
+        time.sleep(WORK_SECONDS)
+
+
+def work(worker: str) -> None:
+    from jobs import pgqueue
+
+    while pgqueue.run(pgqueue.claim(worker)):
+        pass
+
+
+def run(jobs: int, workers: list[int]) -> list[dict]:
+    from django.db import connection
+
+    from jobs import pgqueue
+    from jobs.models import Job
+
+    pgqueue.task('benchmarks.noop')(noop)
+    results = []
+    for count in workers:
+        Job.objects.all().delete()
+        Job.objects.bulk_create([Job(name='benchmarks.noop') for _ in range(jobs)])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE jobs_job')
+        # Дочерние процессы открывают собственные соединения
+        connection.close()
+
+        start = time.perf_counter()
+        processes = [multiprocessing.Process(target=work, args=(f'bench-{i}',)) for i in range(count)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        done = Job.objects.filter(status=Job.Status.done).count()
+        assert done == jobs, f'{done} of {jobs} jobs done'
+        results.append({'workers': count, 'jobs': jobs, 'seconds': elapsed, 'jobs_per_second': jobs / elapsed})
+    return results
+
+
+def main():
+    global WORK_SECONDS  # noqa: PLW0603
+
+    parser = get_parser(__doc__)
+    parser.add_argument('--jobs', type=int, default=20_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--work-ms', type=float, default=0.0, help='Время работы одной задачи, мс')
+    args = parser.parse_args()
+    WORK_SECONDS = args.work_ms / 1000
+
+    multiprocessing.set_start_method('fork')
+    setup_django()
+    with benchmark_database(keepdb=args.keepdb):
+        results = run(args.jobs, args.workers)
+
+    print_table(
+        ['workers', 'jobs', 'seconds', 'jobs/s'],
+        [[r['workers'], r['jobs'], r['seconds'], r['jobs_per_second']] for r in results],
+    )
+    save_results(args.output, 'jobs', vars(args) | {'output': str(args.output)}, results)
+
+
+if __name__ == '__main__':
+    main()
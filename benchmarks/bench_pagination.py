@@ -0,0 +1,78 @@
+"""
+Сравнение задержки страницы goals/goal/list в режимах limit/offset и cursor на разной глубине выдачи.
+
+    python -m benchmarks.bench_pagination --goals 1000000
+"""
+import json
+from base64 import urlsafe_b64encode
+
+from benchmarks.utils import (analyze, benchmark_database, get_parser, measure,
+                              print_table, save_results, setup_django)
+
+DEPTHS = (0, 0.01, 0.1, 0.5, 0.9, 0.99)
+
+
+def encode_position(title: str, goal_id: int) -> str:
+    # Формат курсора KeysetPagination: [reverse, [значения полей сортировки..., id]]
+    return urlsafe_b64encode(json.dumps([0, [title, goal_id]]).encode('ascii')).decode('ascii')
+
+
+def run(goals: int, page_size: int, repeat: int) -> list[dict]:
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from goals.dataset import seed_board, seed_user
+    from goals.models import Goal
+    from goals.views import GoalListView
+
+    user = seed_user('benchmark')
+    seed_board(user, categories=100, goals=goals)
+    analyze()
+
+    factory = APIRequestFactory()
+    view = GoalListView.as_view()
+
+    def request(params: dict):
+        def call():
+            req = factory.get('/goals/goal/list', params)
+            force_authenticate(req, user)
+            response = view(req)
+            assert response.status_code == 200, response.data
+            response.render()
+        return call
+
+    results = []
+    ordered = Goal.objects.order_by('title', 'id').values_list('title', 'id')
+    for depth in DEPTHS:
+        offset = int(goals * depth)
+        offset_timing = measure(request({'limit': page_size, 'offset': offset}), repeat)
+        if offset:
+            title, goal_id = ordered[offset - 1]
+            cursor = encode_position(title, goal_id)
+        else:
+            cursor = ''
+        cursor_timing = measure(request({'limit': page_size, 'cursor': cursor}), repeat)
+        results.append({'depth': depth, 'offset': offset, 'limit_offset': offset_timing, 'cursor': cursor_timing})
+    return results
+
+
+def main():
+    parser = get_parser(__doc__)
+    parser.add_argument('--goals', type=int, default=1_000_000)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database(keepdb=args.keepdb):
+        results = run(args.goals, args.page_size, args.repeat)
+
+    print_table(
+        ['offset', 'limit/offset p50, ms', 'p95, ms', 'cursor p50, ms', 'p95, ms'],
+        [[r['offset'], r['limit_offset']['p50'], r['limit_offset']['p95'], r['cursor']['p50'], r['cursor']['p95']]
+         for r in results],
+    )
+    save_results(args.output, 'pagination', vars(args) | {'output': str(args.output)}, results)
+
+
+if __name__ == '__main__':
+    main()
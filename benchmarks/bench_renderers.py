@@ -0,0 +1,65 @@
+"""
+Скорость вывода и разбора JSON: rest_framework JSONRenderer/JSONParser в сравнении с core.renderers.FastJSONRenderer и
+core.parsers.FastJSONParser на страницах списка целей разного размера (данные страницы готовятся заранее, замеряется
+только преобразование в байты и обратно).
+
+    python -m benchmarks.bench_renderers --page-size 100 1000 10000
+"""
+import io
+from functools import partial
+
+from benchmarks.bench_serializers import cpu_time
+from benchmarks.utils import (benchmark_database, get_parser, print_table,
+                              save_results, setup_django)
+
+
+def run(page_sizes: list[int], repeat: int) -> list[dict]:
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from core.parsers import FastJSONParser
+    from core.renderers import FastJSONRenderer
+    from goals.dataset import seed_board, seed_user
+    from goals.models import Goal
+    from goals.serializers import GoalValuesSerializer
+
+    seed_board(seed_user('benchmark'), categories=10, goals=max(page_sizes))
+    values_serializer = GoalValuesSerializer()
+    results = []
+    for page_size in page_sizes:
+        queryset = values_serializer.get_queryset(Goal.objects.order_by('id')[:page_size])
+        data = {'count': page_size, 'next': None, 'previous': None,
+                'results': values_serializer.to_representation(list(queryset))}
+        body = JSONRenderer().render(data)
+        timings = {
+            ('render', 'JSONRenderer'): partial(JSONRenderer().render, data),
+            ('render', 'FastJSONRenderer'): partial(FastJSONRenderer().render, data),
+            ('parse', 'JSONParser'): lambda: JSONParser().parse(io.BytesIO(body)),
+            ('parse', 'FastJSONParser'): lambda: FastJSONParser().parse(io.BytesIO(body)),
+        }
+        for (operation, name), func in timings.items():
+            timing = cpu_time(func, repeat)
+            results.append({'page_size': page_size, 'operation': operation, 'class': name, 'bytes': len(body),
+                            **timing, 'mb_per_s': len(body) / timing['cpu_ms'] / 1000})
+    return results
+
+
+def main():
+    parser = get_parser(__doc__)
+    parser.add_argument('--page-size', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database(keepdb=args.keepdb):
+        results = run(args.page_size, args.repeat)
+
+    print_table(
+        ['page size', 'operation', 'class', 'bytes', 'cpu, ms', 'MB/s'],
+        [[r['page_size'], r['operation'], r['class'], r['bytes'], r['cpu_ms'], r['mb_per_s']] for r in results],
+    )
+    save_results(args.output, 'renderers', vars(args) | {'output': str(args.output)}, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Процессорное время построения страницы списка: выборка записей и сериализация через ModelSerializer в сравнении с
+выборкой через values() и goals.values.ValuesSerializer. Страница содержит --page-size целей, комментариев или
+категорий разных авторов.
+
+    python -m benchmarks.bench_serializers --page-size 1000 --users 50
+"""
+import statistics
+import time
+from collections.abc import Callable
+from functools import partial
+
+from benchmarks.utils import (benchmark_database, get_parser, print_table,
+                              save_results, setup_django)
+
+
+def cpu_time(func: Callable[[], object], repeat: int, warmup: int = 2) -> dict[str, float]:
+    """
+    Возвращает медиану процессорного и полного времени выполнения func в миллисекундах.
+    """
+    for _ in range(warmup):
+        func()
+    cpu, wall = [], []
+    for _ in range(repeat):
+        start_cpu, start_wall = time.process_time(), time.perf_counter()
+        func()
+        cpu.append((time.process_time() - start_cpu) * 1000)
+        wall.append((time.perf_counter() - start_wall) * 1000)
+    return {'cpu_ms': statistics.median(cpu), 'wall_ms': statistics.median(wall)}
+
+
+def model_page(queryset, serializer_class) -> list:
+    return serializer_class(list(queryset), many=True).data
+
+
+def values_page(queryset, values_serializer_class) -> list:
+    values_serializer = values_serializer_class()
+    return values_serializer.to_representation(list(values_serializer.get_queryset(queryset)))
+
+
+def seed(page_size: int, users: int) -> None:
+    from goals.dataset import seed_board, seed_user
+    from goals.models import Goal, GoalCategory, GoalComment
+
+    authors = [seed_user(f'benchmark-{i}') for i in range(users)]
+    board = seed_board(authors[0], categories=page_size, goals=page_size)
+    goals = list(Goal.objects.filter(board=board))
+    GoalComment.objects.bulk_create([
+        GoalComment(goal=goal, board=board, user=authors[index % users], text='x' * (index % 200))
+        for index, goal in enumerate(goals)
+    ])
+    categories = list(GoalCategory.objects.filter(board=board))
+    for index, category in enumerate(categories):
+        category.user = authors[index % users]
+    GoalCategory.objects.bulk_update(categories, ['user'])
+
+
+def run(page_size: int, users: int, repeat: int) -> list[dict]:
+    from goals.models import Goal, GoalCategory, GoalComment
+    from goals.serializers import (GoalCategorySerializer,
+                                   GoalCategoryValuesSerializer,
+                                   GoalCommentSerializer,
+                                   GoalCommentValuesSerializer, GoalSerializer,
+                                   GoalValuesSerializer)
+
+    seed(page_size, users)
+    lists = {
+        'goals': (Goal.objects.order_by('id')[:page_size], GoalSerializer, GoalValuesSerializer),
+        'comments': (GoalComment.objects.select_related('user').order_by('id')[:page_size], GoalCommentSerializer,
+                     GoalCommentValuesSerializer),
+        'categories': (GoalCategory.objects.select_related('user').order_by('id')[:page_size],
+                       GoalCategorySerializer, GoalCategoryValuesSerializer),
+    }
+    results = []
+    for name, (queryset, serializer_class, values_serializer_class) in lists.items():
+        model = cpu_time(partial(model_page, queryset, serializer_class), repeat)
+        values = cpu_time(partial(values_page, queryset, values_serializer_class), repeat)
+        results.append({'list': name, 'serializer': 'ModelSerializer', **model})
+        results.append({'list': name, 'serializer': 'ValuesSerializer', **values,
+                        'cpu_speedup': model['cpu_ms'] / values['cpu_ms']})
+    return results
+
+
+def main():
+    parser = get_parser(__doc__)
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--users', type=int, default=50, help='Число разных авторов на странице')
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database(keepdb=args.keepdb):
+        results = run(args.page_size, args.users, args.repeat)
+
+    print_table(
+        ['list', 'serializer', 'cpu, ms', 'wall, ms', 'cpu speedup'],
+        [[r['list'], r['serializer'], r['cpu_ms'], r['wall_ms'], r.get('cpu_speedup', '')] for r in results],
+    )
+    save_results(args.output, 'serializers', vars(args) | {'output': str(args.output)}, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Локальная заглушка Telegram Bot API для замеров и тестов без сети: отвечает на sendMessage и getUpdates в формате
+bot.tg.schemas. Адрес заглушки передается приложению настройкой TG_API_URL.
+"""
+import json
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class TgStubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):  # noqa: N802
+        url = urlsplit(self.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        method = url.path.rsplit('/', 1)[-1]
+        self.server.calls.append((method, params))
+
+        if method == 'sendMessage':
+            body = {'ok': True, 'result': {'chat': {'id': int(params['chat_id'])}, 'text': params.get('text')}}
+        elif method == 'getUpdates':
+            body = {'ok': True, 'result': []}
+        else:
+            body = {'ok': False, 'description': 'Not Found'}
+        content = json.dumps(body).encode()
+
+        self.send_response(200 if body['ok'] else 404)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def tg_stub() -> Iterator[ThreadingHTTPServer]:
+    """
+    Запускает заглушку на свободном порту 127.0.0.1 в фоновом потоке. Адрес - server.url, вызовы API сохраняются в
+    server.calls в виде пар (метод, параметры).
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), TgStubHandler)
+    server.calls = []
+    server.url = f'http://127.0.0.1:{server.server_port}'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
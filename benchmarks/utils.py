@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import statistics
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import django
+
+
+def setup_django() -> None:
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todolist.settings')
+    django.setup()
+
+
+def get_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--keepdb', action='store_true', help='Не удалять тестовую базу после замера')
+    parser.add_argument('--output', type=Path, help='Сохранить результаты в JSON-файл')
+    return parser
+
+
+@contextmanager
+def benchmark_database(keepdb: bool = False) -> Iterator[None]:
+    """
+    Создает тестовую базу (test_<имя основной базы>) с примененными миграциями и переключает на нее соединение.
+    С keepdb=True база и данные в ней сохраняются между запусками.
+    """
+    from django.db import connection
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+def analyze() -> None:
+    """
+    Обновляет статистику планировщика после массовой вставки данных.
+    """
+    from django.db import connection
+
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+
+def measure(func: Callable[[], object], repeat: int, warmup: int = 2) -> dict[str, float]:
+    """
+    Выполняет func warmup + repeat раз и возвращает перцентили времени выполнения в миллисекундах.
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return {
+        'p50': statistics.median(timings),
+        'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'p99': timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+        'max': timings[-1],
+    }
+
+
+def print_table(header: list[str], rows: list[list]) -> None:
+    rows = [[f'{value:.2f}' if isinstance(value, float) else str(value) for value in row] for row in rows]
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+    for row in [header, *rows]:
+        print('  '.join(str(cell).rjust(width) for cell, width in zip(row, widths)))  # noqa: T201
+
+
+def save_results(path: Path | None, name: str, params: dict, results: list[dict]) -> None:
+    if path is None:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        'benchmark': name,
+        'timestamp': time.time(),
+        'params': params,
+        'results': results,
+    }, ensure_ascii=False, indent=2))
@@ -1,11 +1,13 @@
 import logging
 
+from django.conf import settings
 from django.core.management import BaseCommand
 
 from bot.models import TgUser
 from bot.tg.client import TgClient
 from bot.tg.schemas import Message
-from goals.models import Goal, GoalCategory
+from core import metrics
+from goals.models import BoardParticipant, CascadeJob, Goal, GoalCategory
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +30,8 @@ class Command(BaseCommand):
         Returns:
             None
         """
+        if settings.BOT_METRICS_PORT:
+            metrics.serve(settings.BOT_METRICS_PORT, settings.BOT_METRICS_HOST)
         logger.info('Bot starts handling')
         while True:
             res = self.tg_client.get_updates(offset=self.offset)
@@ -101,11 +105,14 @@ class Command(BaseCommand):
         Returns:
             None
         """
-        goals = Goal.objects.filter(
-            category__board__participants__user_id=tg_user.user.id,
-            category__is_deleted=False,
+        goals = Goal.objects.select_related('category__user').filter(
+            board_id__in=BoardParticipant.objects.filter(user_id=tg_user.user.id, board__is_deleted=False).values(
+                'board_id'
+            ),
         ).exclude(
             status=Goal.Status.archived
+        ).exclude(
+            category_id__in=CascadeJob.get_pending_category_ids()
         )
         if goals:
             response_list = [f'- {goal.title} (category: {goal.category}, '
@@ -127,6 +134,7 @@ class Command(BaseCommand):
         """
         categories = GoalCategory.objects.filter(
             board__participants__user_id=tg_user.user.id,
+            board__is_deleted=False,
             is_deleted=False
         )
 
@@ -0,0 +1,6 @@
+from core.metrics import Counter, Histogram
+
+BOT_UPDATES = Counter('bot_updates_total', 'Telegram updates received')
+BOT_UPDATE_LAG = Histogram('bot_update_lag_seconds', 'Time from a Telegram message to its receipt by the bot',
+                           buckets=(0.25, 0.5, 1, 2, 5, 10, 30, 60, 300))
+BOT_REQUEST_DURATION = Histogram('bot_api_request_duration_seconds', 'Telegram Bot API request duration', ['method'])
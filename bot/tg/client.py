@@ -1,8 +1,10 @@
+import time
 from enum import Enum
 
 import requests
 from django.conf import settings
 
+from bot.metrics import BOT_REQUEST_DURATION, BOT_UPDATE_LAG, BOT_UPDATES
 from bot.tg.schemas import GetUpdatesResponse, SendMessageResponse
 
 
@@ -16,11 +18,17 @@ class TgClient:
         self.token = token if token else settings.BOT_TOKEN
 
     def get_url(self, method: str) -> str:
-        return f'https://api.telegram.org/bot{self.token}/{method}'
+        return f'{settings.TG_API_URL}/bot{self.token}/{method}'
 
     def get_updates(self, offset: int = 0, timeout: int = 60) -> GetUpdatesResponse:
         data = self._get(Command.GET_UPDATES, offset=offset, timeout=timeout)
-        return GetUpdatesResponse(**data)
+        response = GetUpdatesResponse(**data)
+        now = time.time()
+        for item in response.result:
+            BOT_UPDATES.inc()
+            if item.message.date:
+                BOT_UPDATE_LAG.observe(max(now - item.message.date, 0))
+        return response
 
     def send_message(self, chat_id: int, text: str) -> SendMessageResponse:
         data = self._get(Command.SEND_MESSAGE, chat_id=chat_id, text=text)
@@ -28,7 +36,9 @@ class TgClient:
 
     def _get(self, command: Command, **params) -> dict:
         url = self.get_url(command.value)
+        start = time.perf_counter()
         response = requests.get(url, params=params)
+        BOT_REQUEST_DURATION.observe(time.perf_counter() - start, method=command.value)
         # if not response.ok:
         #     print(response.json())
         #     raise ValueError
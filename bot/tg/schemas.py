@@ -7,6 +7,7 @@ class Chat(BaseModel):
 
 class Message(BaseModel):
     chat: Chat
+    date: int | None = None
     text: str | None = None
 
 
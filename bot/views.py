@@ -13,6 +13,7 @@ class VerificationView(GenericAPIView):
     Интерфейс для привязки бота к пользователю.
     """
     model = TgUser
+    query_budget = 4
     permission_classes = [IsAuthenticated]
     serializer_class = TgUserSerializer
 
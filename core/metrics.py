@@ -0,0 +1,318 @@
+"""
+Метрики процесса в текстовом формате Prometheus без внешних зависимостей и коллекторов.
+
+Счетчики (Counter), значения (Gauge) и гистограммы (Histogram) хранятся в памяти процесса в реестре REGISTRY.
+API отдает их по адресу /metrics (core.views.metrics), бот - собственным HTTP-сервером (serve).
+
+Gunicorn запускает несколько рабочих процессов, и запрос /metrics попадает в один из них. Если задан каталог
+METRICS_DIR, каждый процесс не реже раза в METRICS_FLUSH_INTERVAL секунд сохраняет свои метрики в файл <pid>.json,
+а /metrics складывает счетчики и гистограммы всех файлов; значения Gauge выводятся с меткой pid только для живых
+процессов. Каталог нужно очищать при перезапуске сервиса.
+"""
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Образец метрики: (суффикс имени, метки, значение)
+Sample = tuple[str, tuple[tuple[str, str], ...], float]
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (), registry: 'Registry | None' = None):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def _get_key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def _zero(self) -> list[float]:
+        return [0.0]
+
+    def _update(self, labels: dict, func: Callable[[list[float]], None]) -> None:
+        key = self._get_key(labels)
+        with self._lock:
+            func(self._values.setdefault(key, self._zero()))
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._get_key(labels), self._zero())[0]
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            values = [(key, list(value)) for key, value in self._values.items()]
+        for key, value in values:
+            yield '', tuple(zip(self.labels, key)), value[0]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        self._update(labels, lambda value: value.__setitem__(0, value[0] + amount))
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, amount: float, **labels) -> None:
+        self._update(labels, lambda value: value.__setitem__(0, amount))
+
+
+class Histogram(Metric):
+    """
+    Гистограмма с накопительными корзинами le, суммой и числом наблюдений. Значение по набору меток хранится списком:
+    счетчики корзин (последняя - +Inf), сумма.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS,
+                 registry: 'Registry | None' = None):
+        self.buckets = (*sorted(buckets), math.inf)
+        super().__init__(name, documentation, labels, registry)
+
+    def _zero(self) -> list[float]:
+        return [0.0] * (len(self.buckets) + 1)
+
+    def observe(self, amount: float, **labels) -> None:
+        def update(value: list[float]):
+            for index, bound in enumerate(self.buckets):
+                if amount <= bound:
+                    value[index] += 1
+            value[-1] += amount
+
+        self._update(labels, update)
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            values = [(key, list(value)) for key, value in self._values.items()]
+        for key, value in values:
+            labels = tuple(zip(self.labels, key))
+            for bound, count in zip(self.buckets, value):
+                yield '_bucket', (*labels, ('le', _format_value(bound))), count
+            yield '_sum', labels, value[-1]
+            yield '_count', labels, value[-2]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self.last_flush = 0.0
+
+    def register(self, metric: Metric) -> None:
+        self.metrics[metric.name] = metric
+
+    def collect(self) -> dict[str, dict]:
+        """
+        Возвращает метрики в виде, пригодном для JSON: {имя: {kind, documentation, samples}}.
+        """
+        return {
+            metric.name: {'kind': metric.kind, 'documentation': metric.documentation, 'samples': list(metric.samples())}
+            for metric in self.metrics.values()
+        }
+
+    def maybe_flush(self) -> None:
+        """
+        Сохраняет метрики процесса в METRICS_DIR, если с прошлого сохранения прошло METRICS_FLUSH_INTERVAL секунд.
+        """
+        if settings.METRICS_DIR and time.monotonic() - self.last_flush >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        self.last_flush = time.monotonic()
+        directory = Path(settings.METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{os.getpid()}.json'
+        temp = path.with_suffix('.tmp')
+        temp.write_text(json.dumps(self.collect()))
+        temp.replace(path)
+
+    def collect_all(self) -> dict[str, dict]:
+        """
+        Метрики всех процессов из METRICS_DIR, если он задан, иначе метрики текущего процесса.
+        """
+        if not settings.METRICS_DIR:
+            return self.collect()
+
+        self.flush()
+        merged: dict[str, dict] = {}
+        values: dict[str, dict] = defaultdict(lambda: defaultdict(float))
+        for path in Path(settings.METRICS_DIR).glob('*.json'):
+            pid = path.stem
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            alive = _is_alive(int(pid))
+            for name, metric in snapshot.items():
+                merged.setdefault(name, {'kind': metric['kind'], 'documentation': metric['documentation']})
+                if metric['kind'] == 'gauge' and not alive:
+                    continue
+                for suffix, labels, value in metric['samples']:
+                    labels = tuple(map(tuple, labels)) + ((('pid', pid),) if metric['kind'] == 'gauge' else ())
+                    values[name][(suffix, labels)] += value
+        for name, metric in merged.items():
+            metric['samples'] = [(suffix, labels, value) for (suffix, labels), value in values[name].items()]
+        return merged
+
+    def render(self, metrics: dict[str, dict] | None = None) -> str:
+        lines = []
+        for name, metric in (self.collect() if metrics is None else metrics).items():
+            lines.append(f'# HELP {name} {metric["documentation"]}')
+            lines.append(f'# TYPE {name} {metric["kind"]}')
+            for suffix, labels, value in metric['samples']:
+                lines.append(f'{name}{suffix}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = Counter('http_requests_total', 'HTTP requests', ['view', 'method', 'status'])
+HTTP_DURATION = Histogram('http_request_duration_seconds', 'HTTP request duration', ['view', 'method'])
+DB_QUERIES = Histogram('db_queries_per_request', 'SQL queries per HTTP request', ['view'],
+                       buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55))
+DB_DURATION = Histogram('db_query_duration_seconds_per_request', 'SQL time per HTTP request', ['view'])
+CACHE_REQUESTS = Counter('cache_requests_total', 'Cache lookups by result (hit or miss)', ['cache', 'result'])
+DB_CONNECTIONS = Gauge('db_connections_open', 'Open database connections of the process', ['alias'])
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(labels: Iterable[tuple[str, str]]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in labels]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect_database() -> dict[str, dict]:
+    """
+    Соединения сервера PostgreSQL с базой приложения по состоянию (active, idle, idle in transaction и т.д.).
+    """
+    with connections['default'].cursor() as cursor:
+        cursor.execute(
+            "SELECT coalesce(state, 'unknown'), count(*) FROM pg_stat_activity "
+            'WHERE datname = current_database() GROUP BY 1'
+        )
+        rows = cursor.fetchall()
+    return {'db_server_connections': {
+        'kind': 'gauge',
+        'documentation': 'PostgreSQL connections to the application database by state',
+        'samples': [('', (('state', state),), count) for state, count in rows],
+    }}
+
+
+class QueryTimer:
+    """
+    Обертка выполнения запросов (connection.execute_wrapper), считающая число и время SQL-запросов.
+    """
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+    """
+    Считает HTTP-запросы, их длительность, число и время SQL-запросов по имени URL (view_name, например
+    goals:list-goals). Запросы к адресам вне urls.py учитываются как unmatched.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryTimer()
+        start = time.perf_counter()
+        with connections['default'].execute_wrapper(queries):
+            response = self.get_response(request)
+        seconds = time.perf_counter() - start
+
+        view = request.resolver_match.view_name if request.resolver_match else 'unmatched'
+        HTTP_REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        HTTP_DURATION.observe(seconds, view=view, method=request.method)
+        DB_QUERIES.observe(queries.count, view=view)
+        DB_DURATION.observe(queries.seconds, view=view)
+        for connection in connections.all():
+            DB_CONNECTIONS.set(int(connection.connection is not None), alias=connection.alias)
+        REGISTRY.maybe_flush()
+        return response
+
+
+def check_token(authorization: str) -> bool:
+    """
+    Проверяет заголовок Authorization: Bearer <METRICS_TOKEN>, если METRICS_TOKEN задан.
+    """
+    return not settings.METRICS_TOKEN or constant_time_compare(authorization, f'Bearer {settings.METRICS_TOKEN}')
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):  # noqa: N802
+        if not check_token(self.headers.get('Authorization', '')):
+            self.send_error(403)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """
+    Отдает метрики текущего процесса по HTTP в фоновом потоке (для процессов без Django-сервера, например бота). Если
+    задан METRICS_TOKEN, нужен тот же заголовок Authorization, что и для /metrics API.
+    """
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info('Metrics are served on %s:%s', host, server.server_address[1])
+    return server
@@ -0,0 +1,32 @@
+"""
+Парсер JSON на orjson. Тело в UTF-8 разбирается orjson.loads, в других кодировках и при ошибке разбора (в том числе
+целые числа больше 64 бит, которые orjson не поддерживает) используется rest_framework.parsers.JSONParser, поэтому
+результат и текст ошибки совпадают с ним. Если orjson не установлен, парсер равен JSONParser.
+"""
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from core.renderers import FastJSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+UTF8 = ('utf-8', 'utf8')
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower() not in UTF8:
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,103 @@
+"""
+Контроль числа SQL-запросов на HTTP-запрос. Представление объявляет бюджет атрибутом query_budget - наибольшее число
+запросов к БД за один HTTP-запрос с учетом чтения сессии и пользователя (None - без проверок, например для загрузки
+файлов порциями). QueryBudgetMiddleware записывает запросы через connection.execute_wrapper и сводит их к отпечаткам:
+тексту SQL, в котором списки параметров IN (...) и VALUES (...) свернуты. Повтор одного отпечатка
+QUERY_BUDGET_REPEAT_THRESHOLD и более раз считается признаком N+1.
+
+Режимы (QUERY_BUDGET_MODE): off - выключено; log - проверяется доля QUERY_BUDGET_SAMPLE_RATE запросов, нарушения
+пишутся в лог; raise - проверяется каждый запрос, нарушение вызывает QueryBudgetExceededError (режим тестов).
+Запросы, выполняемые при потоковой отдаче ответа (StreamingHttpResponse), и команды точек сохранения (SAVEPOINT,
+которые вложенные transaction.atomic выполняют, например, в тестах) в бюджет не входят.
+"""
+import logging
+import random
+import re
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PARAMS_LIST_RE = re.compile(r'\((?:%s, )+%s\)')
+VALUES_LIST_RE = re.compile(r'VALUES (\([^()]*\))(?:, \([^()]*\))+')
+SAVEPOINT_RE = re.compile(r'(?:RELEASE |ROLLBACK TO )?SAVEPOINT ')
+
+
+class QueryBudgetExceededError(Exception):
+    pass
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Сводит текст запроса к форме, одинаковой для запросов, различающихся только числом параметров.
+    """
+    return VALUES_LIST_RE.sub(r'VALUES \1', PARAMS_LIST_RE.sub('(%s)', sql))
+
+
+class QueryRecorder:
+    """
+    Обертка выполнения запросов (connection.execute_wrapper), считающая запросы по отпечаткам.
+    """
+    def __init__(self):
+        self.count = 0
+        self.fingerprints: Counter = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        if SAVEPOINT_RE.match(sql):
+            return execute(sql, params, many, context)
+        self.count += 1
+        self.fingerprints[fingerprint(sql)] += 1
+        return execute(sql, params, many, context)
+
+    def get_repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count >= threshold]
+
+
+class QueryBudgetMiddleware:
+    """
+    Проверяет число запросов к БД и повторы запросов одного вида для представлений с атрибутом query_budget.
+    Для представлений без атрибута проверяются только повторы.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = settings.QUERY_BUDGET_MODE
+        if mode == 'off' or (mode == 'log' and random.random() >= settings.QUERY_BUDGET_SAMPLE_RATE):  # noqa: S311
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        problems = self.check(request, recorder)
+        if problems:
+            message = f'{request.method} {request.path}: ' + '; '.join(problems)
+            if mode == 'raise':
+                raise QueryBudgetExceededError(message)
+            logger.warning('Query budget exceeded: %s', message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget_view = getattr(view_func, 'view_class', None)
+
+    def check(self, request, recorder: QueryRecorder) -> list[str]:
+        view = getattr(request, 'query_budget_view', None)
+        if not hasattr(view, 'query_budget'):
+            budget = float('inf')
+        elif view.query_budget is None:
+            return []
+        else:
+            budget = view.query_budget
+
+        problems = []
+        if recorder.count > budget:
+            problems.append(f'{recorder.count} queries, budget {budget} ({view.__name__})')
+        for sql, count in recorder.get_repeated(settings.QUERY_BUDGET_REPEAT_THRESHOLD):
+            problems.append(f'{count} x {sql[:300]}')
+        return problems
@@ -0,0 +1,34 @@
+"""
+Рендерер JSON на orjson. Вывод совпадает с rest_framework.renderers.JSONRenderer: компактные разделители, символы
+не-ASCII без экранирования, U+2028/U+2029 экранируются, Decimal, даты, время, UUID и ленивые строки приводятся
+кодировщиком DRF (rest_framework.utils.encoders.JSONEncoder). Ответы с отступами (indent в Accept) и данные, которые
+orjson не сериализует, выводятся стандартным JSONRenderer. Если orjson не установлен, рендерер равен JSONRenderer.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class FastJSONRenderer(JSONRenderer):
+    def is_default(self, accepted_media_type, renderer_context) -> bool:
+        """
+        Нужен ли стандартный вывод JSONRenderer: orjson не установлен, запрошены отступы или изменены настройки вывода.
+        """
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        return orjson is None or self.ensure_ascii or not self.compact or indent is not None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or self.is_default(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        for char, escaped in LINE_SEPARATORS:
+            ret = ret.replace(char, escaped)
+        return ret
@@ -0,0 +1,184 @@
+"""
+Замер фаз обработки запроса: аутентификация (auth), проверка прав (perm), построение объектов из результатов запросов
+ORM (orm), выполнение SQL (db), сериализация (serialize), рендеринг ответа (render) и остальное время (app).
+
+instrument() при запуске приложения оборачивает соответствующие методы DRF и QuerySet, ServerTimingMiddleware
+собирает время фаз текущего запроса и отдает его заголовком Server-Timing и полями записи лога. Для каждой фазы
+считается собственное время: время вложенной фазы (например, SQL внутри проверки прав) вычитается из объемлющей,
+поэтому сумма фаз не превышает общего времени (total).
+
+Если задан PROFILE_DIR, запрос сотрудника (is_staff) с заголовком X-Profile с вероятностью PROFILE_SAMPLE_RATE
+профилируется cProfile, профиль сохраняется в PROFILE_DIR, имя файла возвращается заголовком X-Profile-File.
+"""
+import cProfile
+import logging
+import random
+import time
+import uuid
+from collections.abc import Callable
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PHASES = ('auth', 'perm', 'orm', 'db', 'serialize', 'render')
+
+current_timer: ContextVar['PhaseTimer | None'] = ContextVar('current_timer', default=None)
+
+
+class PhaseTimer:
+    """
+    Собственное время фаз одного запроса в секундах и число SQL-запросов. Объект - обертка выполнения запросов
+    (connection.execute_wrapper) для фазы db.
+    """
+    def __init__(self):
+        self.durations = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        self._stack: list[list[float]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        # [начало фазы, время вложенных фаз]
+        frame = [time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[0]
+            self.durations[name] += elapsed - frame[1]
+            if self._stack:
+                self._stack[-1][1] += elapsed
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        with self.phase('db'):
+            return execute(sql, params, many, context)
+
+    def get_milliseconds(self, total: float) -> dict[str, float]:
+        durations = self.durations | {'app': max(total - sum(self.durations.values()), 0), 'total': total}
+        return {name: round(seconds * 1000, 2) for name, seconds in durations.items() if seconds}
+
+    def get_header(self, total: float) -> str:
+        entries = []
+        for name, milliseconds in self.get_milliseconds(total).items():
+            description = f';desc="{self.queries} queries"' if name == 'db' else ''
+            entries.append(f'{name};dur={milliseconds}{description}')
+        return ', '.join(entries)
+
+
+def timed(name: str, func: Callable) -> Callable:
+    """
+    Оборачивает func: если запрос обрабатывается ServerTimingMiddleware, время вызова учитывается в фазе name.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        timer = current_timer.get()
+        if timer is None:
+            return func(*args, **kwargs)
+        with timer.phase(name):
+            return func(*args, **kwargs)
+
+    wrapper.timed_phase = name
+    return wrapper
+
+
+def instrument() -> None:
+    """
+    Подключает замер фаз к методам DRF и QuerySet. Повторный вызов ничего не меняет.
+    """
+    from django.db.models.query import QuerySet
+    from rest_framework.response import Response
+    from rest_framework.serializers import ListSerializer, Serializer
+    from rest_framework.views import APIView
+
+    methods = [
+        (APIView, 'perform_authentication', 'auth'),
+        (APIView, 'check_permissions', 'perm'),
+        (APIView, 'check_object_permissions', 'perm'),
+        (QuerySet, '_fetch_all', 'orm'),
+    ]
+    properties = [(Serializer, 'data', 'serialize'), (ListSerializer, 'data', 'serialize'),
+                  (Response, 'rendered_content', 'render')]
+    for cls, attr, name in methods:
+        if not hasattr(getattr(cls, attr), 'timed_phase'):
+            setattr(cls, attr, timed(name, getattr(cls, attr)))
+    for cls, attr, name in properties:
+        if not hasattr(getattr(cls, attr).fget, 'timed_phase'):
+            setattr(cls, attr, property(timed(name, getattr(cls, attr).fget)))
+
+
+class ServerTimingMiddleware:
+    """
+    Добавляет к ответу заголовок Server-Timing с временем фаз и пишет запросы не быстрее
+    SERVER_TIMING_LOG_THRESHOLD_MS в лог с полями method, path, view, status, queries и server_timing.
+    Время потоковой отдачи ответа (StreamingHttpResponse) не учитывается.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SERVER_TIMING_ENABLED:
+            return self.get_response(request)
+
+        timer = PhaseTimer()
+        token = current_timer.set(timer)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer))
+                response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+            profiler = getattr(request, 'profiler', None)
+            if profiler is not None:
+                profiler.disable()
+        total = time.perf_counter() - start
+
+        if profiler is not None:
+            response['X-Profile-File'] = self.save_profile(request, profiler)
+        response['Server-Timing'] = timer.get_header(total)
+        self.log(request, response, timer, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """
+        Включает профилирование до вызова представления: пользователь сессии здесь уже известен.
+        """
+        if settings.PROFILE_DIR and request.headers.get('X-Profile') and request.user.is_staff \
+                and random.random() < settings.PROFILE_SAMPLE_RATE:  # noqa: S311
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Профилировщик уже запущен в этом процессе (Python 3.12+ допускает только один)
+                return
+            request.profiler = profiler
+
+    def save_profile(self, request, profiler: cProfile.Profile) -> str:
+        directory = Path(settings.PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        view = request.resolver_match.view_name if request.resolver_match else 'unknown'
+        name = f'{time.strftime("%Y%m%d-%H%M%S")}-{request.method}-{view.replace(":", "-")}-{uuid.uuid4().hex[:8]}.prof'
+        profiler.dump_stats(directory / name)
+        logger.info('Profile saved: %s', directory / name)
+        return name
+
+    def log(self, request, response, timer: PhaseTimer, total: float) -> None:
+        if total * 1000 < settings.SERVER_TIMING_LOG_THRESHOLD_MS:
+            return
+        view = request.resolver_match.view_name if request.resolver_match else None
+        logger.info('%s %s %s %.1fms', request.method, request.path, response.status_code, total * 1000, extra={
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'queries': timer.queries,
+            'server_timing': timer.get_milliseconds(total),
+        })
@@ -1,11 +1,14 @@
 from typing import Any
 
+from django.conf import settings
 from django.contrib.auth import login, logout
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
 from rest_framework import generics, permissions, status
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.serializers import Serializer
 
+from core.metrics import CONTENT_TYPE, REGISTRY, check_token, collect_database
 from core.models import User
 from core.serializers import (CreateUserSerializer, LoginSerializer,
                               ProfileSerializer, UpdatePasswordSerializer)
@@ -15,6 +18,7 @@ class SignUpView(generics.CreateAPIView):
     """
     Создание (регистрация) нового пользователя.
     """
+    query_budget: int = 2
     serializer_class: Serializer = CreateUserSerializer
 
 
@@ -22,6 +26,7 @@ class LoginView(generics.CreateAPIView):
     """
     Вход по логину и паролю для зарегистрированного пользователя.
     """
+    query_budget: int = 5
     serializer_class: Serializer = LoginSerializer
 
     def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
@@ -35,6 +40,7 @@ class ProfileView(generics.RetrieveUpdateDestroyAPIView):
     """
     Информация по профилю пользователя.
     """
+    query_budget: int = 4
     serializer_class: Serializer = ProfileSerializer
     permission_classes: tuple[permissions.BasePermission, ...] = (permissions.IsAuthenticated,)
 
@@ -49,8 +55,19 @@ class UpdatePasswordView(generics.UpdateAPIView):
     """
     Обновление пароля пользователя.
     """
+    query_budget: int = 3
     serializer_class: Serializer = UpdatePasswordSerializer
     permission_classes: tuple[permissions.BasePermission, ...] = (permissions.IsAuthenticated,)
 
     def get_object(self) -> User:
         return self.request.user
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    """
+    Метрики API в текстовом формате Prometheus. Если задан METRICS_TOKEN, нужен заголовок
+    Authorization: Bearer <METRICS_TOKEN>. Без METRICS_TOKEN метрики доступны только в режиме DEBUG.
+    """
+    if not (settings.METRICS_TOKEN or settings.DEBUG) or not check_token(request.headers.get('Authorization', '')):
+        return HttpResponseForbidden()
+    return HttpResponse(REGISTRY.render(REGISTRY.collect_all() | collect_database()), content_type=CONTENT_TYPE)
@@ -1,11 +1,12 @@
 from django.contrib import admin
 
-from goals.models import Goal, GoalCategory, GoalComment
+from goals.models import CascadeJob, Goal, GoalCategory, GoalComment
 
 
 @admin.register(GoalCategory)
 class GoalCategoryAdmin(admin.ModelAdmin):
     list_display = ('id', 'title', 'user', 'is_deleted')
+    list_select_related = ('user',)
     list_display_links = ('title',)
     search_fields = ('title',)
     list_filter = ('is_deleted',)
@@ -15,6 +16,7 @@ class GoalCategoryAdmin(admin.ModelAdmin):
 @admin.register(Goal)
 class GoalAdmin(admin.ModelAdmin):
     list_display = ('id', 'title', 'user', 'category', 'status', 'priority')
+    list_select_related = ('user', 'category__user')
     list_display_links = ('title',)
     search_fields = ('title', 'description')
     list_filter = ('status', 'priority')
@@ -24,4 +26,13 @@ class GoalAdmin(admin.ModelAdmin):
 @admin.register(GoalComment)
 class GoalCommentAdmin(admin.ModelAdmin):
     list_display = ('user', 'text',)
+    list_select_related = ('user',)
+    readonly_fields = ('created', 'updated',)
+
+
+@admin.register(CascadeJob)
+class CascadeJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'board', 'category', 'status', 'processed', 'total')
+    list_select_related = ('board', 'category__user')
+    list_filter = ('status',)
     readonly_fields = ('created', 'updated',)
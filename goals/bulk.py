@@ -0,0 +1,154 @@
+"""
+Пакетные операции над целями: создание, обновление и архивирование списка целей за один запрос.
+
+Категории и цели всех операций выбираются двумя запросами, роли пользователя берутся из кэша участия в досках
+(goals.membership), поэтому права проверяются один раз для каждой доски, без запросов на каждую операцию. Цели
+выбираются с блокировкой строк в той же транзакции, в которой корректные операции записываются через
+bulk_create/bulk_update, для ошибочных возвращаются ошибки.
+"""
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from rest_framework.exceptions import ErrorDetail, NotFound, PermissionDenied
+
+from core.models import User
+from goals import membership
+from goals.models import CascadeJob, Goal, GoalCategory, GoalComment, Tombstone
+from goals.permissions import EDITOR_ROLES
+from goals.serializers import (GoalBulkDataSerializer,
+                               GoalBulkOperationSerializer)
+
+CREATE, UPDATE, ARCHIVE = 'create', 'update', 'archive'
+BATCH_SIZE = 1000
+
+
+class OperationError(Exception):
+    def __init__(self, errors: dict):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def apply_goal_operations(user: User, operations: list) -> list[dict]:
+    """
+    Выполняет операции вида {'op': 'create', 'data': {...}}, {'op': 'update', 'id': 1, 'data': {...}} и
+    {'op': 'archive', 'id': 1}. Возвращает результаты в порядке операций: {'status': 'created', 'id': 1} или
+    {'status': 'error', 'errors': {...}}.
+    """
+    parsed = [_parse(operation) for operation in operations]
+    valid = [operation for operation in parsed if not isinstance(operation, OperationError)]
+
+    with transaction.atomic():
+        categories = {category_id: (board_id, user_id) for category_id, board_id, user_id in GoalCategory.objects.filter(
+            id__in={operation['data']['category'] for operation in valid if 'category' in operation.get('data', {})},
+            is_deleted=False,
+        ).values_list('id', 'board_id', 'user_id')}
+        # Цели пакета блокируются до конца транзакции (в порядке id, чтобы пакеты не взаимоблокировались): изменения,
+        # сделанные параллельно, например через GoalView, не перезаписываются bulk_update
+        goals = {goal.id: goal for goal in Goal.objects.filter(
+            id__in={operation['id'] for operation in valid if operation['op'] != CREATE},
+        ).exclude(status=Goal.Status.archived).exclude(
+            category_id__in=CascadeJob.get_pending_category_ids()
+        ).select_for_update(of=('self',)).order_by('id')}
+        roles = membership.get_board_roles(user.id)
+
+        results, to_create, to_update, fields, moved = [], [], {}, {'updated'}, {}
+        for operation in parsed:
+            try:
+                if isinstance(operation, OperationError):
+                    raise operation
+                if operation['op'] == CREATE:
+                    goal = _create(user, operation['data'], categories, roles)
+                    to_create.append(goal)
+                else:
+                    if operation['id'] in to_update:
+                        raise OperationError({'id': [ErrorDetail('Duplicate goal in batch', code='unique')]})
+                    goal = goals.get(operation['id'])
+                    board_id = _check_goal(goal, roles)
+                    if operation['op'] == ARCHIVE:
+                        goal.status = Goal.Status.archived
+                        fields.add('status')
+                    else:
+                        _update(user, goal, operation['data'], categories, roles)
+                        fields.update(operation['data'])
+                        if 'category' in operation['data']:
+                            fields.add('board')
+                        if goal.board_id != board_id:
+                            moved[goal.id] = board_id
+                    to_update[goal.id] = goal
+                results.append((operation['op'], goal))
+            except OperationError as error:
+                results.append(error)
+
+        Goal.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+        # bulk_update не вызывает pre_save, поэтому auto_now поля updated заполняется явно
+        now = timezone.now()
+        if to_update:
+            for goal in to_update.values():
+                goal.updated = now
+            Goal.objects.bulk_update(to_update.values(), fields, batch_size=BATCH_SIZE)
+        if moved:
+            Tombstone.record_moved_goals(moved)
+            GoalComment.objects.filter(goal_id__in=moved).update(
+                board_id=Subquery(Goal.objects.filter(id=OuterRef('goal_id')).values('board_id')), updated=now,
+            )
+
+    return [_result(result) for result in results]
+
+
+def _parse(operation) -> dict | OperationError:
+    serializer = GoalBulkOperationSerializer(data=operation)
+    if not serializer.is_valid():
+        return OperationError(serializer.errors)
+
+    attrs = dict(serializer.validated_data)
+    if attrs['op'] != ARCHIVE:
+        data = GoalBulkDataSerializer(data=attrs['data'], partial=attrs['op'] == UPDATE)
+        if not data.is_valid():
+            return OperationError(data.errors)
+        attrs['data'] = data.validated_data
+    return attrs
+
+
+def _check_category(user: User, category_id: int, categories: dict[int, tuple[int, int]], roles: dict[int, int]) -> int:
+    """
+    Проверяет категорию так же, как GoalCreateSerializer и GoalSerializer: цель создается или переносится только в
+    категорию, автор которой - пользователь, и только в доске, где у него роль "владелец" или "редактор".
+    """
+    if category_id not in categories:
+        raise OperationError({'category': [ErrorDetail('Category not found', code='does_not_exist')]})
+    board_id, author_id = categories[category_id]
+    if author_id != user.id or roles.get(board_id) not in EDITOR_ROLES:
+        raise OperationError({'detail': PermissionDenied.default_detail})
+    return board_id
+
+
+def _check_goal(goal: Goal | None, roles: dict[int, int]) -> int:
+    if goal is None or goal.board_id not in roles:
+        raise OperationError({'detail': NotFound.default_detail})
+    if roles[goal.board_id] not in EDITOR_ROLES:
+        raise OperationError({'detail': PermissionDenied.default_detail})
+    return goal.board_id
+
+
+def _create(user: User, data: dict, categories: dict[int, tuple[int, int]], roles: dict[int, int]) -> Goal:
+    data = dict(data)
+    category_id = data.pop('category')
+    board_id = _check_category(user, category_id, categories, roles)
+    return Goal(user=user, category_id=category_id, board_id=board_id, **data)
+
+
+def _update(user: User, goal: Goal, data: dict, categories: dict[int, tuple[int, int]], roles: dict[int, int]) -> None:
+    data = dict(data)
+    if 'category' in data:
+        category_id = data.pop('category')
+        goal.board_id = _check_category(user, category_id, categories, roles)
+        goal.category_id = category_id
+    for name, value in data.items():
+        setattr(goal, name, value)
+
+
+def _result(result: tuple[str, Goal] | OperationError) -> dict:
+    if isinstance(result, OperationError):
+        return {'status': 'error', 'errors': result.errors}
+    op, goal = result
+    return {'status': {CREATE: 'created', UPDATE: 'updated', ARCHIVE: 'archived'}[op], 'id': goal.id}
@@ -0,0 +1,102 @@
+"""
+Фоновый каскад при удалении доски или категории. Запрос на удаление синхронно ставит признак is_deleted и создает
+CascadeJob и задачу очереди jobs (goals.cascade), а исполнитель (manage.py runworker) обновляет категории и цели шагами
+по GOALS_CASCADE_CHUNK_SIZE записей. Каждый шаг выполняется в своей транзакции и блокирует только обрабатываемые
+строки и строку задачи.
+
+Пока каскад не завершен, объекты удаленной доски скрываются проверкой участия в неудаленных досках, а цели удаленной
+категории - подзапросом к незавершенным задачам каскада (CascadeJob.get_pending_category_ids).
+Каскад, завершившийся ошибкой, повторяется очередью, а также может быть продолжен командой manage.py resume_cascades.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from goals.models import Board, CascadeJob, Goal, GoalCategory
+from jobs.pgqueue import enqueue
+
+logger = logging.getLogger(__name__)
+
+# Каскад освобождает удаленные данные из списков, поэтому выполняется раньше задач с приоритетом по умолчанию
+CASCADE_PRIORITY = 10
+
+
+class CascadeError(Exception):
+    pass
+
+
+def start_board_cascade(board: Board) -> CascadeJob:
+    return _start(CascadeJob.objects.create(board=board))
+
+
+def start_category_cascade(category: GoalCategory) -> CascadeJob:
+    return _start(CascadeJob.objects.create(board_id=category.board_id, category=category))
+
+
+def get_steps(job: CascadeJob) -> list[tuple[QuerySet, dict]]:
+    """
+    Возвращает шаги каскада: queryset обновляемых записей и значения полей для QuerySet.update.
+    """
+    if job.category_id is not None:
+        return [
+            (Goal.objects.filter(category_id=job.category_id).exclude(status=Goal.Status.archived),
+             {'status': Goal.Status.archived}),
+        ]
+    return [
+        (GoalCategory.objects.filter(board_id=job.board_id, is_deleted=False), {'is_deleted': True}),
+        (Goal.objects.filter(board_id=job.board_id).exclude(status=Goal.Status.archived),
+         {'status': Goal.Status.archived}),
+    ]
+
+
+def run_job(job_id: int) -> CascadeJob:
+    """
+    Выполняет задачу до конца. Ошибка шага сохраняется в задаче со статусом failed, обработанные шаги не
+    откатываются.
+    """
+    try:
+        while run_chunk(job_id):
+            pass
+    except Exception as error:
+        logger.exception('Cascade job %s failed', job_id)
+        CascadeJob.objects.filter(id=job_id).update(status=CascadeJob.Status.failed, error=repr(error))
+    return CascadeJob.objects.get(id=job_id)
+
+
+def run_chunk(job_id: int) -> bool:
+    """
+    Обрабатывает очередную порцию записей задачи и сохраняет позицию. Строка задачи блокируется на время шага,
+    поэтому параллельные исполнители одной задачи не обрабатывают одни и те же записи. Возвращает False, когда
+    каскад завершен.
+    """
+    chunk_size = settings.GOALS_CASCADE_CHUNK_SIZE
+    with transaction.atomic():
+        job = CascadeJob.objects.select_for_update().get(id=job_id)
+        if job.status == CascadeJob.Status.done:
+            return False
+
+        steps = get_steps(job)
+        if job.total is None:
+            job.total = sum(queryset.count() for queryset, _ in steps)
+
+        if job.step < len(steps):
+            queryset, values = steps[job.step]
+            ids = list(queryset.filter(id__gt=job.last_id).order_by('id').values_list('id', flat=True)[:chunk_size])
+            if ids:
+                job.processed += queryset.model.objects.filter(id__in=ids).update(**values, updated=timezone.now())
+                job.last_id = ids[-1]
+            if len(ids) < chunk_size:
+                job.step, job.last_id = job.step + 1, 0
+
+        job.status = CascadeJob.Status.done if job.step >= len(steps) else CascadeJob.Status.running
+        job.error = ''
+        job.save()
+    return job.status != CascadeJob.Status.done
+
+
+def _start(job: CascadeJob) -> CascadeJob:
+    enqueue('goals.cascade', {'job_id': job.id}, priority=CASCADE_PRIORITY)
+    return job
@@ -0,0 +1,67 @@
+"""
+Условный GET для списков целей и категорий и для доски. ETag ответа строится по версиям досок пользователя
+(goals.models.BoardVersion), которые выбираются одним запросом по индексу участников. Если заголовок If-None-Match
+запроса совпадает с ETag, представление возвращает 304 без выборки и сериализации данных.
+
+Версия доски увеличивается триггерами БД при любом изменении доски, ее участников, категорий и целей, поэтому ETag
+меняется и после QuerySet.update(), фоновых каскадов и импорта. Last-Modified не выводится: по наибольшей дате
+изменения нельзя заметить, что доска перестала быть видна пользователю.
+"""
+from hashlib import blake2b
+
+from django.db.models.functions import Coalesce
+from django.utils.cache import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from goals.models import BoardParticipant
+
+
+def get_board_versions(user_id: int, board_id: int | None = None) -> list[tuple[int, int]]:
+    """
+    Возвращает пары (board_id, версия) неудаленных досок пользователя по возрастанию board_id.
+    """
+    queryset = BoardParticipant.objects.filter(user_id=user_id, board__is_deleted=False)
+    if board_id is not None:
+        queryset = queryset.filter(board_id=board_id)
+    return list(queryset.order_by('board_id').values_list('board_id', Coalesce('board__version__version', 0)))
+
+
+def is_etag_matched(etag: str, if_none_match: str | None) -> bool:
+    """
+    Слабое сравнение для If-None-Match (RFC 9110): признак W/ не учитывается, * совпадает с любым ETag.
+    """
+    etags = parse_etags(if_none_match or '')
+    return etags == ['*'] or any(tag.removeprefix('W/') == etag for tag in etags)
+
+
+class ConditionalGetMixin:
+    """
+    Примесь для представлений, ответ которых зависит только от досок пользователя и параметров запроса. Если задан
+    etag_board_kwarg, учитывается только доска из этого аргумента URL, а запросы не участника обрабатываются
+    представлением как обычно (403 или 404).
+    """
+    etag_board_kwarg: str | None = None
+
+    def get_etag(self, request) -> str | None:
+        board_id = self.kwargs[self.etag_board_kwarg] if self.etag_board_kwarg else None
+        versions = get_board_versions(request.user.id, board_id)
+        if board_id is not None and not versions:
+            return None
+        key = '|'.join(map(str, (
+            request.resolver_match.view_name, request.user.id, request.accepted_renderer.format,
+            request.META.get('QUERY_STRING', ''), versions,
+        )))
+        return quote_etag(blake2b(key.encode(), digest_size=16).hexdigest())
+
+    def get(self, request, *args, **kwargs):
+        # ETag вычисляется до выборки данных: изменение между ними дает старый ETag с новыми данными, и клиент только
+        # лишний раз получит их повторно
+        etag = self.get_etag(request)
+        if etag is not None and is_etag_matched(etag, request.headers.get('If-None-Match')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        response = super().get(request, *args, **kwargs)
+        if etag is not None and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
@@ -0,0 +1,238 @@
+"""
+Генерация синтетических данных для замеров производительности и проверки планов запросов: небольшие доски для
+бенчмарков (seed_board) и набор данных производственного объема (DatasetGenerator, manage.py generate_dataset).
+"""
+import itertools
+import math
+import random
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import User
+from goals.models import (Board, BoardParticipant, Goal, GoalCategory,
+                          GoalComment)
+from goals.pgcopy import (COMMENT_COLUMNS, GOAL_COLUMNS, allocate_ids,
+                          copy_lines)
+
+BATCH_SIZE = 10_000
+CHUNK_SIZE = 50_000
+
+# Популярность пользователей и размер досок распределены по степенному закону: большинство досок личные, несколько
+# досок командные с десятками участников, а часть пользователей состоит во многих досках
+USER_ZIPF_EXPONENT = 1.1
+BOARD_PARETO_ALPHA = 1.5
+WRITER_SHARE = 0.3
+STATUS_WEIGHTS = {
+    Goal.Status.to_do: 40, Goal.Status.in_progress: 25, Goal.Status.done: 25, Goal.Status.archived: 10,
+}
+PRIORITY_WEIGHTS = {
+    Goal.Priority.low: 20, Goal.Priority.medium: 50, Goal.Priority.high: 20, Goal.Priority.critical: 10,
+}
+DUE_DATE_SHARE = 0.6
+HISTORY_DAYS = 730
+WORDS = (
+    'купить', 'подготовить', 'отчет', 'встреча', 'проект', 'задача', 'ремонт', 'отпуск', 'бюджет', 'клиент',
+    'договор', 'релиз', 'тест', 'документация', 'обучение', 'спорт', 'книга', 'план', 'звонок', 'презентация',
+    'report', 'release', 'meeting', 'review', 'deploy', 'budget', 'design', 'backlog', 'invoice', 'migration',
+)
+
+
+def seed_board(owner: User, categories: int, goals: int, comments: int = 0, seed: int = 0) -> Board:
+    """
+    Создает доску владельца owner с заданным числом категорий, целей и комментариев, равномерно распределенных по
+    категориям и целям. Записи вставляются пачками через bulk_create.
+    """
+    rnd = random.Random(seed)
+    board = Board.objects.create(title=f'Benchmark board {owner.username}')
+    BoardParticipant.objects.create(board=board, user=owner, role=BoardParticipant.Role.owner)
+    category_objs = GoalCategory.objects.bulk_create([
+        GoalCategory(board=board, user=owner, title=f'Category {i}') for i in range(categories)
+    ])
+
+    batch = []
+    for i in range(goals):
+        batch.append(Goal(
+            board=board,
+            category=category_objs[i % categories],
+            user=owner,
+            title=f'Goal {rnd.randrange(goals):09d}',
+            description='x' * rnd.randrange(0, 200),
+            status=rnd.choice(Goal.Status.values[:3]),
+            priority=rnd.choice(Goal.Priority.values),
+        ))
+        if len(batch) == BATCH_SIZE:
+            Goal.objects.bulk_create(batch)
+            batch = []
+    Goal.objects.bulk_create(batch)
+
+    goal_ids = list(board.goals.values_list('id', flat=True))
+    batch = []
+    for i in range(comments if goal_ids else 0):
+        batch.append(GoalComment(goal_id=goal_ids[i % len(goal_ids)], board=board, user=owner, text=f'Comment {i}'))
+        if len(batch) == BATCH_SIZE:
+            GoalComment.objects.bulk_create(batch)
+            batch = []
+    GoalComment.objects.bulk_create(batch)
+    return board
+
+
+def seed_user(username: str) -> User:
+    return User.objects.create(username=username, password=make_password(None))
+
+
+class DatasetGenerator:
+    """
+    Генерирует пользователей, доски с участниками, категории, цели и комментарии с распределениями, близкими к
+    производственным. Пользователи, доски, участники и категории создаются через bulk_create, цели и комментарии -
+    командой COPY порциями по chunk_size целей, каждая порция в своей транзакции. При одинаковом seed на пустой базе
+    получаются одинаковые данные, даты отсчитываются от начала текущего дня.
+    """
+
+    def __init__(self, seed: int = 0, chunk_size: int = CHUNK_SIZE, log: Callable[[str], None] | None = None):
+        self.rnd = random.Random(seed)
+        self.chunk_size = chunk_size
+        self.log = log or (lambda message: None)
+        self.now = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.user_ids: list[int] = []
+        self.user_weights: list[float] = []
+        # Для каждой доски: id, id категорий, авторы целей (владелец и редакторы), все участники
+        self.boards: list[tuple[int, list[int], list[int], list[int]]] = []
+        self.board_weights: list[float] = []
+
+    def create_users(self, count: int, prefix: str = 'user') -> None:
+        password = make_password(None)
+        for start in range(0, count, BATCH_SIZE):
+            users = User.objects.bulk_create([
+                User(username=f'{prefix}{i}', password=password, date_joined=self.now)
+                for i in range(start, min(count, start + BATCH_SIZE))
+            ])
+            self.user_ids.extend(user.id for user in users)
+        self.user_weights = list(itertools.accumulate(
+            1 / rank ** USER_ZIPF_EXPONENT for rank in range(1, len(self.user_ids) + 1)
+        ))
+        self.log(f'Users: {count}')
+
+    def create_boards(self, count: int, categories: int, max_participants: int) -> None:
+        """
+        Создает count досок со случайным владельцем, числом участников по распределению Парето (не более
+        max_participants) и в среднем categories категориями.
+        """
+        for start in range(0, count, BATCH_SIZE):
+            boards = Board.objects.bulk_create([
+                Board(title=self._words(2)) for _ in range(start, min(count, start + BATCH_SIZE))
+            ])
+            participants, board_editors, board_categories = [], [], []
+            for board in boards:
+                members = self._members(max_participants)
+                participants.extend(
+                    BoardParticipant(board=board, user_id=user_id, role=role) for user_id, role in members.items()
+                )
+                editors = [user_id for user_id, role in members.items() if role != BoardParticipant.Role.reader]
+                board_editors.append((editors, list(members)))
+                board_categories.append([
+                    GoalCategory(board=board, user_id=self.rnd.choice(editors), title=self._words(1))
+                    for _ in range(self.rnd.randint(1, 2 * categories - 1))
+                ])
+            BoardParticipant.objects.bulk_create(participants, batch_size=BATCH_SIZE)
+            GoalCategory.objects.bulk_create(itertools.chain.from_iterable(board_categories), batch_size=BATCH_SIZE)
+
+            for board, (editors, members), category_objs in zip(boards, board_editors, board_categories):
+                self.boards.append((board.id, [category.id for category in category_objs], editors, members))
+        self.board_weights = list(itertools.accumulate(
+            self.rnd.paretovariate(BOARD_PARETO_ALPHA) for _ in self.boards
+        ))
+        self.log(f'Boards: {count}')
+
+    def create_goals(self, count: int, comments_per_goal: float) -> None:
+        """
+        Создает count целей, распределенных по доскам пропорционально весам Парето, и в среднем comments_per_goal
+        комментариев к каждой цели.
+        """
+        start, total_comments = time.perf_counter(), 0
+        for offset in range(0, count, self.chunk_size):
+            size = min(self.chunk_size, count - offset)
+            goal_lines, comments = self._goal_lines(size, comments_per_goal)
+            with transaction.atomic():
+                goal_ids = allocate_ids(Goal, size)
+                copy_lines(Goal, GOAL_COLUMNS, (f'{goal_id}\t{line}' for goal_id, line in zip(goal_ids, goal_lines)))
+                comment_ids = allocate_ids(GoalComment, len(comments))
+                copy_lines(GoalComment, COMMENT_COLUMNS, (
+                    f'{comment_id}\t{goal_ids[index]}\t{line}'
+                    for comment_id, (index, line) in zip(comment_ids, comments)
+                ))
+            total_comments += len(comments)
+            seconds = time.perf_counter() - start
+            self.log(f'Goals: {offset + size}/{count}, comments: {total_comments}, '
+                     f'{(offset + size + total_comments) / seconds:.0f} rows/s')
+
+    def _members(self, max_participants: int) -> dict[int, int]:
+        owner = self.rnd.choice(self.user_ids)
+        extra = min(max_participants - 1, int(self.rnd.paretovariate(BOARD_PARETO_ALPHA)) - 1)
+        members = {owner: BoardParticipant.Role.owner}
+        for user_id in self.rnd.choices(self.user_ids, cum_weights=self.user_weights, k=extra):
+            members.setdefault(user_id, (
+                BoardParticipant.Role.writer if self.rnd.random() < WRITER_SHARE else BoardParticipant.Role.reader
+            ))
+        return members
+
+    def _goal_lines(self, size: int, comments_per_goal: float) -> tuple[list[str], list[tuple[int, str]]]:
+        """
+        Возвращает строки целей в формате COPY без колонки id и строки комментариев без колонок id и goal_id вместе с
+        индексом цели в порции.
+        """
+        rnd = self.rnd
+        boards = rnd.choices(self.boards, cum_weights=self.board_weights, k=size)
+        statuses = rnd.choices(list(STATUS_WEIGHTS), weights=STATUS_WEIGHTS.values(), k=size)
+        priorities = rnd.choices(list(PRIORITY_WEIGHTS), weights=PRIORITY_WEIGHTS.values(), k=size)
+
+        # Число комментариев - округленное вниз экспоненциальное распределение со средним comments_per_goal
+        comment_rate = math.log1p(1 / comments_per_goal) if comments_per_goal else 0
+        goal_lines, comments = [], []
+        for index, ((board_id, categories, editors, members), goal_status, priority) in enumerate(
+            zip(boards, statuses, priorities)
+        ):
+            created = self._past(HISTORY_DAYS)
+            updated = min(self.now, created + timedelta(days=rnd.expovariate(1 / 30)))
+            due_date = '\\N'
+            if rnd.random() < DUE_DATE_SHARE:
+                due_date = (created + timedelta(days=rnd.randint(1, 365))).isoformat()
+            goal_lines.append(
+                f'{self._words(rnd.randint(2, 5)).capitalize()}\t{self._words(rnd.randint(0, 30))}\t'
+                f'{rnd.choice(categories)}\t{board_id}\t{rnd.choice(editors)}\t{goal_status}\t{priority}\t'
+                f'{due_date}\t{created.isoformat()}\t{updated.isoformat()}\n'
+            )
+            for _ in range(int(rnd.expovariate(comment_rate)) if comment_rate else 0):
+                commented = min(self.now, created + timedelta(days=rnd.expovariate(1 / 10)))
+                comments.append((index, f'{board_id}\t{rnd.choice(members)}\t{self._words(rnd.randint(1, 20))}\t'
+                                        f'{commented.isoformat()}\t{commented.isoformat()}\n'))
+        return goal_lines, comments
+
+    def _past(self, days: int) -> datetime:
+        return self.now - timedelta(seconds=self.rnd.random() * days * 86400)
+
+    def _words(self, count: int) -> str:
+        return ' '.join(self.rnd.choices(WORDS, k=count))
+
+
+@contextmanager
+def deferred_indexes(*models) -> Iterator[None]:
+    """
+    Удаляет индексы из Meta.indexes моделей на время массовой загрузки и создает их заново после нее: построение
+    индекса по готовой таблице быстрее, чем обновление индексов (особенно GIN) на каждую вставленную строку.
+    """
+    indexes = [(model, index) for model in models for index in model._meta.indexes]
+    with connection.schema_editor(atomic=False) as schema_editor:
+        for model, index in indexes:
+            schema_editor.remove_index(model, index)
+    try:
+        yield
+    finally:
+        with connection.schema_editor(atomic=False) as schema_editor:
+            for model, index in indexes:
+                schema_editor.add_index(model, index)
@@ -0,0 +1,114 @@
+"""
+Потоковая выгрузка целей и комментариев в NDJSON или CSV. Записи читаются серверным курсором (QuerySet.iterator)
+порциями по EXPORT_CHUNK_SIZE строк и сразу отдаются клиенту блоками, поэтому память процесса не зависит от размера
+выгрузки. Комментарии читаются вторым курсором в порядке целей и присоединяются к ним слиянием двух потоков.
+"""
+import csv
+import datetime
+from collections.abc import Iterator
+from itertools import groupby
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, QuerySet
+
+from goals.models import GoalComment
+
+EXPORT_CHUNK_SIZE = 2000
+BLOCK_SIZE = 64 * 1024
+
+GOAL_FIELDS = ('id', 'title', 'description', 'category', 'status', 'priority', 'due_date', 'username', 'created', 'updated')
+COMMENT_FIELDS = ('id', 'goal', 'username', 'text', 'created', 'updated')
+CONTENT_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+def iter_goals(goals: QuerySet) -> Iterator[dict]:
+    return goals.order_by('id').values(
+        'id', 'title', 'description', 'category', 'status', 'priority', 'due_date', 'created', 'updated',
+        username=F('user__username'),
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def iter_comments(goals: QuerySet) -> Iterator[dict]:
+    return GoalComment.objects.filter(goal__in=goals.values('id')).order_by('goal_id', 'id').values(
+        'id', 'goal', 'text', 'created', 'updated', username=F('user__username')
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def export_goals(goals: QuerySet, file_format: str, comments: bool = False) -> Iterator[str]:
+    records = iter_goals(goals)
+    if comments:
+        records = _merge(records, iter_comments(goals))
+    lines = _ndjson(records) if file_format == 'ndjson' else _csv(records, comments)
+    return _blocks(lines)
+
+
+def _merge(goals: Iterator[dict], comments: Iterator[dict]) -> Iterator[dict]:
+    groups = groupby(comments, key=lambda comment: comment['goal'])
+    goal_id, group = next(groups, (None, iter(())))
+    for goal in goals:
+        while goal_id is not None and goal_id < goal['id']:
+            goal_id, group = next(groups, (None, iter(())))
+        goal['comments'] = [
+            {name: comment[name] for name in COMMENT_FIELDS if name != 'goal'} for comment in group
+        ] if goal_id == goal['id'] else []
+        yield goal
+
+
+def _ndjson(records: Iterator[dict]) -> Iterator[str]:
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for record in records:
+        yield encoder.encode(record) + '\n'
+
+
+def _csv(records: Iterator[dict], comments: bool) -> Iterator[str]:
+    """
+    Без комментариев каждая строка - цель. С комментариями первая колонка type различает строки целей (goal) и
+    следующих за ними комментариев (comment), набор колонок общий.
+    """
+    buffer, encoder = _Echo(), DjangoJSONEncoder()
+    if not comments:
+        writer = csv.DictWriter(buffer, GOAL_FIELDS, extrasaction='ignore')
+        yield writer.writeheader()
+        for record in records:
+            yield writer.writerow(_csv_values(record, encoder))
+        return
+
+    writer = csv.DictWriter(buffer, ('type', *GOAL_FIELDS, 'goal', 'text'), extrasaction='ignore')
+    yield writer.writeheader()
+    for record in records:
+        yield writer.writerow({'type': 'goal', **_csv_values(record, encoder)})
+        for comment in record['comments']:
+            yield writer.writerow({'type': 'comment', 'goal': record['id'], **_csv_values(comment, encoder)})
+
+
+def _csv_values(record: dict, encoder: DjangoJSONEncoder) -> dict:
+    """
+    Даты записываются в ISO 8601 так же, как в NDJSON, а не через str(), чтобы импорт разбирал оба формата одинаково.
+    """
+    return {
+        name: encoder.default(value) if isinstance(value, (datetime.date, datetime.time)) else value
+        for name, value in record.items()
+    }
+
+
+def _blocks(lines: Iterator[str]) -> Iterator[str]:
+    """
+    Объединяет строки в блоки около BLOCK_SIZE символов, чтобы не отправлять клиенту каждую строку отдельно.
+    """
+    block, size = [], 0
+    for line in lines:
+        block.append(line)
+        size += len(line)
+        if size >= BLOCK_SIZE:
+            yield ''.join(block)
+            block, size = [], 0
+    if block:
+        yield ''.join(block)
+
+
+class _Echo:
+    """
+    Псевдо-файл для csv.writer: writerow возвращает записанную строку вместо записи в буфер.
+    """
+    def write(self, value: str) -> str:
+        return value
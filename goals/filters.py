@@ -1,8 +1,19 @@
+import operator
+import re
+from functools import reduce
+
 import django_filters
-from django.db import models
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            TrigramSimilarity)
+from django.db import connections, models
+from django.db.models import Case, F, Q, QuerySet, Value, When
+from django.db.models.functions import Upper
 from django_filters import rest_framework
+from rest_framework import filters
+from rest_framework.settings import api_settings
 
-from goals.models import Goal
+from goals.models import Goal, GoalCategory
+from goals.pagination import KeysetPagination
 
 
 class GoalDateFilter(rest_framework.FilterSet):
@@ -21,3 +32,64 @@ class GoalDateFilter(rest_framework.FilterSet):
     filter_overrides = {
         models.DateTimeField: {'filter_class': django_filters.IsoDateTimeFilter},
     }
+
+
+class GoalCategoryFilter(rest_framework.FilterSet):
+    """
+    Осуществляет фильтрацию категорий по доске и автору категории.
+    """
+    class Meta:
+        model = GoalCategory
+        fields = {
+            'board': ('exact', 'in'),
+            'user': ('exact', 'in'),
+        }
+
+
+class GoalSearchFilter(filters.SearchFilter):
+    """
+    Полнотекстовый поиск по целям (параметр ?search=) на PostgreSQL: по колонке search_vector с GIN-индексом, в русской
+    и английской конфигурациях, с префиксным совпадением слов. Если сортировка не задана явно и не используется
+    курсорная пагинация, результаты упорядочиваются по релевантности. На других СУБД используется стандартный
+    SearchFilter по search_fields представления.
+    """
+    search_configs = ('russian', 'english')
+    rank_weights = [0.1, 0.2, 0.4, 1.0]
+
+    def filter_queryset(self, request, queryset: QuerySet, view) -> QuerySet:
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        words = [word for term in self.get_search_terms(request) for word in re.findall(r'\w+', term)]
+        if not words:
+            return queryset
+
+        raw_query = ' & '.join(f'{word}:*' for word in words)
+        query = reduce(operator.or_, (
+            SearchQuery(raw_query, config=config, search_type='raw') for config in self.search_configs
+        ))
+        queryset = queryset.filter(search_vector=query)
+
+        if not {api_settings.ORDERING_PARAM, KeysetPagination.cursor_query_param} & request.query_params.keys():
+            queryset = queryset.annotate(
+                search_rank=SearchRank(F('search_vector'), query, weights=self.rank_weights)
+            ).order_by('-search_rank', 'id')
+        return queryset
+
+
+def autocomplete(queryset: QuerySet, query: str, limit: int) -> QuerySet:
+    """
+    Подбирает до limit записей, название которых начинается с query или похоже на него с учетом опечаток. На PostgreSQL
+    оба условия проверяются по GIN-индексу pg_trgm на UPPER(title): сначала идут совпадения по префиксу, затем по
+    убыванию триграммного сходства. На других СУБД используется поиск подстроки без учета регистра.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.filter(title__icontains=query).order_by('title', 'id')[:limit]
+
+    query = query.upper()
+    return queryset.annotate(upper_title=Upper('title')).filter(
+        Q(upper_title__startswith=query) | Q(upper_title__trigram_similar=query)
+    ).annotate(
+        is_prefix=Case(When(upper_title__startswith=query, then=Value(1)), default=Value(0)),
+        similarity=TrigramSimilarity('upper_title', query),
+    ).order_by('-is_prefix', '-similarity', 'title', 'id')[:limit]
@@ -0,0 +1,217 @@
+"""
+Импорт целей и комментариев из NDJSON или CSV (формат выгрузки goals.export) через COPY FROM STDIN.
+
+Файл читается потоково порциями по IMPORT_CHUNK_SIZE целей. Строки порции проверяются сериализатором без обращений
+к БД, затем категории и авторы всей порции выбираются двумя запросами, а роли пользователя берутся из кэша участия в
+досках (goals.membership). Id новых целей выделяются заранее из последовательности таблицы, поэтому комментарии
+загружаются тем же COPY без чтения вставленных целей. Весь импорт выполняется в одной транзакции: при ошибке хотя бы
+в одной строке ничего не сохраняется, а проверка продолжается, чтобы вернуть ошибки всех строк.
+"""
+import csv
+import json
+import time
+from collections.abc import Iterable, Iterator
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import (ErrorDetail, PermissionDenied,
+                                       ValidationError)
+
+from core.models import User
+from goals import membership
+from goals.models import BoardParticipant, Goal, GoalCategory, GoalComment
+from goals.permissions import EDITOR_ROLES
+from goals.pgcopy import COMMENT_COLUMNS, GOAL_COLUMNS, allocate_ids, copy_rows
+from goals.serializers import GoalImportSerializer
+
+IMPORT_CHUNK_SIZE = 5000
+MAX_ERRORS = 1000
+
+
+class RowError(Exception):
+    def __init__(self, errors: dict):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def read_records(lines: Iterable[str], file_format: str) -> Iterator[tuple[int, dict | RowError]]:
+    return read_ndjson(lines) if file_format == 'ndjson' else read_csv(lines)
+
+
+def read_ndjson(lines: Iterable[str]) -> Iterator[tuple[int, dict | RowError]]:
+    """
+    Возвращает пары (номер строки, запись), пустые строки пропускаются.
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            record = RowError({'non_field_errors': [ErrorDetail(f'Invalid JSON: {error}', code='parse_error')]})
+        if not isinstance(record, dict | RowError):
+            record = RowError({'non_field_errors': [ErrorDetail('Expected a JSON object', code='invalid')]})
+        yield number, record
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[tuple[int, dict | RowError]]:
+    """
+    Возвращает пары (номер строки, запись). Если в файле есть колонка type, строки comment присоединяются к
+    предшествующей строке goal как комментарии. Пустые ячейки считаются непереданными полями.
+    """
+    reader = csv.DictReader(lines)
+    current = None
+    for row in reader:
+        record = {name: value for name, value in row.items() if name is not None and value not in ('', None)}
+        if record.pop('type', 'goal') != 'comment':
+            if current is not None:
+                yield current
+            current = (reader.line_num, record)
+        elif current is None:
+            yield reader.line_num, RowError({'type': [ErrorDetail('Comment before any goal', code='invalid')]})
+        else:
+            current[1].setdefault('comments', []).append(record)
+    if current is not None:
+        yield current
+
+
+class GoalImporter:
+    """
+    Проверяет и загружает записи от имени пользователя user: категории должны быть в досках, где у него роль
+    "владелец" или "редактор", авторы целей и комментариев (username, по умолчанию user) - участники той же доски.
+    """
+    serializer_class = GoalImportSerializer
+
+    def __init__(self, user: User, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.user = user
+        self.chunk_size = chunk_size
+        self.roles = membership.get_board_roles(user.id)
+        self.categories: dict[int, int | None] = {}
+        self.members: dict[int, dict[str, int]] = {}
+        self.serializer = self.serializer_class()
+        self.errors: list[dict] = []
+        self.goals = self.comments = 0
+
+    def run(self, records: Iterable[tuple[int, dict | RowError]]) -> dict:
+        """
+        Загружает записи и возвращает статистику: число загруженных целей и комментариев (0, если были ошибки),
+        ошибки по строкам, время и скорость загрузки в записях в секунду.
+        """
+        start = time.perf_counter()
+        with transaction.atomic():
+            for chunk in _chunks(records, self.chunk_size):
+                rows = self.validate(chunk)
+                if not self.errors:
+                    self.load(rows)
+                if len(self.errors) >= MAX_ERRORS:
+                    break
+            if self.errors:
+                transaction.set_rollback(True)
+                self.goals = self.comments = 0
+
+        seconds = time.perf_counter() - start
+        return {
+            'goals': self.goals,
+            'comments': self.comments,
+            'errors': self.errors[:MAX_ERRORS],
+            'seconds': round(seconds, 3),
+            'rows_per_second': round((self.goals + self.comments) / seconds) if seconds else 0,
+        }
+
+    def validate(self, chunk: list[tuple[int, dict | RowError]]) -> list[dict]:
+        parsed = []
+        for number, record in chunk:
+            try:
+                if isinstance(record, RowError):
+                    raise record
+                parsed.append((number, self._parse(record)))
+            except RowError as error:
+                self.errors.append({'line': number, 'errors': error.errors})
+
+        self._resolve([data for _, data in parsed])
+        rows = []
+        for number, data in parsed:
+            try:
+                rows.append(self._check(data))
+            except RowError as error:
+                self.errors.append({'line': number, 'errors': error.errors})
+        return rows
+
+    def load(self, rows: list[dict]) -> None:
+        now = timezone.now()
+        goal_ids = allocate_ids(Goal, len(rows))
+        goals, comments = [], []
+        for goal_id, data in zip(goal_ids, rows):
+            goals.append((
+                goal_id, data['title'], data.get('description'), data['category'], data['board'], data['user'],
+                data.get('status', Goal.Status.to_do), data.get('priority', Goal.Priority.medium),
+                data.get('due_date'), now, now,
+            ))
+            comments.extend(
+                (goal_id, data['board'], comment['user'], comment['text'], now, now)
+                for comment in data.get('comments', ())
+            )
+        comment_ids = allocate_ids(GoalComment, len(comments))
+        copy_rows(Goal, GOAL_COLUMNS, goals)
+        copy_rows(GoalComment, COMMENT_COLUMNS, [(comment_id, *comment) for comment_id, comment in zip(comment_ids, comments)])
+        self.goals += len(goals)
+        self.comments += len(comments)
+
+    def _parse(self, record: dict) -> dict:
+        try:
+            return self.serializer.run_validation(record)
+        except ValidationError as error:
+            raise RowError(error.detail)
+
+    def _resolve(self, rows: list[dict]) -> None:
+        """
+        Выбирает категории и участников досок, которых еще нет в кэше импорта, двумя запросами на порцию.
+        """
+        category_ids = {data['category'] for data in rows} - self.categories.keys()
+        self.categories.update(dict.fromkeys(category_ids))
+        self.categories.update(GoalCategory.objects.filter(
+            id__in=category_ids, is_deleted=False, board__is_deleted=False,
+        ).values_list('id', 'board_id'))
+
+        board_ids = {self.categories[data['category']] for data in rows} - self.members.keys() - {None}
+        for board_id in board_ids:
+            self.members[board_id] = {}
+        for board_id, username, user_id in BoardParticipant.objects.filter(board_id__in=board_ids).values_list(
+            'board_id', 'user__username', 'user_id'
+        ):
+            self.members[board_id][username] = user_id
+
+    def _check(self, data: dict) -> dict:
+        board_id = self.categories[data['category']]
+        if board_id is None:
+            raise RowError({'category': [ErrorDetail('Category not found', code='does_not_exist')]})
+        if self.roles.get(board_id) not in EDITOR_ROLES:
+            raise RowError({'detail': PermissionDenied.default_detail})
+
+        data['board'] = board_id
+        data['user'] = self._get_member(board_id, data.get('username'), 'username')
+        for comment in data.get('comments', ()):
+            comment['user'] = self._get_member(board_id, comment.get('username'), 'comments')
+        return data
+
+    def _get_member(self, board_id: int, username: str | None, field: str) -> int:
+        user_id = self.members[board_id].get(username or self.user.username)
+        if user_id is None:
+            raise RowError({field: [ErrorDetail(f'User "{username}" is not a board participant', code='invalid')]})
+        return user_id
+
+
+def import_goals(user: User, records: Iterable[tuple[int, dict | RowError]],
+                 chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    return GoalImporter(user, chunk_size).run(records)
+
+
+def _chunks(records: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
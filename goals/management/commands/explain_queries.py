@@ -0,0 +1,109 @@
+import re
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, QuerySet
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from core.models import User
+from goals.dataset import seed_board, seed_user
+from goals.models import BoardParticipant
+from goals.views import (BoardListView, GoalCategoryListView,
+                         GoalCommentListView, GoalListView)
+
+LIST_VIEWS = (BoardListView, GoalCategoryListView, GoalListView, GoalCommentListView)
+PAGE_SIZE = 50
+
+
+class Command(BaseCommand):
+    """
+    Выводит планы выполнения (EXPLAIN ANALYZE, BUFFERS) для запросов списков из goals/views.py и проверок прав из
+    goals/permissions.py. С опцией --seed-goals запросы выполняются на синтетических данных, которые создаются в
+    транзакции и откатываются после замера.
+    """
+    help = 'Print EXPLAIN (ANALYZE, BUFFERS) plans for the goals list views and permission checks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help='Пользователь, от имени которого строятся запросы')
+        parser.add_argument('--seed-goals', type=int, default=0, help='Число целей в синтетических данных')
+        parser.add_argument('--seed-boards', type=int, default=10, help='Число досок в синтетических данных')
+        parser.add_argument(
+            '--fail-on-seq-scan', action='store_true',
+            help='Завершиться с ошибкой, если в плане есть Seq Scan по таблицам goals',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('EXPLAIN (ANALYZE, BUFFERS) requires PostgreSQL')
+
+        with transaction.atomic():
+            if options['seed_goals']:
+                user = self.seed(options['seed_goals'], options['seed_boards'])
+            else:
+                user = self.get_user(options['username'])
+
+            plans = self.explain_all(user)
+            transaction.set_rollback(bool(options['seed_goals']))
+
+        seq_scans = []
+        for name, plan in plans.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan + '\n')
+            seq_scans += [f'{name}: {table}' for table in re.findall(r'Seq Scan on (goals_\w+)', plan)]
+
+        if seq_scans and options['fail_on_seq_scan']:
+            raise CommandError('Sequential scans found:\n' + '\n'.join(seq_scans))
+
+    def get_user(self, username: str | None) -> User:
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f'User "{username}" does not exist')
+
+        participant = BoardParticipant.objects.values('user_id').order_by().annotate(
+            boards=Count('board_id')
+        ).order_by('-boards').first()
+        if participant is None:
+            raise CommandError('No board participants found, use --seed-goals to generate data')
+        return User.objects.get(pk=participant['user_id'])
+
+    def seed(self, goals: int, boards: int) -> User:
+        """
+        Создает boards досок с разными владельцами. Пользователь, от имени которого строятся планы, участвует
+        только в первой доске, поэтому фильтрация по участникам остается селективной.
+        """
+        owners = [seed_user(f'explain-{i}') for i in range(boards)]
+        for i, owner in enumerate(owners):
+            seed_board(owner, categories=20, goals=goals // boards, comments=goals // boards, seed=i)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        return owners[0]
+
+    def explain_all(self, user: User) -> dict[str, str]:
+        plans = {view.__name__: explain(get_view_queryset(view, user)[:PAGE_SIZE]) for view in LIST_VIEWS}
+
+        board_id = BoardParticipant.objects.filter(user=user).values_list('board_id', flat=True).first()
+        plans['BoardParticipant (permissions)'] = explain(BoardParticipant.objects.filter(
+            user_id=user.id,
+            board_id=board_id,
+            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
+        ).values('id')[:1])
+        return plans
+
+
+def get_view_queryset(view_class, user: User) -> QuerySet:
+    """
+    Возвращает queryset представления списка с примененными фильтрами и сортировкой по умолчанию, как для GET-запроса
+    без параметров.
+    """
+    request = Request(RequestFactory().get('/'))
+    request.user = user
+    view = view_class(request=request, args=(), kwargs={}, format_kwarg=None)
+    return view.filter_queryset(view.get_queryset())
+
+
+def explain(queryset: QuerySet) -> str:
+    return queryset.explain(analyze=True, buffers=True)
@@ -0,0 +1,49 @@
+import time
+from contextlib import nullcontext
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+
+from goals.dataset import CHUNK_SIZE, DatasetGenerator, deferred_indexes
+from goals.models import Goal, GoalComment
+
+
+class Command(BaseCommand):
+    """
+    Генерирует синтетический набор данных производственного объема для профилирования: пользователей, доски со
+    степенным распределением участников, категории, цели и комментарии. С одинаковым --seed на пустой базе данные
+    воспроизводятся.
+    """
+    help = 'Generate a reproducible production-scale dataset of users, boards, goals and comments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--boards', type=int, default=20_000)
+        parser.add_argument('--categories', type=int, default=5, help='Среднее число категорий в доске')
+        parser.add_argument('--goals', type=int, default=1_000_000)
+        parser.add_argument('--comments-per-goal', type=float, default=1.0, help='Среднее число комментариев к цели')
+        parser.add_argument('--max-participants', type=int, default=200)
+        parser.add_argument('--prefix', default='user', help='Префикс имен пользователей')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Число целей в одном COPY')
+        parser.add_argument(
+            '--defer-indexes', action='store_true',
+            help='Удалить индексы целей и комментариев на время загрузки и построить их заново после нее',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('COPY requires PostgreSQL')
+        if options['users'] < 1 or options['boards'] < 1 or options['categories'] < 1:
+            raise CommandError('--users, --boards and --categories must be positive')
+
+        start = time.perf_counter()
+        generator = DatasetGenerator(options['seed'], options['chunk_size'], log=self.stdout.write)
+        generator.create_users(options['users'], options['prefix'])
+        generator.create_boards(options['boards'], options['categories'], options['max_participants'])
+        with deferred_indexes(Goal, GoalComment) if options['defer_indexes'] else nullcontext():
+            generator.create_goals(options['goals'], options['comments_per_goal'])
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(self.style.SUCCESS(f'Done in {time.perf_counter() - start:.1f} s'))
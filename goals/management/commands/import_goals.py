@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+from django.core.management import BaseCommand, CommandError
+
+from core.models import User
+from goals.importer import IMPORT_CHUNK_SIZE, import_goals, read_records
+
+
+class Command(BaseCommand):
+    """
+    Загружает цели и комментарии из файла NDJSON или CSV (формат выгрузки goals/goal/export) от имени пользователя
+    --user. Файл проверяется целиком: при ошибках выводятся номера строк и ничего не сохраняется.
+    """
+    help = 'Import goals and comments from an NDJSON or CSV file using COPY'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу, "-" - стандартный ввод')
+        parser.add_argument('--user', required=True, help='Имя пользователя, от имени которого выполняется импорт')
+        parser.add_argument('--format', dest='file_format', choices=('ndjson', 'csv'),
+                            help='Формат файла, по умолчанию определяется по расширению')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["user"]}" does not exist')
+
+        path = options['path']
+        file_format = options['file_format'] or ('csv' if path.endswith('.csv') else 'ndjson')
+        try:
+            if path == '-':
+                result = import_goals(user, read_records(sys.stdin, file_format), options['chunk_size'])
+            else:
+                with Path(path).open(encoding='utf-8-sig', newline='') as file:
+                    result = import_goals(user, read_records(file, file_format), options['chunk_size'])
+        except UnicodeDecodeError as error:
+            raise CommandError(f'File is not UTF-8 encoded: {error.reason}')
+
+        for error in result['errors']:
+            self.stderr.write(f'Line {error["line"]}: {error["errors"]}')
+        if result['errors']:
+            raise CommandError(f'{len(result["errors"])} invalid rows, nothing imported')
+        self.stdout.write(
+            f'Imported {result["goals"]} goals and {result["comments"]} comments in {result["seconds"]:.2f} s '
+            f'({result["rows_per_second"]} rows/s)'
+        )
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from goals.models import Tombstone
+
+
+class Command(BaseCommand):
+    """
+    Удаляет записи об удаленных объектах старше GOALS_SYNC_TOMBSTONE_DAYS дней. Клиенты с курсором старше этого срока
+    получают ответ 410 и загружают доску полностью.
+    """
+    help = 'Delete sync tombstones older than GOALS_SYNC_TOMBSTONE_DAYS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.GOALS_SYNC_TOMBSTONE_DAYS, help='Срок хранения, дни')
+
+    def handle(self, *args, **options):
+        deleted, _ = Tombstone.objects.filter(deleted__lt=timezone.now() - timedelta(days=options['days'])).delete()
+        self.stdout.write(f'Deleted {deleted} tombstones')
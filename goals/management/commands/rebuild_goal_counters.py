@@ -0,0 +1,24 @@
+from django.core.management import BaseCommand
+
+from goals.models import Board
+from goals.stats import reconcile_counters
+
+
+class Command(BaseCommand):
+    """
+    Пересчитывает счетчики целей досок (GoalCounter, GoalDueCounter) по самим целям и исправляет расходящиеся, например
+    после изменения целей в обход триггеров. Доски обрабатываются порциями, каждая - в своей транзакции.
+    """
+    help = 'Rebuild board goal counters from goals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--board', type=int, nargs='+', help='Id досок, по умолчанию все доски')
+        parser.add_argument('--chunk-size', type=int, default=100, help='Число досок в одной транзакции')
+
+    def handle(self, *args, **options):
+        board_ids = options['board'] or list(Board.objects.order_by('id').values_list('id', flat=True))
+        size = options['chunk_size']
+        changed = set()
+        for start in range(0, len(board_ids), size):
+            changed |= reconcile_counters(board_ids[start:start + size])
+        self.stdout.write(f'Checked {len(board_ids)} boards, rebuilt counters of {len(changed)}')
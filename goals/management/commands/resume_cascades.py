@@ -0,0 +1,24 @@
+from django.core.management import BaseCommand
+
+from goals.cascade import run_job
+from goals.models import CascadeJob
+
+
+class Command(BaseCommand):
+    """
+    Продолжает незавершенные фоновые каскады удаления досок и категорий, например после перезапуска приложения,
+    прервавшего поток каскада. Задачи продолжаются с сохраненной позиции.
+    """
+    help = 'Resume unfinished board and category cascade jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retry-failed', action='store_true', help='Повторить также задачи, завершенные с ошибкой')
+
+    def handle(self, *args, **options):
+        statuses = [CascadeJob.Status.pending, CascadeJob.Status.running]
+        if options['retry_failed']:
+            statuses.append(CascadeJob.Status.failed)
+
+        for job_id in CascadeJob.objects.filter(status__in=statuses).order_by('id').values_list('id', flat=True):
+            job = run_job(job_id)
+            self.stdout.write(f'Cascade job {job.id}: {job.get_status_display()}, {job.processed}/{job.total}')
@@ -0,0 +1,104 @@
+"""
+Кэш участия пользователей в досках: для каждого пользователя хранится словарь {board_id: role} по неудаленным доскам.
+
+Ключ словаря содержит версию пользователя. При изменении участников версия заменяется новой (invalidate), и старый
+словарь становится недостижим и истекает по таймауту. Попадания и промахи считаются метрикой cache_requests_total
+(core.metrics).
+"""
+import time
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+
+from core.metrics import CACHE_REQUESTS
+from goals.models import BoardParticipant, CascadeJob, Goal
+
+
+def _version_key(user_id: int) -> str:
+    return f'goals:membership:version:{user_id}'
+
+
+def _roles_key(user_id: int, version: int) -> str:
+    return f'goals:membership:{user_id}:{version}'
+
+
+def _get_version(user_id: int) -> int:
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def get_board_roles(user_id: int) -> dict[int, int]:
+    """
+    Возвращает роли пользователя в неудаленных досках: {board_id: role}. При GOALS_MEMBERSHIP_CACHE_TIMEOUT = 0 роли
+    выбираются из БД без кэша.
+    """
+    if not settings.GOALS_MEMBERSHIP_CACHE_TIMEOUT:
+        return _select_roles(user_id)
+
+    key = _roles_key(user_id, _get_version(user_id))
+    roles = cache.get(key)
+    if roles is not None:
+        CACHE_REQUESTS.inc(cache='membership', result='hit')
+        return roles
+
+    CACHE_REQUESTS.inc(cache='membership', result='miss')
+    roles = _select_roles(user_id)
+    cache.set(key, roles, settings.GOALS_MEMBERSHIP_CACHE_TIMEOUT)
+    return roles
+
+
+def _select_roles(user_id: int) -> dict[int, int]:
+    return dict(BoardParticipant.objects.filter(
+        user_id=user_id,
+        board__is_deleted=False,
+    ).values_list('board_id', 'role'))
+
+
+def get_board_ids(user_id: int) -> list[int]:
+    return list(get_board_roles(user_id))
+
+
+def get_visible_goals(user_id: int) -> QuerySet[Goal]:
+    """
+    Возвращает цели, которые пользователь видит в списках: неархивные цели его досок. Цели удаленной категории
+    скрываются до завершения фонового каскада (goals.cascade) подзапросом к его задачам, без соединения с категориями.
+    """
+    return Goal.objects.filter(
+        board_id__in=get_board_ids(user_id),
+    ).exclude(
+        status=Goal.Status.archived
+    ).exclude(
+        category_id__in=CascadeJob.get_pending_category_ids()
+    )
+
+
+def invalidate(user_ids: Iterable[int]) -> None:
+    """
+    Сбрасывает кэш участия для пользователей сразу и еще раз после фиксации текущей транзакции, чтобы параллельный
+    запрос не закэшировал данные, прочитанные до коммита.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+
+    def bump():
+        version = time.time_ns()
+        cache.set_many({_version_key(user_id): version for user_id in user_ids}, None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def get_stats() -> dict[str, int]:
+    return {
+        'hits': int(CACHE_REQUESTS.get(cache='membership', result='hit')),
+        'misses': int(CACHE_REQUESTS.get(cache='membership', result='miss')),
+    }
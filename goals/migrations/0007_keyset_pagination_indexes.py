@@ -0,0 +1,33 @@
+# Generated by Django 4.1.13 on 2026-10-18 05:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0006_alter_goalcategory_board'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['title', 'id'], name='goal_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['created', 'id'], name='goal_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcategory',
+            index=models.Index(fields=['title', 'id'], name='goalcategory_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcategory',
+            index=models.Index(fields=['created', 'id'], name='goalcategory_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcomment',
+            index=models.Index(fields=['created', 'id'], name='goalcomment_created_id_idx'),
+        ),
+    ]
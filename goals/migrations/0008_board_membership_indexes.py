@@ -0,0 +1,33 @@
+# Generated by Django 4.1.13 on 2026-10-18 05:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0007_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='boardparticipant',
+            index=models.Index(fields=['user', 'board'], include=('role',), name='participant_user_board_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['category', 'status'], name='goal_category_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['due_date'], name='goal_due_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcategory',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['board'], name='goalcategory_board_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcomment',
+            index=models.Index(fields=['goal', 'created'], name='goalcomment_goal_created_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations, transaction
+from django.db.models import Max, Min, OuterRef, Subquery
+
+BATCH_SIZE = 10_000
+
+
+def backfill(model, source_model, source_field: str) -> None:
+    """
+    Заполняет board_id пачками по диапазонам id, каждая пачка - в отдельной транзакции, чтобы не держать блокировки
+    на всей таблице.
+    """
+    bounds = model.objects.aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return
+
+    board = Subquery(source_model.objects.filter(id=OuterRef(f'{source_field}_id')).values('board_id')[:1])
+    for low in range(bounds['low'], bounds['high'] + 1, BATCH_SIZE):
+        with transaction.atomic():
+            model.objects.filter(id__gte=low, id__lt=low + BATCH_SIZE, board__isnull=True).update(board_id=board)
+
+
+def forwards(apps, schema_editor):
+    Goal = apps.get_model('goals', 'Goal')
+    backfill(Goal, apps.get_model('goals', 'GoalCategory'), 'category')
+    backfill(apps.get_model('goals', 'GoalComment'), Goal, 'goal')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('goals', '0009_goal_board_goalcomment_board'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.1.13 on 2026-10-18 05:51
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0011_alter_goal_board_alter_goalcomment_board'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='goal_search_vector_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.db import migrations, transaction
+from django.db.models import Max, Min
+
+BATCH_SIZE = 10_000
+
+# Русская и английская конфигурации: контент смешанный, каждое слово индексируется в обоих вариантах нормализации
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('russian', coalesce({table}title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({table}title, '')), 'A') ||
+    setweight(to_tsvector('russian', coalesce({table}description, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({table}description, '')), 'B')
+"""
+
+CREATE_TRIGGER_SQL = f"""
+CREATE OR REPLACE FUNCTION goals_goal_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR_SQL.format(table='NEW.')};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goal_search_vector_trigger
+BEFORE INSERT OR UPDATE OF title, description ON goals_goal
+FOR EACH ROW EXECUTE FUNCTION goals_goal_search_vector_update();
+"""
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS goals_goal_search_vector_trigger ON goals_goal;
+DROP FUNCTION IF EXISTS goals_goal_search_vector_update();
+"""
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute(CREATE_TRIGGER_SQL)
+
+    Goal = apps.get_model('goals', 'Goal')
+    bounds = Goal.objects.aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return
+
+    update_sql = f'UPDATE goals_goal SET search_vector = {SEARCH_VECTOR_SQL.format(table="")} WHERE id >= %s AND id < %s'
+    for low in range(bounds['low'], bounds['high'] + 1, BATCH_SIZE):
+        with transaction.atomic():
+            schema_editor.execute(update_sql, (low, low + BATCH_SIZE))
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_TRIGGER_SQL)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('goals', '0012_goal_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.1.13 on 2026-10-18 06:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0014_title_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CascadeJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата последнего обновления')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Ожидает'), (2, 'Выполняется'), (3, 'Завершен'), (4, 'Ошибка')], default=1, verbose_name='Статус')),
+                ('step', models.PositiveSmallIntegerField(default=0, verbose_name='Шаг')),
+                ('last_id', models.BigIntegerField(default=0, verbose_name='Последний обработанный id')),
+                ('total', models.PositiveIntegerField(blank=True, null=True, verbose_name='Всего записей')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Обработано записей')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='cascade_jobs', to='goals.board', verbose_name='Доска')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='cascade_jobs', to='goals.goalcategory', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Каскадное удаление',
+                'verbose_name_plural': 'Каскадные удаления',
+                'indexes': [models.Index(fields=['status', 'category'], name='cascadejob_status_category_idx')],
+            },
+        ),
+    ]
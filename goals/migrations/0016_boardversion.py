@@ -0,0 +1,25 @@
+# Generated by Django 4.1.13 on 2026-10-18 06:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0015_cascade_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardVersion',
+            fields=[
+                ('board', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='version', serialize=False, to='goals.board', verbose_name='Доска')),
+                ('version', models.BigIntegerField(default=0, verbose_name='Версия')),
+            ],
+            options={
+                'verbose_name': 'Версия доски',
+                'verbose_name_plural': 'Версии досок',
+            },
+        ),
+    ]
@@ -0,0 +1,121 @@
+from django.db import migrations
+
+# Версия увеличивается один раз на оператор для каждой затронутой доски (триггеры уровня оператора с таблицами
+# переходов), поэтому пакетные изменения целей одной доски обновляют одну строку goals_boardversion. Доски
+# блокируются в порядке id, чтобы параллельные пакеты не взаимоблокировались.
+BUMP_SQL = """
+INSERT INTO goals_boardversion (board_id, version)
+SELECT DISTINCT board_id, 1 FROM ({boards}) AS boards ORDER BY board_id
+ON CONFLICT (board_id) DO UPDATE SET version = goals_boardversion.version + 1
+"""
+
+# Колонка доски передается аргументом триггера: board_id, для самой доски - id
+BOARD_ID_SQL = "'SELECT ' || quote_ident(TG_ARGV[0]) || ' AS board_id FROM {rows}'"
+
+BUMP_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION goals_board_version_bump() RETURNS trigger AS $$
+DECLARE
+    boards text := CASE TG_OP
+        WHEN 'INSERT' THEN {BOARD_ID_SQL.format(rows='new_rows')}
+        WHEN 'DELETE' THEN {BOARD_ID_SQL.format(rows='old_rows')}
+        ELSE {BOARD_ID_SQL.format(rows='new_rows')} || ' UNION ALL ' || {BOARD_ID_SQL.format(rows='old_rows')}
+    END;
+BEGIN
+    EXECUTE replace($sql${BUMP_SQL}$sql$, '{{boards}}', boards);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+# Профиль автора выводится в списке категорий, имя пользователя - в участниках доски
+CHANGED_USERS_SQL = """
+SELECT new_rows.id FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id
+WHERE (new_rows.username, new_rows.first_name, new_rows.last_name, new_rows.email)
+    IS DISTINCT FROM (old_rows.username, old_rows.first_name, old_rows.last_name, old_rows.email)
+"""
+
+USER_BOARDS_SQL = f"""
+SELECT board_id FROM goals_goalcategory WHERE user_id IN ({CHANGED_USERS_SQL})
+UNION ALL
+SELECT board_id FROM goals_boardparticipant WHERE user_id IN ({CHANGED_USERS_SQL})
+"""
+
+USER_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION goals_board_version_user_update() RETURNS trigger AS $$
+BEGIN
+    {BUMP_SQL.format(boards=USER_BOARDS_SQL)};
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+TABLES = {
+    'goals_board': 'id',
+    'goals_boardparticipant': 'board_id',
+    'goals_goalcategory': 'board_id',
+    'goals_goal': 'board_id',
+}
+
+# Таблицы переходов нельзя задать для триггера с несколькими событиями: по триггеру на событие
+TRIGGER_SQL = {
+    'insert': 'AFTER INSERT ON {table} REFERENCING NEW TABLE AS new_rows',
+    'update': 'AFTER UPDATE ON {table} REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'delete': 'AFTER DELETE ON {table} REFERENCING OLD TABLE AS old_rows',
+}
+
+
+# Удаление доски версию не увеличивает: строка goals_boardversion удаленной доски удаляется вместе с ней, а вставка
+# новой строки нарушила бы внешний ключ при фиксации транзакции
+SKIPPED_TRIGGERS = {('goals_board', 'delete')}
+
+
+def create_sql() -> list[str]:
+    statements = [BUMP_FUNCTION_SQL, USER_FUNCTION_SQL]
+    for table, column in TABLES.items():
+        for event, sql in TRIGGER_SQL.items():
+            if (table, event) in SKIPPED_TRIGGERS:
+                continue
+            statements.append(
+                f'CREATE TRIGGER {table}_version_{event} {sql.format(table=table)} '
+                f"FOR EACH STATEMENT EXECUTE FUNCTION goals_board_version_bump('{column}')"
+            )
+    statements.append(
+        f"CREATE TRIGGER core_user_board_version_update {TRIGGER_SQL['update'].format(table='core_user')} "
+        'FOR EACH STATEMENT EXECUTE FUNCTION goals_board_version_user_update()'
+    )
+    return statements
+
+
+def drop_sql() -> list[str]:
+    statements = ['DROP TRIGGER IF EXISTS core_user_board_version_update ON core_user']
+    for table in TABLES:
+        statements.extend(f'DROP TRIGGER IF EXISTS {table}_version_{event} ON {table}' for event in TRIGGER_SQL)
+    statements.extend([
+        'DROP FUNCTION IF EXISTS goals_board_version_user_update()',
+        'DROP FUNCTION IF EXISTS goals_board_version_bump()',
+    ])
+    return statements
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in create_sql():
+            schema_editor.execute(sql)
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in drop_sql():
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('goals', '0016_boardversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
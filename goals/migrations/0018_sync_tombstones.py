@@ -0,0 +1,57 @@
+# Generated by Django 4.1.13 on 2026-10-18 07:06
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0017_board_version_triggers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('participant', 'Участник'), ('category', 'Категория'), ('goal', 'Цель'), ('comment', 'Комментарий')], max_length=16, verbose_name='Тип объекта')),
+                ('object_id', models.BigIntegerField(verbose_name='Id объекта')),
+                ('deleted', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата удаления')),
+            ],
+            options={
+                'verbose_name': 'Удаленный объект',
+                'verbose_name_plural': 'Удаленные объекты',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='boardparticipant',
+            index=models.Index(fields=['board', 'updated', 'id'], name='participant_board_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['board', 'updated', 'id'], name='goal_board_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcategory',
+            index=models.Index(fields=['board', 'updated', 'id'], name='goalcategory_board_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcomment',
+            index=models.Index(fields=['board', 'updated', 'id'], name='goalcomment_board_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='board',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['board', 'deleted', 'id'], name='tombstone_board_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted'], name='tombstone_deleted_idx'),
+        ),
+    ]
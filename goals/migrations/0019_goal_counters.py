@@ -0,0 +1,51 @@
+# Generated by Django 4.1.13 on 2026-10-18 07:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0018_sync_tombstones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoalDueCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('due', models.DateField(verbose_name='День дедлайна')),
+                ('count', models.IntegerField(default=0, verbose_name='Число целей')),
+                ('board', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='goals.board', verbose_name='Доска')),
+                ('category', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='goals.goalcategory', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Счетчик целей по дедлайну',
+                'verbose_name_plural': 'Счетчики целей по дедлайну',
+            },
+        ),
+        migrations.CreateModel(
+            name='GoalCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'К выполнению'), (2, 'В процессе'), (3, 'Выполнено'), (4, 'Архив')], verbose_name='Статус')),
+                ('priority', models.PositiveSmallIntegerField(choices=[(1, 'Низкий'), (2, 'Средний'), (3, 'Высокий'), (4, 'Критический')], verbose_name='Приоритет')),
+                ('count', models.IntegerField(default=0, verbose_name='Число целей')),
+                ('board', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='goals.board', verbose_name='Доска')),
+                ('category', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='goals.goalcategory', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Счетчик целей',
+                'verbose_name_plural': 'Счетчики целей',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='goalduecounter',
+            constraint=models.UniqueConstraint(fields=('board', 'category', 'due'), name='goalduecounter_key_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='goalcounter',
+            constraint=models.UniqueConstraint(fields=('board', 'category', 'status', 'priority'), name='goalcounter_key_unique'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+from django.db import migrations
+
+# Счетчики обновляются один раз на оператор по таблицам переходов: строки new_rows прибавляются, old_rows вычитаются,
+# поэтому изменение, не затрагивающее категорию, статус, приоритет и дедлайн (например, названия), счетчики не
+# меняет. Ключи вставляются по порядку, чтобы параллельные пакеты не взаимоблокировались.
+COUNTER_SQL = """
+INSERT INTO goals_goalcounter (board_id, category_id, status, priority, count)
+SELECT board_id, category_id, status, priority, sum(delta) FROM ({changes}) AS changes
+GROUP BY board_id, category_id, status, priority HAVING sum(delta) <> 0
+ORDER BY board_id, category_id, status, priority
+ON CONFLICT (board_id, category_id, status, priority) DO UPDATE SET count = goals_goalcounter.count + EXCLUDED.count
+"""
+
+# Открытые цели (1 - К выполнению, 2 - В процессе) по дню дедлайна в UTC
+DUE_COUNTER_SQL = """
+INSERT INTO goals_goalduecounter (board_id, category_id, due, count)
+SELECT board_id, category_id, (due_date AT TIME ZONE 'UTC')::date AS due, sum(delta) FROM ({changes}) AS changes
+WHERE status IN (1, 2) AND due_date IS NOT NULL
+GROUP BY board_id, category_id, due HAVING sum(delta) <> 0
+ORDER BY board_id, category_id, due
+ON CONFLICT (board_id, category_id, due) DO UPDATE SET count = goals_goalduecounter.count + EXCLUDED.count
+"""
+
+ROWS_SQL = "'SELECT board_id, category_id, status, priority, due_date, {delta} AS delta FROM {rows}'"
+
+FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION goals_goal_counters() RETURNS trigger AS $$
+DECLARE
+    changes text := CASE TG_OP
+        WHEN 'INSERT' THEN {ROWS_SQL.format(delta=1, rows='new_rows')}
+        WHEN 'DELETE' THEN {ROWS_SQL.format(delta=-1, rows='old_rows')}
+        ELSE {ROWS_SQL.format(delta=1, rows='new_rows')} || ' UNION ALL ' || {ROWS_SQL.format(delta=-1, rows='old_rows')}
+    END;
+BEGIN
+    EXECUTE replace($sql${COUNTER_SQL}$sql$, '{{changes}}', changes);
+    EXECUTE replace($sql${DUE_COUNTER_SQL}$sql$, '{{changes}}', changes);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+TRIGGER_SQL = {
+    'insert': 'AFTER INSERT ON goals_goal REFERENCING NEW TABLE AS new_rows',
+    'update': 'AFTER UPDATE ON goals_goal REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'delete': 'AFTER DELETE ON goals_goal REFERENCING OLD TABLE AS old_rows',
+}
+
+FILL_ROWS_SQL = 'SELECT board_id, category_id, status, priority, due_date, 1 AS delta FROM goals_goal'
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(FUNCTION_SQL)
+        for event, sql in TRIGGER_SQL.items():
+            schema_editor.execute(
+                f'CREATE TRIGGER goals_goal_counters_{event} {sql} FOR EACH STATEMENT EXECUTE FUNCTION goals_goal_counters()'
+            )
+        schema_editor.execute(COUNTER_SQL.format(changes=FILL_ROWS_SQL))
+        schema_editor.execute(DUE_COUNTER_SQL.format(changes=FILL_ROWS_SQL))
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for event in TRIGGER_SQL:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS goals_goal_counters_{event} ON goals_goal')
+        schema_editor.execute('DROP FUNCTION IF EXISTS goals_goal_counters()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0019_goal_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
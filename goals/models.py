@@ -1,4 +1,9 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.db import connection, models
+from django.db.models import QuerySet
+from django.db.models.functions import Upper
+from django.utils import timezone
 
 from core.models import User
 
@@ -38,6 +43,33 @@ class Board(BaseModel):
         verbose_name_plural = 'Доски'
 
 
+class BoardVersion(models.Model):
+    """
+    Модель данных для версии содержимого доски: номер увеличивается при любом изменении доски, ее участников, категорий,
+    целей и профилей авторов категорий, в том числе при QuerySet.update(), bulk_create() и COPY. Заполняется триггерами
+    БД (см. миграцию 0017_board_version_triggers), отсутствие записи означает версию 0. Используется для ETag
+    (goals.conditional).
+    """
+    board = models.OneToOneField(
+        to=Board,
+        verbose_name='Доска',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='version',
+    )
+    version = models.BigIntegerField(
+        verbose_name='Версия',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'Версия доски'
+        verbose_name_plural = 'Версии досок'
+
+    def __str__(self):
+        return f'{self.board_id}: {self.version}'
+
+
 class BoardParticipant(BaseModel):
     """
     Модель данных для организации свзяки Доски и Пользователя. Роли участников доски определены в классе Role.
@@ -69,6 +101,12 @@ class BoardParticipant(BaseModel):
         unique_together = ('board', 'user')
         verbose_name = 'Участник'
         verbose_name_plural = 'Участники'
+        indexes = [
+            # Все списки и проверки прав ищут участника по (user_id, board_id) и читают role: индекс покрывающий
+            models.Index(fields=['user', 'board'], include=['role'], name='participant_user_board_idx'),
+            # Изменения доски с позиции (updated, id), см. goals.sync
+            models.Index(fields=['board', 'updated', 'id'], name='participant_board_updated_idx'),
+        ]
 
 
 class GoalCategory(BaseModel):
@@ -98,6 +136,13 @@ class GoalCategory(BaseModel):
     class Meta:
         verbose_name = 'Категория'
         verbose_name_plural = 'Категории'
+        indexes = [
+            models.Index(fields=['board'], condition=models.Q(is_deleted=False), name='goalcategory_board_active_idx'),
+            models.Index(fields=['title', 'id'], name='goalcategory_title_id_idx'),
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='goalcategory_title_trgm_idx'),
+            models.Index(fields=['created', 'id'], name='goalcategory_created_id_idx'),
+            models.Index(fields=['board', 'updated', 'id'], name='goalcategory_board_updated_idx'),
+        ]
 
     def __str__(self):
         return f'{self.title} <{self.user.username}>'
@@ -155,14 +200,54 @@ class Goal(BaseModel):
         on_delete=models.PROTECT,
         related_name='goals'
     )
+    board = models.ForeignKey(
+        to=Board,
+        verbose_name='Доска',
+        on_delete=models.PROTECT,
+        related_name='goals',
+        editable=False,
+    )
+    # Заполняется триггером БД по title и description (см. миграцию 0013_goal_search_vector_trigger)
+    search_vector = SearchVectorField(
+        verbose_name='Поисковый вектор',
+        null=True,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'Цель'
         verbose_name_plural = 'Цели'
+        indexes = [
+            models.Index(fields=['category', 'status'], name='goal_category_status_idx'),
+            models.Index(fields=['due_date'], name='goal_due_date_idx'),
+            models.Index(fields=['title', 'id'], name='goal_title_id_idx'),
+            GinIndex(fields=['search_vector'], name='goal_search_vector_idx'),
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='goal_title_trgm_idx'),
+            models.Index(fields=['created', 'id'], name='goal_created_id_idx'),
+            models.Index(fields=['board', 'updated', 'id'], name='goal_board_updated_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        """
+        Поле board дублирует category.board_id, чтобы списки целей фильтровались по участникам доски без соединения
+        с категориями и досками. При смене категории доска цели и ее комментариев обновляется.
+        """
+        board_id = self.board_id
+        if self.category_id is not None and (board_id is None or Goal.category.is_cached(self)):
+            self.board_id = self.category.board_id
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'category' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'board'}
+
+        super().save(*args, **kwargs)
+
+        if board_id is not None and board_id != self.board_id:
+            Tombstone.record_moved_goals({self.id: board_id})
+            self.comments.update(board_id=self.board_id, updated=timezone.now())
+
 
 class GoalComment(BaseModel):
     """
@@ -183,10 +268,254 @@ class GoalComment(BaseModel):
     text = models.TextField(
         verbose_name='Текст'
     )
+    board = models.ForeignKey(
+        to=Board,
+        verbose_name='Доска',
+        on_delete=models.PROTECT,
+        related_name='comments',
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(fields=['goal', 'created'], name='goalcomment_goal_created_idx'),
+            models.Index(fields=['created', 'id'], name='goalcomment_created_id_idx'),
+            models.Index(fields=['board', 'updated', 'id'], name='goalcomment_board_updated_idx'),
+        ]
 
     def __str__(self):
         return self.text
+
+    def save(self, *args, **kwargs):
+        if self.board_id is None:
+            self.board_id = self.goal.board_id
+        super().save(*args, **kwargs)
+
+
+class GoalCounter(models.Model):
+    """
+    Модель данных для счетчика целей доски по категории, статусу и приоритету. Заполняется триггерами БД при любом
+    изменении целей (см. миграцию 0020_goal_counter_triggers), пересчитывается командой rebuild_goal_counters.
+    Используется для статистики доски (goals.stats). Внешние ключи без ограничений БД: при удалении категории триггер
+    удаления целей обновляет счетчики, которые иначе были бы уже удалены каскадом.
+    """
+    board = models.ForeignKey(
+        to=Board,
+        verbose_name='Доска',
+        on_delete=models.DO_NOTHING,
+        related_name='+',
+        db_constraint=False,
+        db_index=False,
+    )
+    category = models.ForeignKey(
+        to=GoalCategory,
+        verbose_name='Категория',
+        on_delete=models.DO_NOTHING,
+        related_name='+',
+        db_constraint=False,
+        db_index=False,
+    )
+    status = models.PositiveSmallIntegerField(
+        verbose_name='Статус',
+        choices=Goal.Status.choices,
+    )
+    priority = models.PositiveSmallIntegerField(
+        verbose_name='Приоритет',
+        choices=Goal.Priority.choices,
+    )
+    count = models.IntegerField(
+        verbose_name='Число целей',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'Счетчик целей'
+        verbose_name_plural = 'Счетчики целей'
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'category', 'status', 'priority'], name='goalcounter_key_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.board_id}/{self.category_id}: {self.get_status_display()}, {self.get_priority_display()} - {self.count}'
+
+
+class GoalDueCounter(models.Model):
+    """
+    Модель данных для счетчика открытых целей (К выполнению, В процессе) доски по категории и дню дедлайна (UTC).
+    Заполняется теми же триггерами, что GoalCounter, по нему считаются просроченные цели.
+    """
+    board = models.ForeignKey(
+        to=Board,
+        verbose_name='Доска',
+        on_delete=models.DO_NOTHING,
+        related_name='+',
+        db_constraint=False,
+        db_index=False,
+    )
+    category = models.ForeignKey(
+        to=GoalCategory,
+        verbose_name='Категория',
+        on_delete=models.DO_NOTHING,
+        related_name='+',
+        db_constraint=False,
+        db_index=False,
+    )
+    due = models.DateField(
+        verbose_name='День дедлайна',
+    )
+    count = models.IntegerField(
+        verbose_name='Число целей',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'Счетчик целей по дедлайну'
+        verbose_name_plural = 'Счетчики целей по дедлайну'
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'category', 'due'], name='goalduecounter_key_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.board_id}/{self.category_id}: {self.due} - {self.count}'
+
+
+# Перенесенные цели и их комментарии записываются удаленными из прежней доски
+MOVED_GOALS_SQL = """
+WITH moved AS (SELECT * FROM unnest(%(goal_ids)s::bigint[], %(board_ids)s::bigint[]) AS moved (goal_id, board_id))
+INSERT INTO goals_tombstone (kind, object_id, board_id, deleted)
+SELECT %(goal)s, goal_id, board_id, %(deleted)s FROM moved
+UNION ALL
+SELECT %(comment)s, comment.id, moved.board_id, %(deleted)s
+FROM goals_goalcomment AS comment JOIN moved ON moved.goal_id = comment.goal_id
+"""
+
+
+class Tombstone(models.Model):
+    """
+    Модель данных для записи об удалении объекта доски или о его переносе в другую доску. По записям синхронизация
+    изменений (goals.sync) сообщает клиенту, какие объекты нужно удалить. Записи старше GOALS_SYNC_TOMBSTONE_DAYS
+    удаляет команда purge_tombstones.
+    """
+    class Kind(models.TextChoices):
+        participant = 'participant', 'Участник'
+        category = 'category', 'Категория'
+        goal = 'goal', 'Цель'
+        comment = 'comment', 'Комментарий'
+
+    kind = models.CharField(
+        verbose_name='Тип объекта',
+        max_length=16,
+        choices=Kind.choices,
+    )
+    object_id = models.BigIntegerField(
+        verbose_name='Id объекта',
+    )
+    board = models.ForeignKey(
+        to=Board,
+        verbose_name='Доска',
+        on_delete=models.CASCADE,
+        related_name='tombstones',
+        db_index=False,
+    )
+    deleted = models.DateTimeField(
+        verbose_name='Дата удаления',
+        default=timezone.now,
+    )
+
+    class Meta:
+        verbose_name = 'Удаленный объект'
+        verbose_name_plural = 'Удаленные объекты'
+        indexes = [
+            models.Index(fields=['board', 'deleted', 'id'], name='tombstone_board_deleted_idx'),
+            models.Index(fields=['deleted'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_kind_display()} {self.object_id}'
+
+    @classmethod
+    def record_moved_goals(cls, boards: dict[int, int]) -> None:
+        """
+        Записывает перенос целей {goal_id: прежний board_id} и их комментариев в другую доску одним запросом.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(MOVED_GOALS_SQL, {
+                'goal_ids': list(boards), 'board_ids': list(boards.values()), 'deleted': timezone.now(),
+                'goal': cls.Kind.goal.value, 'comment': cls.Kind.comment.value,
+            })
+
+
+class CascadeJob(BaseModel):
+    """
+    Модель данных для фонового каскада при удалении доски или категории: категории доски помечаются удаленными, цели
+    переводятся в статус Архив. Каскад выполняется шагами ограниченного размера, позиция (step, last_id) сохраняется
+    после каждого шага, поэтому прерванный каскад продолжается с места остановки.
+    """
+    class Status(models.IntegerChoices):
+        pending = 1, 'Ожидает'
+        running = 2, 'Выполняется'
+        done = 3, 'Завершен'
+        failed = 4, 'Ошибка'
+
+    board = models.ForeignKey(
+        to=Board,
+        verbose_name='Доска',
+        on_delete=models.PROTECT,
+        related_name='cascade_jobs',
+    )
+    category = models.ForeignKey(
+        to=GoalCategory,
+        verbose_name='Категория',
+        on_delete=models.PROTECT,
+        related_name='cascade_jobs',
+        null=True,
+        blank=True,
+    )
+    status = models.PositiveSmallIntegerField(
+        verbose_name='Статус',
+        choices=Status.choices,
+        default=Status.pending,
+    )
+    step = models.PositiveSmallIntegerField(
+        verbose_name='Шаг',
+        default=0,
+    )
+    last_id = models.BigIntegerField(
+        verbose_name='Последний обработанный id',
+        default=0,
+    )
+    total = models.PositiveIntegerField(
+        verbose_name='Всего записей',
+        null=True,
+        blank=True,
+    )
+    processed = models.PositiveIntegerField(
+        verbose_name='Обработано записей',
+        default=0,
+    )
+    error = models.TextField(
+        verbose_name='Ошибка',
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = 'Каскадное удаление'
+        verbose_name_plural = 'Каскадные удаления'
+        indexes = [
+            models.Index(fields=['status', 'category'], name='cascadejob_status_category_idx'),
+        ]
+
+    @classmethod
+    def get_pending_category_ids(cls) -> QuerySet:
+        """
+        Подзапрос id удаленных категорий, цели которых еще не архивированы каскадом. Незавершенных задач мало, поэтому
+        цели скрываются по индексу (status, category) без соединения с таблицей категорий.
+        """
+        return cls.objects.filter(
+            status__in=(cls.Status.pending, cls.Status.running, cls.Status.failed), category__isnull=False
+        ).values('category_id')
+
+    def __str__(self):
+        return f'{self.board_id}/{self.category_id or "-"}: {self.get_status_display()}'
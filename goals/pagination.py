@@ -0,0 +1,167 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import (CursorPagination, LimitOffsetPagination,
+                                       _reverse_ordering)
+from rest_framework.request import Request
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Постраничный вывод по ключу (keyset/seek-пагинация). В отличие от стандартного CursorPagination курсор хранит
+    значения всех полей сортировки и id последней записи страницы, поэтому следующая страница выбирается условием
+    WHERE по индексу, без OFFSET и без COUNT(*). Порядок берется из OrderingFilter представления, id добавляется
+    в конец как уникальный разделитель.
+    """
+    page_size = 50
+    page_size_query_param = 'limit'
+    max_page_size = 1000
+    tiebreaker = 'id'
+    invalid_ordering_message = 'Cursor pagination is not supported for this ordering'
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view=None) -> list:
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is None:
+            reverse, position = False, None
+        else:
+            reverse, position = self.cursor
+
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if position is not None:
+            queryset = queryset.filter(self._get_position_filter(position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_ordering(self, request: Request, queryset: QuerySet, view) -> tuple:
+        """
+        Дополняет сортировку представления полем id и проверяет, что все поля сортировки пригодны для курсора:
+        существуют в модели и не допускают NULL.
+        """
+        ordering = [field for field in super().get_ordering(request, queryset, view)
+                    if field.lstrip('-') not in ('pk', self.tiebreaker)]
+        descending = ordering[-1].startswith('-') if ordering else False
+        ordering.append(f'-{self.tiebreaker}' if descending else self.tiebreaker)
+
+        self.fields = []
+        for field_name in ordering:
+            try:
+                field = queryset.model._meta.get_field(field_name.lstrip('-'))
+            except FieldDoesNotExist:
+                raise ValidationError({'ordering': self.invalid_ordering_message})
+            if field.null or field.is_relation:
+                raise ValidationError({'ordering': self.invalid_ordering_message})
+            self.fields.append(field)
+        return tuple(ordering)
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next:
+            return None
+        position = self._get_position(self.page[-1]) if self.page else self.cursor[1]
+        return self.encode_cursor((False, position))
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous:
+            return None
+        position = self._get_position(self.page[0]) if self.page else self.cursor[1]
+        return self.encode_cursor((True, position))
+
+    def decode_cursor(self, request: Request) -> tuple[bool, list] | None:
+        """
+        Пустое значение параметра cursor означает первую страницу в режиме курсора.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            reverse, raw_position = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            if len(raw_position) != len(self.fields):
+                raise ValueError
+            position = [field.to_python(value) for field, value in zip(self.fields, raw_position)]
+        except (TypeError, ValueError, BinasciiError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return bool(reverse), position
+
+    def encode_cursor(self, cursor: tuple[bool, list]) -> str:
+        reverse, position = cursor
+        raw_position = [value.isoformat() if hasattr(value, 'isoformat') else value for value in position]
+        encoded = urlsafe_b64encode(json.dumps([int(reverse), raw_position]).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_position(self, item) -> list:
+        if isinstance(item, dict):
+            return [item[field.attname] for field in self.fields]
+        return [getattr(item, field.attname) for field in self.fields]
+
+    def _get_position_filter(self, position: list, reverse: bool) -> Q:
+        """
+        Строит условие «строго после позиции» для составного ключа (f1, f2, ..., id):
+        f1 > v1 OR (f1 = v1 AND f2 > v2) OR ... Ведущее условие f1 >= v1 позволяет планировщику использовать
+        диапазонное сканирование индекса по первому полю.
+        """
+        condition = Q()
+        equal = Q()
+        for field_name, value in zip(self.ordering, position):
+            descending = field_name.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            name = field_name.lstrip('-')
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+
+        first_field = self.ordering[0]
+        first_lookup = 'lte' if first_field.startswith('-') != reverse else 'gte'
+        return Q(**{f'{first_field.lstrip("-")}__{first_lookup}': position[0]}) & condition
+
+
+class LimitOffsetKeysetPagination(LimitOffsetPagination):
+    """
+    Сохраняет привычный режим limit/offset для текущего фронтенда и переключается на KeysetPagination, если в запросе
+    передан параметр cursor (пустое значение - первая страница).
+    """
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view=None) -> list | None:
+        self.keyset = None
+        if self.keyset_pagination_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self) -> dict:
+        if self.keyset is not None:
+            return self.keyset.get_html_context()
+        return super().get_html_context()
+
+    def to_html(self):
+        if self.keyset is not None:
+            return self.keyset.to_html()
+        return super().to_html()
@@ -1,8 +1,30 @@
+from django.db.models import OuterRef, QuerySet, Subquery
 from rest_framework import permissions
 
+from goals import membership
 from goals.models import (Board, BoardParticipant, Goal, GoalCategory,
                           GoalComment)
 
+EDITOR_ROLES = (BoardParticipant.Role.owner, BoardParticipant.Role.writer)
+
+
+def with_user_role(queryset: QuerySet, user_id: int, board_field: str = 'board_id') -> QuerySet:
+    """
+    Добавляет к queryset роль пользователя в доске объекта (атрибут user_role, None - не участник или доска удалена).
+    Роль выбирается подзапросом в том же SELECT, поэтому проверки прав ниже не обращаются к БД повторно.
+    """
+    return queryset.annotate(user_role=Subquery(
+        BoardParticipant.objects.filter(
+            board_id=OuterRef(board_field), user_id=user_id, board__is_deleted=False
+        ).values('role')[:1]
+    ))
+
+
+def get_user_role(request, obj, board_id: int) -> int | None:
+    if hasattr(obj, 'user_role'):
+        return obj.user_role
+    return membership.get_board_roles(request.user.id).get(board_id)
+
 
 class BoardPermissions(permissions.IsAuthenticated):
     """
@@ -11,12 +33,28 @@ class BoardPermissions(permissions.IsAuthenticated):
     только создатель доски.
     """
     def has_object_permission(self, request, view, obj: Board) -> bool:
-        _filters: dict = {'user_id': request.user.id, 'board_id': obj.id}
+        role = get_user_role(request, obj, obj.id)
+
+        if request.method not in permissions.SAFE_METHODS:
+            return role == BoardParticipant.Role.owner
+
+        return role is not None
+
+
+class BoardParticipantPermissions(permissions.IsAuthenticated):
+    """
+    Наследование от permissions.IsAuthenticated позволяет проверить, что пользователь аутентифицирован. Видеть
+    участников доски (pk из URL) может любой ее участник, добавлять, изменять и удалять участников - только владелец.
+    """
+    def has_permission(self, request, view) -> bool:
+        if not super().has_permission(request, view):
+            return False
 
+        role = membership.get_board_roles(request.user.id).get(view.kwargs['pk'])
         if request.method not in permissions.SAFE_METHODS:
-            _filters['role'] = BoardParticipant.Role.owner
+            return role == BoardParticipant.Role.owner
 
-        return BoardParticipant.objects.filter(**_filters).exists()
+        return role is not None
 
 
 class GoalCategoryPermissions(permissions.IsAuthenticated):
@@ -26,12 +64,12 @@ class GoalCategoryPermissions(permissions.IsAuthenticated):
     Менять/удалять категорию имеет право создатель доски или редактор.
     """
     def has_object_permission(self, request, view, obj: GoalCategory) -> bool:
-        _filters: dict = {'user_id': request.user.id, 'board_id': obj.board_id}
+        role = get_user_role(request, obj, obj.board_id)
 
         if request.method not in permissions.SAFE_METHODS:
-            _filters['role__in'] = [BoardParticipant.Role.owner, BoardParticipant.Role.writer]
+            return role in EDITOR_ROLES
 
-        return BoardParticipant.objects.filter(**_filters).exists()
+        return role is not None
 
 
 class GoalPermissions(permissions.IsAuthenticated):
@@ -41,12 +79,12 @@ class GoalPermissions(permissions.IsAuthenticated):
     создатель доски или редактор.
     """
     def has_object_permission(self, request, view, obj: Goal) -> bool:
-        _filters: dict = {'user_id': request.user.id, 'board_id': obj.category.board_id}
+        role = get_user_role(request, obj, obj.board_id)
 
         if request.method not in permissions.SAFE_METHODS:
-            _filters['role__in'] = [BoardParticipant.Role.owner, BoardParticipant.Role.writer]
+            return role in EDITOR_ROLES
 
-        return BoardParticipant.objects.filter(**_filters).exists()
+        return role is not None
 
 
 class GoalCommentPermissions(permissions.IsAuthenticated):
@@ -58,5 +96,5 @@ class GoalCommentPermissions(permissions.IsAuthenticated):
     def has_object_permission(self, request, view, obj: GoalComment) -> bool:
         return any((
             request.method in permissions.SAFE_METHODS,
-            obj.user.id == request.user.id
+            obj.user_id == request.user.id
         ))
@@ -0,0 +1,61 @@
+"""
+Загрузка строк в таблицы моделей командой PostgreSQL COPY FROM STDIN в текстовом формате и выделение id из
+последовательностей первичных ключей, чтобы связанные записи загружались без чтения вставленных строк.
+"""
+import io
+from collections.abc import Iterable
+
+from django.db import connection
+
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+# Колонки целей и комментариев в порядке строк COPY импорта и генератора данных
+GOAL_COLUMNS = ('id', 'title', 'description', 'category_id', 'board_id', 'user_id', 'status', 'priority', 'due_date',
+                'created', 'updated')
+COMMENT_COLUMNS = ('id', 'goal_id', 'board_id', 'user_id', 'text', 'created', 'updated')
+
+
+def allocate_ids(model, count: int) -> list[int]:
+    """
+    Выделяет count значений из последовательности первичного ключа таблицы модели.
+    """
+    if not count:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+            [model._meta.db_table, model._meta.pk.column, count],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def copy_rows(model, columns: tuple[str, ...], rows: Iterable[tuple]) -> None:
+    """
+    Загружает строки-кортежи значений колонок columns. None записывается как NULL, даты - в формате ISO 8601.
+    """
+    copy_lines(model, columns, ('\t'.join(map(format_value, row)) + '\n' for row in rows))
+
+
+def copy_lines(model, columns: tuple[str, ...], lines: Iterable[str]) -> None:
+    """
+    Загружает готовые строки текстового формата COPY (значения через табуляцию, с переводом строки в конце).
+    """
+    buffer = io.StringIO()
+    buffer.writelines(lines)
+    if not buffer.tell():
+        return
+    buffer.seek(0)
+
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {quote(model._meta.db_table)} ({", ".join(map(quote, columns))}) FROM STDIN', buffer
+        )
+
+
+def format_value(value) -> str:
+    if value is None:
+        return '\\N'
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    return str(value).translate(COPY_ESCAPES)
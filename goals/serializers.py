@@ -1,11 +1,16 @@
-from django.db import transaction
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
 from rest_framework import exceptions, serializers
 from rest_framework.exceptions import PermissionDenied, ValidationError
 
 from core.models import User
 from core.serializers import ProfileSerializer
-from goals.models import (Board, BoardParticipant, Goal, GoalCategory,
-                          GoalComment)
+from goals import membership
+from goals.models import (Board, BoardParticipant, CascadeJob, Goal,
+                          GoalCategory, GoalComment, Tombstone)
+from goals.permissions import EDITOR_ROLES
+from goals.values import ValuesSerializer
 
 
 class GoalCategoryCreateSerializer(serializers.ModelSerializer):
@@ -23,11 +28,7 @@ class GoalCategoryCreateSerializer(serializers.ModelSerializer):
         if value.is_deleted:
             raise serializers.ValidationError('Board is deleted')
 
-        if not BoardParticipant.objects.filter(
-                board=value,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                user_id=self.context['request'].user.id
-        ):
+        if membership.get_board_roles(self.context['request'].user.id).get(value.id) not in EDITOR_ROLES:
             raise PermissionDenied
         return value
 
@@ -48,6 +49,28 @@ class GoalCategorySerializer(serializers.ModelSerializer):
         }
 
 
+class GoalCategoryValuesSerializer(ValuesSerializer):
+    """
+    Быстрый вывод списка категорий с тем же содержимым, что у GoalCategorySerializer.
+    """
+    serializer_class = GoalCategorySerializer
+
+
+class GoalCategorySyncSerializer(GoalCategorySerializer):
+    """
+    Сериализатор для Категории в изменениях доски (goals.sync): выводит и признак is_deleted.
+    """
+    class Meta(GoalCategorySerializer.Meta):
+        extra_kwargs = {}
+
+
+class GoalCategorySyncValuesSerializer(ValuesSerializer):
+    """
+    Быстрый вывод категорий с тем же содержимым, что у GoalCategorySyncSerializer.
+    """
+    serializer_class = GoalCategorySyncSerializer
+
+
 class GoalCreateSerializer(serializers.ModelSerializer):
     """
     Сериализатор для Цели создает цель, учитывая права и роли текущего пользователя.
@@ -59,7 +82,7 @@ class GoalCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Goal
-        fields = '__all__'
+        exclude = ('board', 'search_vector')
         read_only_fields = ('id', 'created', 'updated', 'user')
 
     def validate_category(self, value: GoalCategory) -> GoalCategory:
@@ -79,11 +102,16 @@ class GoalCreateSerializer(serializers.ModelSerializer):
 
 class GoalSerializer(serializers.ModelSerializer):
     """
-    Сериализатор для Цели выводит информацию по цели или списку целей.
+    Сериализатор для Цели выводит информацию по цели или списку целей. При смене категории доска цели обновляется в
+    Goal.save().
     """
+    category = serializers.PrimaryKeyRelatedField(
+        queryset=GoalCategory.objects.filter(is_deleted=False)
+    )
+
     class Meta:
         model = Goal
-        fields = '__all__'
+        exclude = ('board', 'search_vector')
         read_only_fields = ('id', 'created', 'updated', 'user')
 
     def validate_category(self, value: GoalCategory) -> GoalCategory:
@@ -92,6 +120,86 @@ class GoalSerializer(serializers.ModelSerializer):
         return value
 
 
+class GoalValuesSerializer(ValuesSerializer):
+    """
+    Быстрый вывод списка целей с тем же содержимым, что у GoalSerializer.
+    """
+    serializer_class = GoalSerializer
+
+
+class GoalBulkDataSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор проверяет поля цели в пакетной операции без обращений к БД: категория передается как id, ее
+    существование и права пользователя проверяются в goals.bulk сразу для всех операций.
+    """
+    category = serializers.IntegerField()
+
+    class Meta:
+        model = Goal
+        fields = ('title', 'description', 'category', 'due_date', 'status', 'priority')
+
+
+class GoalImportCommentSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор проверяет комментарий импортируемой цели. Автор передается как username участника доски.
+    """
+    username = serializers.CharField(max_length=150, required=False)
+
+    class Meta:
+        model = GoalComment
+        fields = ('text', 'username')
+
+
+class GoalImportSerializer(GoalBulkDataSerializer):
+    """
+    Сериализатор проверяет строку файла импорта целей (формат совпадает с выгрузкой goals.export) без обращений к БД:
+    категория и автор проверяются в goals.importer сразу для порции строк. Даты создания и обновления из файла не
+    читаются: загруженные объекты получают время импорта, чтобы попасть в изменения синхронизации (goals.sync).
+    """
+    username = serializers.CharField(max_length=150, required=False)
+    comments = GoalImportCommentSerializer(many=True, required=False)
+
+    class Meta(GoalBulkDataSerializer.Meta):
+        fields = (*GoalBulkDataSerializer.Meta.fields, 'username', 'comments')
+
+
+class GoalImportFileSerializer(serializers.Serializer):
+    """
+    Сериализатор проверяет загружаемый файл импорта целей и его формат.
+    """
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(choices=('ndjson', 'csv'), default='ndjson')
+
+
+class GoalBulkOperationSerializer(serializers.Serializer):
+    """
+    Сериализатор проверяет одну операцию пакета: create с данными data, update с id и data или archive с id.
+    """
+    op = serializers.ChoiceField(choices=('create', 'update', 'archive'))
+    id = serializers.IntegerField(required=False)
+    data = serializers.DictField(required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        if attrs['op'] != 'create' and 'id' not in attrs:
+            raise ValidationError({'id': 'This field is required.'})
+        if attrs['op'] != 'archive' and 'data' not in attrs:
+            raise ValidationError({'data': 'This field is required.'})
+        return attrs
+
+
+class GoalBulkSerializer(serializers.Serializer):
+    """
+    Сериализатор проверяет пакет операций над целями. Размер пакета ограничен настройкой GOALS_BULK_MAX_BATCH,
+    отдельные операции проверяются в goals.bulk, чтобы ошибки возвращались по каждой операции.
+    """
+    operations = serializers.ListField(child=serializers.JSONField(), allow_empty=False)
+
+    def validate_operations(self, value: list) -> list:
+        if len(value) > settings.GOALS_BULK_MAX_BATCH:
+            raise ValidationError(f'Ensure this field has no more than {settings.GOALS_BULK_MAX_BATCH} elements.')
+        return value
+
+
 class GoalCommentCreateSerializer(serializers.ModelSerializer):
     """
     Сериализатор для Комментария создает комментарий к цели, учитывая права и роли текущего пользователя.
@@ -100,17 +208,13 @@ class GoalCommentCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = GoalComment
-        fields = '__all__'
+        exclude = ('board',)
         read_only_fields = ('id', 'created', 'updated', 'user')
 
     def validate_goal(self, value: Goal) -> Goal:
         if value.status == Goal.Status.archived:
             raise ValidationError('Goal not found')
-        if not BoardParticipant.objects.filter(
-            board_id=value.category.board.id,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-            user_id=self.context['request'].user.id
-        ).exists():
+        if membership.get_board_roles(self.context['request'].user.id).get(value.board_id) not in EDITOR_ROLES:
             raise PermissionDenied
         return value
 
@@ -123,10 +227,17 @@ class GoalCommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = GoalComment
-        fields = '__all__'
+        exclude = ('board',)
         read_only_fields = ('id', 'created', 'updated', 'user', 'goal')
 
 
+class GoalCommentValuesSerializer(ValuesSerializer):
+    """
+    Быстрый вывод списка комментариев с тем же содержимым, что у GoalCommentSerializer.
+    """
+    serializer_class = GoalCommentSerializer
+
+
 class BoardCreateSerializer(serializers.ModelSerializer):
     """
     Сериализатор для Доски создает доски.
@@ -137,22 +248,73 @@ class BoardCreateSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class ParticipantUserField(serializers.SlugRelatedField):
+    """
+    Пользователь участника по username. В списке участников пользователи берутся из выборки
+    BoardParticipantListSerializer, без запроса на каждого участника.
+    """
+    def to_internal_value(self, data):
+        users = self.context.get('participant_users')
+        if users is None or not isinstance(data, str):
+            return super().to_internal_value(data)
+        if data not in users:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+        return users[data]
+
+
+class BoardParticipantListSerializer(serializers.ListSerializer):
+    """
+    Выбирает пользователей всех участников списка одним запросом до проверки отдельных участников.
+    """
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            usernames = {item.get('user') for item in data if isinstance(item, dict)}
+            self.context['participant_users'] = User.objects.in_bulk(
+                [username for username in usernames if isinstance(username, str)], field_name='username'
+            )
+        return super().to_internal_value(data)
+
+
 class BoardParticipantSerializer(serializers.ModelSerializer):
     """
     Сериализатор для реализации связи доска-участники.
     """
     role = serializers.ChoiceField(required=True, choices=BoardParticipant.Role.choices[1:])
-    user = serializers.SlugRelatedField(slug_field='username', queryset=User.objects.all())
+    user = ParticipantUserField(slug_field='username', queryset=User.objects.all())
+
+    def get_fields(self) -> dict:
+        fields = super().get_fields()
+        # У существующего участника меняется только роль: смена пользователя передала бы участие другому пользователю
+        # без сброса кэша участия прежнего
+        if self.instance is not None:
+            fields['user'].read_only = True
+        return fields
 
     def validate(self, attrs: dict) -> dict:
-        if attrs['user'] == self.context['request'].user and attrs['role'] != BoardParticipant.Role.owner:
+        user = attrs.get('user', getattr(self.instance, 'user', None))
+        if user == self.context['request'].user and attrs.get('role') != BoardParticipant.Role.owner:
             raise ValidationError({'role': 'Failed to update owner role'})
+
+        # Отдельный участник добавляется или изменяется через board/<pk>/participants: доска передается в контексте
+        board_id = self.context.get('board_id')
+        if board_id is not None and BoardParticipant.objects.filter(board_id=board_id, user=user).exclude(
+            pk=getattr(self.instance, 'pk', None)
+        ).exists():
+            raise ValidationError({'user': 'User is already a board participant'})
         return attrs
 
     class Meta:
         model = BoardParticipant
         fields = '__all__'
         read_only_fields = ('id', 'created', 'updated', 'board')
+        list_serializer_class = BoardParticipantListSerializer
+
+
+class BoardParticipantValuesSerializer(ValuesSerializer):
+    """
+    Быстрый вывод участников с тем же содержимым, что у BoardParticipantSerializer.
+    """
+    serializer_class = BoardParticipantSerializer
 
 
 class BoardSerializer(serializers.ModelSerializer):
@@ -168,22 +330,60 @@ class BoardSerializer(serializers.ModelSerializer):
 
     def update(self, instance: Board, validated_data: dict) -> Board:
         with transaction.atomic():
-            BoardParticipant.objects.filter(board=instance).exclude(user=self.context['request'].user).delete()
-            BoardParticipant.objects.bulk_create([
-                BoardParticipant(
-                    user=participant['user'],
-                    role=participant['role'],
-                    board=instance,
-                )
-                for participant in validated_data.pop('participants', [])
-            ])
+            if 'participants' in validated_data:
+                self.sync_participants(instance, validated_data.pop('participants'))
 
             if title := validated_data.get('title'):
                 instance.title = title
-                instance.save(update_fields=('title',))
+                instance.save(update_fields=('title', 'updated'))
 
         return instance
 
+    def sync_participants(self, board: Board, participants: list[dict]) -> None:
+        """
+        Приводит участников доски (кроме текущего пользователя) к переданному списку: добавляет новых, меняет роли
+        изменившихся и удаляет отсутствующих, не трогая остальные строки. Каждый вид изменений выполняется одним
+        запросом, кэш участия сбрасывается только для затронутых пользователей.
+        """
+        roles = {participant['user'].id: participant['role'] for participant in participants}
+        existing = {
+            participant.user_id: participant
+            for participant in BoardParticipant.objects.select_for_update().filter(board=board).exclude(
+                user=self.context['request'].user
+            ).only('id', 'user_id', 'role')
+        }
+
+        removed = existing.keys() - roles.keys()
+        changed = [participant for user_id, participant in existing.items()
+                   if user_id in roles and participant.role != roles[user_id]]
+        added = roles.keys() - existing.keys()
+
+        if removed:
+            # Удаление одним запросом SQL без сигналов post_delete (QuerySet.delete() выбрал бы участников и отправил
+            # сигналы для каждого): кэш участия сбрасывается ниже одним вызовом, записи об удалении создаются одним
+            # запросом
+            removed_ids = [existing[user_id].id for user_id in removed]
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {connection.ops.quote_name(BoardParticipant._meta.db_table)} WHERE id = ANY(%s)',
+                    [removed_ids],
+                )
+            Tombstone.objects.bulk_create([
+                Tombstone(kind=Tombstone.Kind.participant, object_id=participant_id, board=board)
+                for participant_id in removed_ids
+            ])
+        if changed:
+            now = timezone.now()
+            for participant in changed:
+                participant.role, participant.updated = roles[participant.user_id], now
+            BoardParticipant.objects.bulk_update(changed, ('role', 'updated'))
+        if added:
+            BoardParticipant.objects.bulk_create([
+                BoardParticipant(board=board, user_id=user_id, role=roles[user_id]) for user_id in added
+            ])
+
+        membership.invalidate(removed | added | {participant.user_id for participant in changed})
+
 
 class BoardListSerializer(serializers.ModelSerializer):
     """
@@ -192,3 +392,39 @@ class BoardListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Board
         fields = '__all__'
+
+
+class AutocompleteSerializer(serializers.Serializer):
+    """
+    Сериализатор проверяет параметры запроса подсказок: строку q, тип объектов и число подсказок.
+    """
+    q = serializers.CharField(max_length=255)
+    type = serializers.ChoiceField(choices=('goal', 'category'), required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+
+class BoardChangesQuerySerializer(serializers.Serializer):
+    """
+    Сериализатор проверяет параметры запроса изменений доски: курсор предыдущего ответа (без курсора - все объекты
+    доски) и наибольшее число объектов каждого типа в ответе.
+    """
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=settings.GOALS_SYNC_LIMIT, default=settings.GOALS_SYNC_LIMIT)
+
+
+class GoalExportSerializer(serializers.Serializer):
+    """
+    Сериализатор проверяет параметры выгрузки целей: формат файла и признак выгрузки комментариев.
+    """
+    file_format = serializers.ChoiceField(choices=('ndjson', 'csv'), default='ndjson')
+    comments = serializers.BooleanField(default=False)
+
+
+class CascadeJobSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для фонового каскада выводит статус и ход выполнения задачи.
+    """
+    class Meta:
+        model = CascadeJob
+        exclude = ('step', 'last_id')
+        read_only_fields = ('id', 'created', 'updated', 'board', 'category', 'status', 'total', 'processed', 'error')
@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from goals import membership
+from goals.models import (BoardParticipant, Goal, GoalCategory, GoalComment,
+                          Tombstone)
+
+TOMBSTONE_KINDS = {
+    BoardParticipant: Tombstone.Kind.participant,
+    GoalCategory: Tombstone.Kind.category,
+    Goal: Tombstone.Kind.goal,
+    GoalComment: Tombstone.Kind.comment,
+}
+
+
+@receiver([post_save, post_delete], sender=BoardParticipant)
+def invalidate_membership(sender, instance: BoardParticipant, **kwargs) -> None:
+    """
+    Сбрасывает кэш участия при изменении одного участника (создание доски, админка). Массовые изменения через
+    QuerySet.update/delete и bulk_create сбрасывают кэш явно.
+    """
+    membership.invalidate([instance.user_id])
+
+
+@receiver(post_delete, sender=BoardParticipant, dispatch_uid='tombstone_participant')
+@receiver(post_delete, sender=GoalCategory, dispatch_uid='tombstone_category')
+@receiver(post_delete, sender=Goal, dispatch_uid='tombstone_goal')
+@receiver(post_delete, sender=GoalComment, dispatch_uid='tombstone_comment')
+def record_tombstone(sender, instance, **kwargs) -> None:
+    """
+    Записывает удаление объекта доски для синхронизации изменений (goals.sync). Массовое удаление участников в
+    BoardSerializer записывает удаления явно.
+    """
+    Tombstone.objects.create(kind=TOMBSTONE_KINDS[sender], object_id=instance.id, board_id=instance.board_id)
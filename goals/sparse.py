@@ -0,0 +1,70 @@
+"""
+Выборочный вывод полей: параметр запроса fields (например, ?fields=title,status,priority) оставляет в ответе только
+перечисленные поля сериализатора. Выборка из БД сужается так же: списки через ValuesSerializer выбирают только колонки
+запрошенных полей, один объект выбирается с QuerySet.only(). Поэтому описание цели и текст комментария не читаются из
+БД, если их не запросили. Параметр учитывается только в запросах на чтение.
+"""
+from rest_framework import permissions, serializers
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+
+
+def get_model_fields(serializer: serializers.Serializer, prefix: str = '') -> list[str]:
+    """
+    Возвращает пути полей модели для QuerySet.only() по полям сериализатора, вложенные сериализаторы - через __.
+    """
+    columns = []
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        column = prefix + field.source.replace('.', '__')
+        columns.append(column)
+        if isinstance(field, serializers.Serializer):
+            columns.extend(get_model_fields(field, f'{column}__'))
+    return columns
+
+
+class SparseFieldsMixin:
+    """
+    Примесь для представлений целей, категорий и комментариев: поддержка параметра fields. В sparse_required_fields
+    перечисляются поля модели, которые нужны представлению независимо от запрошенных (например, для проверки прав).
+    """
+    sparse_required_fields: tuple[str, ...] = ()
+
+    def get_sparse_fields(self) -> list[str] | None:
+        """
+        Возвращает запрошенные поля в порядке полей сериализатора или None, если выводятся все поля.
+        """
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = self.parse_sparse_fields()
+        return self._sparse_fields
+
+    def parse_sparse_fields(self) -> list[str] | None:
+        value = self.request.query_params.get(FIELDS_PARAM) if self.request.method in permissions.SAFE_METHODS else None
+        if not value:
+            return None
+        names = {name.strip() for name in value.split(',') if name.strip()}
+        readable = [name for name, field in self.get_serializer_class()(context=self.get_serializer_context()).fields.items()
+                    if not field.write_only]
+        if unknown := names.difference(readable):
+            raise ValidationError({FIELDS_PARAM: [f'Unknown fields: {", ".join(sorted(unknown))}.']})
+        return [name for name in readable if name in names]
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            target = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+            for name in set(target.fields).difference(fields):
+                target.fields.pop(name)
+        return serializer
+
+    def get_values_serializer(self):
+        return self.values_serializer_class(context=self.get_serializer_context(), fields=self.get_sparse_fields())
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.get_sparse_fields() is None or hasattr(self, 'values_serializer_class'):
+            return queryset
+        return queryset.only(*get_model_fields(self.get_serializer()), *self.sparse_required_fields)
@@ -0,0 +1,109 @@
+"""
+Статистика доски: число целей по статусу и приоритету, просроченные цели и итоги по категориям. Статистика читается
+из счетчиков GoalCounter и GoalDueCounter, которые обновляют триггеры БД, поэтому время ответа зависит от числа
+категорий доски, а не от числа целей. Архивные цели и цели удаленных категорий не учитываются.
+
+Просроченной считается открытая цель (К выполнению, В процессе), день дедлайна которой (UTC) раньше текущего:
+счетчики ведутся по дням, поэтому цель с дедлайном сегодня становится просроченной с началом следующих суток.
+"""
+from datetime import date
+from datetime import timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from goals.models import Goal, GoalCategory, GoalCounter, GoalDueCounter
+
+OPEN_STATUSES = (Goal.Status.to_do, Goal.Status.in_progress)
+STATUSES = [status for status in Goal.Status if status != Goal.Status.archived]
+
+# Ключи счетчиков и строки целей, по которым они считаются (как в триггере миграции 0020_goal_counter_triggers)
+COUNTER_ROWS_SQL = {
+    GoalCounter: (
+        'board_id, category_id, status, priority',
+        'SELECT board_id, category_id, status, priority FROM goals_goal WHERE board_id = ANY(%(board_ids)s)',
+    ),
+    GoalDueCounter: (
+        'board_id, category_id, due',
+        "SELECT board_id, category_id, (due_date AT TIME ZONE 'UTC')::date AS due FROM goals_goal "
+        'WHERE board_id = ANY(%(board_ids)s) AND status = ANY(%(open_statuses)s) AND due_date IS NOT NULL',
+    ),
+}
+
+RECONCILE_SQL = """
+WITH expected AS (
+    SELECT {keys}, count(*) AS count FROM ({rows}) AS goals GROUP BY {keys}
+), actual AS (
+    SELECT {keys}, count FROM {table} WHERE board_id = ANY(%(board_ids)s)
+), diff AS (
+    SELECT {keys}, coalesce(expected.count, 0) - coalesce(actual.count, 0) AS delta
+    FROM expected FULL JOIN actual USING ({keys})
+)
+INSERT INTO {table} ({keys}, count)
+SELECT {keys}, delta FROM diff WHERE delta <> 0 ORDER BY {keys}
+ON CONFLICT ({keys}) DO UPDATE SET count = {table}.count + EXCLUDED.count
+RETURNING board_id
+"""
+
+
+def get_today() -> date:
+    return timezone.now().astimezone(dt_timezone.utc).date()
+
+
+def get_board_stats(board_id: int) -> dict:
+    """
+    Возвращает статистику доски тремя запросами: категории, счетчики по статусу и приоритету, счетчики просроченных
+    целей.
+    """
+    categories = {
+        row['id']: row | {'total': 0, 'overdue': 0}
+        for row in GoalCategory.objects.filter(board_id=board_id, is_deleted=False).order_by('title', 'id').values(
+            'id', 'title'
+        )
+    }
+    by_status = dict.fromkeys((status.name for status in STATUSES), 0)
+    by_priority = dict.fromkeys((priority.name for priority in Goal.Priority), 0)
+
+    counters = GoalCounter.objects.filter(board_id=board_id).exclude(status=Goal.Status.archived)
+    for category_id, status, priority, count in counters.values_list('category_id', 'status', 'priority', 'count'):
+        if category_id in categories:
+            categories[category_id]['total'] += count
+            by_status[Goal.Status(status).name] += count
+            by_priority[Goal.Priority(priority).name] += count
+
+    overdue = GoalDueCounter.objects.filter(board_id=board_id, due__lt=get_today()).values('category_id').annotate(
+        total=Sum('count')
+    ).order_by()
+    for row in overdue:
+        if row['category_id'] in categories:
+            categories[row['category_id']]['overdue'] += row['total']
+
+    return {
+        'board': board_id,
+        'total': sum(by_status.values()),
+        'by_status': by_status,
+        'by_priority': by_priority,
+        'overdue': sum(category['overdue'] for category in categories.values()),
+        'categories': list(categories.values()),
+    }
+
+
+def reconcile_counters(board_ids: list[int]) -> set[int]:
+    """
+    Пересчитывает счетчики досок по целям и прибавляет к расходящимся разницу. Цели и счетчики читаются одним
+    оператором, то есть в одном снимке, в котором изменения целей и их триггеров видны вместе, поэтому разница -
+    только расхождение, а не изменения параллельных транзакций. Разница прибавляется через ON CONFLICT DO UPDATE к
+    последнему значению счетчика, поэтому изменения целей не блокируются. Возвращает id досок, счетчики которых
+    расходились.
+    """
+    params = {'board_ids': list(board_ids), 'open_statuses': [int(status) for status in OPEN_STATUSES]}
+    changed = set()
+    with transaction.atomic(), connection.cursor() as cursor:
+        for model, (keys, rows) in COUNTER_ROWS_SQL.items():
+            table = model._meta.db_table
+            cursor.execute(RECONCILE_SQL.format(table=table, keys=keys, rows=rows), params)
+            changed |= {board_id for board_id, in cursor.fetchall()}
+            # Нулевые счетчики остаются после удаления целей, в том числе удаленных категорий
+            model.objects.filter(board_id__in=board_ids, count=0).delete()
+    return changed
@@ -0,0 +1,117 @@
+"""
+Синхронизация изменений доски: участники, категории, цели и комментарии, созданные или измененные после позиции
+курсора, и удаленные объекты (goals.models.Tombstone). Клиент хранит курсор из ответа и передает его в следующем
+запросе, поэтому после короткого перерыва передаются только изменившиеся объекты, а не вся доска.
+
+Позиция каждого типа - пара (updated, id) последнего переданного объекта, объекты выбираются по индексам
+(board, updated, id). Когда изменения типа переданы полностью, позиция отступает от текущего времени на GOALS_SYNC_LAG
+секунд: объекты транзакций, зафиксированных после ответа, но с более ранним updated, передаются повторно, а не теряются.
+Поэтому клиент применяет изменения как замену объекта по id, сначала удаляет объекты из deleted, затем сохраняет
+измененные. Архивные цели и удаленные категории передаются как измененные (status, is_deleted).
+"""
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from goals.models import (Board, BoardParticipant, Goal, GoalCategory,
+                          GoalComment, Tombstone)
+from goals.serializers import (BoardListSerializer,
+                               BoardParticipantValuesSerializer,
+                               GoalCategorySyncValuesSerializer,
+                               GoalCommentValuesSerializer,
+                               GoalValuesSerializer)
+
+Position = tuple[datetime, int]
+
+SOURCES = {
+    'participants': (BoardParticipant, BoardParticipantValuesSerializer, Tombstone.Kind.participant),
+    'categories': (GoalCategory, GoalCategorySyncValuesSerializer, Tombstone.Kind.category),
+    'goals': (Goal, GoalValuesSerializer, Tombstone.Kind.goal),
+    'comments': (GoalComment, GoalCommentValuesSerializer, Tombstone.Kind.comment),
+}
+DELETED = 'deleted'
+START: Position = (datetime(1970, 1, 1, tzinfo=dt_timezone.utc), 0)
+CURSOR_SALT = 'goals.sync'
+
+
+class SyncCursorExpiredError(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'Cursor expired, reload the board without cursor.'
+    default_code = 'cursor_expired'
+
+
+def encode_cursor(board_id: int, positions: dict[str, Position]) -> str:
+    return signing.dumps({
+        'board': board_id,
+        'positions': {name: [moment.isoformat(), pk] for name, (moment, pk) in positions.items()},
+    }, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(board_id: int, cursor: str) -> dict[str, Position]:
+    """
+    Возвращает позиции курсора. Курсор другой доски или поврежденный курсор - ошибка 400, курсор старше срока
+    хранения записей об удалении - ошибка 410.
+    """
+    try:
+        data = signing.loads(cursor, salt=CURSOR_SALT)
+        positions = {name: (datetime.fromisoformat(data['positions'][name][0]), int(data['positions'][name][1]))
+                     for name in (*SOURCES, DELETED)}
+        valid = data['board'] == board_id
+    except (signing.BadSignature, KeyError, IndexError, TypeError, ValueError):
+        valid = False
+    if not valid:
+        raise ValidationError({'cursor': ['Invalid cursor.']})
+    if positions[DELETED][0] < timezone.now() - timedelta(days=settings.GOALS_SYNC_TOMBSTONE_DAYS):
+        raise SyncCursorExpiredError
+    return positions
+
+
+def get_page(queryset: QuerySet, field: str, position: Position, limit: int,
+             floor: Position) -> tuple[list[dict], Position, bool]:
+    """
+    Возвращает до limit строк queryset.values() после позиции (field, id), новую позицию и признак, что строки есть
+    еще.
+    """
+    moment, pk = position
+    # Условие field >= moment ограничивает просмотр индекса (board, field, id) диапазоном после позиции
+    rows = list(queryset.filter(**{f'{field}__gte': moment}).filter(
+        Q(**{f'{field}__gt': moment}) | Q(id__gt=pk)
+    ).order_by(field, 'id')[:limit + 1])
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, (rows[-1][field], rows[-1]['id']), True
+    return rows, max(position, floor), False
+
+
+def get_changes(board: Board, positions: dict[str, Position] | None, limit: int) -> dict:
+    """
+    Возвращает доску, до limit изменившихся объектов каждого типа и удаленных объектов после позиций курсора, новый
+    курсор и признак has_more (изменения переданы не все, нужно запросить еще раз с новым курсором). Без курсора
+    передаются все объекты доски.
+    """
+    floor = (timezone.now() - timedelta(seconds=settings.GOALS_SYNC_LAG), 0)
+    if positions is None:
+        positions = dict.fromkeys(SOURCES, START) | {DELETED: floor}
+
+    data, new_positions, has_more = {'board': BoardListSerializer(board).data}, {}, False
+    for name, (model, values_serializer_class, _) in SOURCES.items():
+        values_serializer = values_serializer_class()
+        queryset = values_serializer.get_queryset(model.objects.filter(board_id=board.id))
+        rows, new_positions[name], more = get_page(queryset, 'updated', positions[name], limit, floor)
+        data[name] = values_serializer.to_representation(rows)
+        has_more |= more
+
+    tombstones = Tombstone.objects.filter(board_id=board.id).values('id', 'kind', 'object_id', 'deleted')
+    rows, new_positions[DELETED], more = get_page(tombstones, 'deleted', positions[DELETED], limit, floor)
+    kinds = {kind: name for name, (_, _, kind) in SOURCES.items()}
+    data[DELETED] = {name: [] for name in SOURCES}
+    for row in rows:
+        data[DELETED][kinds[row['kind']]].append(row['object_id'])
+
+    return data | {'cursor': encode_cursor(board.id, new_positions), 'has_more': has_more or more}
@@ -0,0 +1,11 @@
+from goals import cascade
+from goals.models import CascadeJob
+from jobs.pgqueue import task
+
+
+@task('goals.cascade')
+def run_cascade(job_id: int) -> None:
+    # Ошибка передается очереди: задача повторяется с задержкой и продолжает каскад с сохраненной позиции
+    job = cascade.run_job(job_id)
+    if job.status == CascadeJob.Status.failed:
+        raise cascade.CascadeError(job.error)
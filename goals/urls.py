@@ -7,6 +7,10 @@ urlpatterns = [
     path('board/create', views.BoardCreateView.as_view(), name='create-board'),
     path('board/list', views.BoardListView.as_view(), name='list-boards'),
     path('board/<int:pk>', views.BoardView.as_view(), name='retrieve-update-destroy-boards'),
+    path('board/<int:pk>/changes', views.BoardChangesView.as_view(), name='board-changes'),
+    path('board/<int:pk>/stats', views.BoardStatsView.as_view(), name='board-stats'),
+    path('board/<int:pk>/participants', views.BoardParticipantCreateView.as_view(), name='create-participant'),
+    path('board/<int:pk>/participants/<str:username>', views.BoardParticipantView.as_view(), name='participant'),
     # Goals categories
     path('goal_category/create', views.GoalCategoryCreateView.as_view(), name='create-category'),
     path('goal_category/list', views.GoalCategoryListView.as_view(), name='list-categories'),
@@ -14,9 +18,16 @@ urlpatterns = [
     # Goals
     path('goal/create', views.GoalCreateView.as_view(), name='create-goal'),
     path('goal/list', views.GoalListView.as_view(), name='list-goals'),
+    path('goal/export', views.GoalExportView.as_view(), name='export-goals'),
+    path('goal/import', views.GoalImportView.as_view(), name='import-goals'),
+    path('goal/bulk', views.GoalBulkView.as_view(), name='bulk-goals'),
     path('goal/<int:pk>', views.GoalView.as_view(), name='goal'),
     # Goals comments
     path('goal_comment/create', views.GoalCommentCreateView.as_view(), name='create-comment'),
     path('goal_comment/list', views.GoalCommentListView.as_view(), name='list-comment'),
     path('goal_comment/<int:pk>', views.GoalCommentView.as_view(), name='comment'),
+    # Background cascades
+    path('cascade/<int:pk>', views.CascadeJobView.as_view(), name='cascade'),
+    # Autocomplete
+    path('autocomplete', views.AutocompleteView.as_view(), name='autocomplete'),
 ]
@@ -0,0 +1,155 @@
+"""
+Быстрый вывод списков: записи выбираются через QuerySet.values() и преобразуются в JSON-совместимые словари
+заранее составленными функциями полей, без создания объектов моделей и обхода полей сериализатора DRF для каждой
+записи.
+
+ValuesSerializer строит функции по полям обычного сериализатора (serializer_class), поэтому порядок ключей и формат
+значений совпадают с его выводом. Для типов, которые DRF выводит без изменений (числа, строки, логические значения,
+варианты выбора, первичные ключи связей), значение берется из строки как есть, даты и время форматируются так же, как
+DateField/DateTimeField в формате ISO 8601, остальные поля выводятся методом to_representation поля. Поле
+SlugRelatedField выбирается колонкой связанной модели, вложенный сериализатор (например, профиль автора) строится один
+раз для каждого связанного объекта на странице.
+"""
+from collections.abc import Callable, Collection
+from datetime import date, datetime, tzinfo
+from functools import partial
+from operator import itemgetter
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import QuerySet
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+from core.timing import timed
+
+IDENTITY_FIELDS = (serializers.IntegerField, serializers.CharField, serializers.EmailField, serializers.BooleanField,
+                   serializers.ChoiceField, serializers.PrimaryKeyRelatedField)
+
+Mapper = Callable[[dict], Any]
+
+
+def get_converter(field: serializers.Field) -> Callable[[Any], Any] | None:
+    """
+    Возвращает функцию преобразования непустого значения поля или None, если значение выводится как есть.
+    """
+    converter = field.to_representation
+    if type(field) in IDENTITY_FIELDS:
+        converter = None
+    elif type(field) is serializers.DateTimeField and getattr(field, 'format', api_settings.DATETIME_FORMAT) == ISO_8601:
+        tz = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if tz is not None:
+            converter = partial(_format_datetime, tz=tz)
+    elif type(field) is serializers.DateField and getattr(field, 'format', api_settings.DATE_FORMAT) == ISO_8601:
+        converter = date.isoformat
+    return converter
+
+
+def _format_datetime(value: datetime, tz: tzinfo) -> str:
+    """
+    То же, что DateTimeField.to_representation в формате ISO 8601: время в часовом поясе поля, UTC обозначается Z.
+    """
+    value = value.astimezone(tz).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+class ValuesSerializer:
+    """
+    Сериализатор только для вывода списков из словарей QuerySet.values(). get_queryset() выбирает нужные колонки,
+    to_representation() возвращает список словарей с тем же содержимым, что serializer_class(..., many=True).data.
+    Если передан fields, выводятся и выбираются только эти поля верхнего уровня.
+    """
+    serializer_class: type[serializers.ModelSerializer]
+
+    def __init__(self, context: dict | None = None, fields: Collection[str] | None = None):
+        self.columns: list[str] = []
+        self.nested: list[dict] = []
+        serializer = self.serializer_class(context=context or {})
+        self.mappers = self.compile(serializer, '', fields)
+
+    def compile(self, serializer: serializers.Serializer, prefix: str,
+                fields: Collection[str] | None = None) -> list[tuple[str, Mapper]]:
+        mappers = []
+        for name, field in serializer.fields.items():
+            if field.write_only or (fields is not None and name not in fields):
+                continue
+            if field.source == '*' or '.' in field.source:
+                raise ImproperlyConfigured(f'{type(self).__name__} does not support field "{name}" source')
+            column = prefix + field.source
+            if isinstance(field, serializers.BaseSerializer):
+                mappers.append((name, self.compile_nested(field, column)))
+                continue
+            if isinstance(field, serializers.SlugRelatedField):
+                column = f'{column}__{field.slug_field}'
+                self.columns.append(column)
+                mappers.append((name, itemgetter(column)))
+                continue
+            self.columns.append(column)
+            mappers.append((name, self.compile_field(field, column)))
+        return mappers
+
+    def compile_field(self, field: serializers.Field, column: str) -> Mapper:
+        convert = get_converter(field)
+        if convert is None:
+            return itemgetter(column)
+
+        def mapper(row: dict):
+            value = row[column]
+            return None if value is None else convert(value)
+
+        return mapper
+
+    def compile_nested(self, serializer: serializers.BaseSerializer, column: str) -> Mapper:
+        """
+        Вложенный сериализатор связи column: его поля выбираются через column__<поле>, результат запоминается по
+        значению внешнего ключа на время одного вызова to_representation().
+        """
+        if getattr(serializer, 'many', False):
+            raise ImproperlyConfigured(f'{type(self).__name__} does not support many=True field "{column}"')
+        self.columns.append(column)
+        mappers = self.compile(serializer, f'{column}__')
+        cache: dict = {}
+        self.nested.append(cache)
+
+        def mapper(row: dict):
+            key = row[column]
+            if key is None:
+                return None
+            if key not in cache:
+                cache[key] = {name: get(row) for name, get in mappers}
+            return cache[key]
+
+        return mapper
+
+    def get_queryset(self, queryset: QuerySet) -> QuerySet:
+        # id и колонки сортировки нужны постраничному выводу по ключу (goals.pagination), даже если их нет среди полей
+        ordering = [name.lstrip('-') for name in queryset.query.order_by if isinstance(name, str) and name != '?']
+        return queryset.values(*dict.fromkeys([*self.columns, 'id', *ordering]))
+
+    def to_representation(self, rows) -> list[dict]:
+        for cache in self.nested:
+            cache.clear()
+        mappers = self.mappers
+        return [{name: get(row) for name, get in mappers} for row in rows]
+
+    to_representation = timed('serialize', to_representation)
+
+
+class ValuesListMixin:
+    """
+    Примесь для ListAPIView: список выводится через values_serializer_class вместо serializer_class, фильтры,
+    сортировка и постраничный вывод представления сохраняются.
+    """
+    values_serializer_class: type[ValuesSerializer]
+
+    def get_values_serializer(self) -> ValuesSerializer:
+        return self.values_serializer_class(context=self.get_serializer_context())
+
+    def list(self, request, *args, **kwargs):
+        values_serializer = self.get_values_serializer()
+        queryset = values_serializer.get_queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(values_serializer.to_representation(queryset))
+        return self.get_paginated_response(values_serializer.to_representation(page))
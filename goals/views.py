@@ -1,29 +1,54 @@
+import codecs
+
 from django.db import transaction
-from django.db.models import QuerySet
+from django.db.models import Prefetch, QuerySet, prefetch_related_objects
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, generics, permissions
-
-from goals.filters import GoalDateFilter
-from goals.models import (Board, BoardParticipant, Goal, GoalCategory,
-                          GoalComment)
-from goals.permissions import (BoardPermissions, GoalCategoryPermissions,
-                               GoalCommentPermissions, GoalPermissions)
-from goals.serializers import (BoardCreateSerializer, BoardListSerializer,
-                               BoardSerializer, GoalCategoryCreateSerializer,
+from rest_framework import filters, generics, permissions, status
+from rest_framework.exceptions import ErrorDetail, ValidationError
+from rest_framework.response import Response
+
+from goals import cascade, membership, stats, sync
+from goals.bulk import apply_goal_operations
+from goals.conditional import ConditionalGetMixin
+from goals.export import CONTENT_TYPES, export_goals
+from goals.filters import (GoalCategoryFilter, GoalDateFilter,
+                           GoalSearchFilter, autocomplete)
+from goals.importer import import_goals, read_records
+from goals.models import (Board, BoardParticipant, CascadeJob, Goal,
+                          GoalCategory, GoalComment)
+from goals.pagination import LimitOffsetKeysetPagination
+from goals.permissions import (BoardParticipantPermissions, BoardPermissions,
+                               GoalCategoryPermissions, GoalCommentPermissions,
+                               GoalPermissions, with_user_role)
+from goals.serializers import (AutocompleteSerializer,
+                               BoardChangesQuerySerializer,
+                               BoardCreateSerializer, BoardListSerializer,
+                               BoardParticipantSerializer, BoardSerializer,
+                               CascadeJobSerializer, GoalBulkSerializer,
+                               GoalCategoryCreateSerializer,
                                GoalCategorySerializer,
+                               GoalCategoryValuesSerializer,
                                GoalCommentCreateSerializer,
-                               GoalCommentSerializer, GoalCreateSerializer,
-                               GoalSerializer)
+                               GoalCommentSerializer,
+                               GoalCommentValuesSerializer,
+                               GoalCreateSerializer, GoalExportSerializer,
+                               GoalImportFileSerializer, GoalSerializer,
+                               GoalValuesSerializer)
+from goals.sparse import SparseFieldsMixin
+from goals.values import ValuesListMixin
 
 
 class BoardCreateView(generics.CreateAPIView):
     """
     Позволяет пользователю со статусом IsAuthenticated создать доску и получить в ней роль "владелец".
     """
+    query_budget = 4
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = BoardCreateSerializer
 
     def perform_create(self, serializer):
+        # Кэш участия создателя доски сбрасывается сигналом post_save участника
         BoardParticipant.objects.create(user=self.request.user, board=serializer.save())
 
 
@@ -32,6 +57,7 @@ class BoardListView(generics.ListAPIView):
     Позволяет пользователю с разрешениями BoardPermissions видеть список своих досок и досок, в которых он является
     участником.
     """
+    query_budget = 4
     model = Board
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = BoardListSerializer
@@ -39,65 +65,166 @@ class BoardListView(generics.ListAPIView):
     ordering = ['title']
 
     def get_queryset(self):
-        # return Board.objects.prefetch_related('participants').filter(
         return Board.objects.filter(
-            participants__user_id=self.request.user.id,
+            id__in=membership.get_board_ids(self.request.user.id),
             is_deleted=False
         )
 
 
-class BoardView(generics.RetrieveUpdateDestroyAPIView):
+class BoardView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Позволяет пользователю с разрешениями BoardPermissions видеть информацию по созданным пользователем доскам и доскам,
     в которых пользователь является участником. Пользователь с ролью "владелец" может обновлять или удалять доску. При
     удалении доски она получает признак is_deleted, присвоенные доске категории получают статус Архив, цели получают
     статус Архив, но не удаляются из БД.
     """
+    # Обновление с полным набором изменений участников: добавление, смена роли и удаление
+    query_budget = 11
+    etag_board_kwarg = 'pk'
     model = Board
     permission_classes = [BoardPermissions]
     serializer_class = BoardSerializer
 
     def get_queryset(self):
-        # Обратите внимание на фильтрацию – она идет через participants
-        # return Board.objects.filter(participants__user=self.request.user, is_deleted=False)
-        return Board.objects.filter(is_deleted=False)
+        # Доска выбирается вместе с ролью пользователя: участники не фильтруются, чтобы не участник получал 403, а не 404
+        return with_user_role(Board.objects.filter(is_deleted=False), self.request.user.id, 'id').prefetch_related(
+            self.get_participants_prefetch()
+        )
 
-    def perform_destroy(self, instance: Board) -> Board:
-        # При удалении доски помечаем ее как is_deleted,
-        # «удаляем» категории, обновляем статус целей
+    def get_participants_prefetch(self) -> Prefetch:
+        return Prefetch('participants', queryset=BoardParticipant.objects.select_related('user'))
+
+    def update(self, request, *args, **kwargs):
+        """
+        Как UpdateModelMixin.update, но после сохранения участники доски выбираются заново вместе с пользователями
+        одним запросом: UpdateModelMixin только сбрасывает кэш prefetch_related, и ответ выбирал бы пользователя
+        каждого участника отдельным запросом.
+        """
+        serializer = self.get_serializer(self.get_object(), data=request.data, partial=kwargs.pop('partial', False))
+        serializer.is_valid(raise_exception=True)
+        board = serializer.save()
+        board._prefetched_objects_cache = {}
+        prefetch_related_objects([board], self.get_participants_prefetch())
+        return Response(serializer.data)
+
+    def destroy(self, request, *args, **kwargs):
+        job = self.perform_destroy(self.get_object())
+        return Response(CascadeJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    def perform_destroy(self, instance: Board) -> CascadeJob:
+        # При удалении доски помечаем ее как is_deleted, категории «удаляются» и цели архивируются в фоне
         with transaction.atomic():
             instance.is_deleted = True
-            instance.save(update_fields=('is_deleted',))
-            instance.categories.update(is_deleted=True)
-            Goal.objects.filter(category__board=instance).update(status=Goal.Status.archived)
-        return instance
+            instance.save(update_fields=('is_deleted', 'updated'))
+            membership.invalidate(instance.participants.values_list('user_id', flat=True))
+            return cascade.start_board_cascade(instance)
+
+
+class BoardChangesView(generics.GenericAPIView):
+    """
+    Позволяет участнику доски получить изменения доски после курсора предыдущего ответа: измененных участников,
+    категории, цели и комментарии и id удаленных объектов (goals.sync). Параметры: cursor - курсор из ответа, без него
+    выводятся все объекты доски; limit - наибольшее число объектов каждого типа. Если has_more, запрос повторяется с
+    новым курсором.
+    """
+    query_budget = 9
+    permission_classes = [BoardPermissions]
+    serializer_class = BoardChangesQuerySerializer
+
+    def get_queryset(self):
+        return with_user_role(Board.objects.filter(is_deleted=False), self.request.user.id, 'id')
+
+    def get(self, request, *args, **kwargs):
+        board = self.get_object()
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        cursor = serializer.validated_data.get('cursor')
+        positions = sync.decode_cursor(board.id, cursor) if cursor else None
+        return Response(sync.get_changes(board, positions, serializer.validated_data['limit']))
+
+
+class BoardStatsView(generics.RetrieveAPIView):
+    """
+    Позволяет участнику доски получить статистику целей доски: число целей по статусу и приоритету, число просроченных
+    целей и итоги по категориям (goals.stats). Статистика читается из счетчиков, без подсчета целей.
+    """
+    query_budget = 6
+    permission_classes = [BoardPermissions]
+
+    def get_queryset(self):
+        return with_user_role(Board.objects.filter(is_deleted=False), self.request.user.id, 'id')
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(stats.get_board_stats(self.get_object().id))
+
+
+class BoardParticipantCreateView(generics.CreateAPIView):
+    """
+    Позволяет владельцу доски добавить в нее одного участника с ролью "редактор" или "читатель", не передавая
+    весь список участников.
+    """
+    query_budget = 6
+    permission_classes = [BoardParticipantPermissions]
+    serializer_class = BoardParticipantSerializer
+
+    def get_serializer_context(self) -> dict:
+        return super().get_serializer_context() | {'board_id': self.kwargs['pk']}
+
+    def perform_create(self, serializer):
+        # Кэш участия нового участника сбрасывается сигналом post_save
+        serializer.save(board_id=self.kwargs['pk'])
+
+
+class BoardParticipantView(generics.RetrieveUpdateDestroyAPIView):
+    """
+    Позволяет участнику доски видеть роль другого участника (по username), а владельцу - изменить роль участника или
+    удалить его из доски. Владелец доски через этот адрес не изменяется и не удаляется.
+    """
+    query_budget = 6
+    permission_classes = [BoardParticipantPermissions]
+    serializer_class = BoardParticipantSerializer
+    lookup_field = 'user__username'
+    lookup_url_kwarg = 'username'
+
+    def get_serializer_context(self) -> dict:
+        return super().get_serializer_context() | {'board_id': self.kwargs['pk']}
+
+    def get_queryset(self):
+        return BoardParticipant.objects.select_related('user').filter(
+            board_id=self.kwargs['pk']
+        ).exclude(role=BoardParticipant.Role.owner)
 
 
 class GoalCategoryCreateView(generics.CreateAPIView):
     """
     Позволяет создать категорию пользователю с разрешениями GoalCategoryPermissions.
     """
+    query_budget = 5
     # permission_classes = [GoalCategoryPermissions]
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = GoalCategoryCreateSerializer
 
 
-class GoalCategoryListView(generics.ListAPIView):
+class GoalCategoryListView(ConditionalGetMixin, SparseFieldsMixin, ValuesListMixin, generics.ListAPIView):
     """
     Позволяет пользователю с разрешениями GoalCategoryPermissions видеть информацию по категориям, в досках, которых он
     является участником и созданным им самим категории.
     """
+    query_budget = 7
     permission_classes = [GoalCategoryPermissions]
     serializer_class = GoalCategorySerializer
-    filter_backends = [filters.OrderingFilter, filters.SearchFilter]
+    values_serializer_class = GoalCategoryValuesSerializer
+    pagination_class = LimitOffsetKeysetPagination
+    filterset_class = GoalCategoryFilter
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
     ordering_fields = ['title', 'created']
     ordering = ['title']
-    search_fields = ['title', 'description']
+    # Поиск строится как UPPER(title) LIKE UPPER('%...%') и использует триграммный индекс goalcategory_title_trgm_idx
+    search_fields = ['title']
 
     def get_queryset(self):
-        # return GoalCategory.objects.prefetch_related('board__participants').filter(
-        return GoalCategory.objects.filter(
-            board__participants__user_id=self.request.user.id,
+        return GoalCategory.objects.select_related('user').filter(
+            board_id__in=membership.get_board_ids(self.request.user.id),
             is_deleted=False
         )
 
@@ -109,75 +236,149 @@ class GoalCategoryView(generics.RetrieveUpdateDestroyAPIView):
     зависимости от ролей доступа и ролей участия в доске. При удалении категории все цели этой категории переходят в
     статус Архив и не отображаются в списке целей, однако остаются в БД.
     """
+    query_budget = 6
     serializer_class = GoalCategorySerializer
     permission_classes = [GoalCategoryPermissions]
 
     def get_queryset(self):
-        # return GoalCategory.objects.prefetch_related('board__participants').filter(
-        return GoalCategory.objects.filter(
-            board__participants__user_id=self.request.user.id,
-            is_deleted=False
-        )
+        return with_user_role(
+            GoalCategory.objects.select_related('user').filter(is_deleted=False), self.request.user.id
+        ).filter(user_role__isnull=False)
+
+    def destroy(self, request, *args, **kwargs):
+        job = self.perform_destroy(self.get_object())
+        return Response(CascadeJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
-    def perform_destroy(self, instance: GoalCategory) -> GoalCategory:
+    def perform_destroy(self, instance: GoalCategory) -> CascadeJob:
+        # При удалении категории помечаем ее как is_deleted, цели архивируются в фоне
         with transaction.atomic():
             instance.is_deleted = True
-            instance.save(update_fields=('is_deleted',))
-            instance.goals.update(status=Goal.Status.archived)
-        return instance
+            instance.save(update_fields=('is_deleted', 'updated'))
+            return cascade.start_category_cascade(instance)
 
 
 class GoalCreateView(generics.CreateAPIView):
     """
     Позволяет пользователю с разрешениями GoalPermissions создать цель.
     """
+    query_budget = 5
     serializer_class = GoalCreateSerializer
     permission_classes = [GoalPermissions]
 
 
-class GoalListView(generics.ListAPIView):
+class GoalBulkView(generics.GenericAPIView):
+    """
+    Позволяет пользователю со статусом IsAuthenticated создать, обновить или архивировать список целей одним запросом
+    ({"operations": [{"op": "create", "data": {...}}, {"op": "update", "id": 1, "data": {...}},
+    {"op": "archive", "id": 1}]}). Для каждой операции нужна роль "владелец" или "редактор" в доске цели или
+    категории. Ответ содержит результат каждой операции в том же порядке, ошибочные операции не выполняются.
+    """
+    # Создание, обновление и архивация целей в одном пакете
+    query_budget = 9
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GoalBulkSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({'results': apply_goal_operations(request.user, serializer.validated_data['operations'])})
+
+
+class GoalListView(ConditionalGetMixin, SparseFieldsMixin, ValuesListMixin, generics.ListAPIView):
     """
     Позволяет пользователю с разрешениями GoalPermissions видеть список целей, в досках, которых он является участником,
     а также созданные им самим цели.
     """
+    query_budget = 7
     permission_classes = [GoalPermissions]
     serializer_class = GoalSerializer
+    values_serializer_class = GoalValuesSerializer
+    pagination_class = LimitOffsetKeysetPagination
     filterset_class = GoalDateFilter
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, GoalSearchFilter]
     ordering_fields = ['title', 'created']
     ordering = ['title']
     search_fields = ['title', 'description']
 
     def get_queryset(self) -> QuerySet[Goal]:
-        return Goal.objects.filter(
-            category__board__participants__user_id=self.request.user.id,
-            category__is_deleted=False
-        ).exclude(
-            status=Goal.Status.archived
+        return membership.get_visible_goals(self.request.user.id)
+
+
+class GoalExportView(generics.GenericAPIView):
+    """
+    Позволяет пользователю с разрешениями GoalPermissions выгрузить файлом все цели, которые он видит в списке целей,
+    с теми же фильтрами (due_date, category, status, priority). Параметры: file_format - ndjson (по умолчанию) или csv;
+    comments - добавить комментарии к целям. Файл формируется потоково, без пагинации.
+    """
+    query_budget = 6
+    permission_classes = [GoalPermissions]
+    serializer_class = GoalExportSerializer
+    filterset_class = GoalDateFilter
+    filter_backends = [DjangoFilterBackend]
+
+    def get_queryset(self) -> QuerySet[Goal]:
+        return membership.get_visible_goals(self.request.user.id)
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        file_format = serializer.validated_data['file_format']
+        response = StreamingHttpResponse(
+            export_goals(self.filter_queryset(self.get_queryset()), file_format, serializer.validated_data['comments']),
+            content_type=CONTENT_TYPES[file_format],
         )
+        response['Content-Disposition'] = f'attachment; filename="goals.{file_format}"'
+        return response
 
 
-class GoalView(generics.RetrieveUpdateDestroyAPIView):
+class GoalImportView(generics.GenericAPIView):
+    """
+    Позволяет пользователю со статусом IsAuthenticated загрузить цели и комментарии файлом NDJSON или CSV в формате
+    выгрузки (multipart: file, file_format). Категории должны быть в досках, где пользователь - "владелец" или
+    "редактор", авторы (username) - участники тех же досок. Файл загружается целиком или не загружается совсем: при
+    ошибках ответ 400 содержит ошибки по номерам строк.
+    """
+    # Число запросов растет с числом порций файла (IMPORT_CHUNK_SIZE)
+    query_budget = None
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GoalImportFileSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lines = codecs.iterdecode(serializer.validated_data['file'], 'utf-8-sig')
+        try:
+            result = import_goals(request.user, read_records(lines, serializer.validated_data['file_format']))
+        except UnicodeDecodeError as error:
+            # Файл декодируется по мере чтения, транзакция импорта к этому моменту уже откачена
+            raise ValidationError({'file': [ErrorDetail(f'File is not UTF-8 encoded: {error.reason}', code='encoding')]})
+        return Response(result, status=status.HTTP_400_BAD_REQUEST if result['errors'] else status.HTTP_201_CREATED)
+
+
+class GoalView(SparseFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Позволяет пользователю с разрешениями GoalPermissions видеть информацию по созданным им самим целям, а также целям
     в досках, в которых он является участником. Пользователь может обновлять или удалять цель в зависимости от ролей
     доступа и ролей участия в доске. Цель не отображается, если присвоенная ей категория имеет статус Архив. При
     удалении категории все цели этой категории переходят в статус Архив и не отображаются, однако остаются в БД.
     """
+    # Смена категории с переносом цели и ее комментариев в другую доску и записью об их удалении из прежней доски
+    query_budget = 7
     permission_classes = [GoalPermissions]
     serializer_class = GoalSerializer
+    # Доска цели нужна проверке прав GoalPermissions
+    sparse_required_fields = ('board',)
 
     def get_queryset(self) -> QuerySet[Goal]:
-        return Goal.objects.filter(
-            category__board__participants__user_id=self.request.user.id,
-            category__is_deleted=False,
-        ).exclude(
-            status=Goal.Status.archived
-        )
+        return with_user_role(
+            Goal.objects.exclude(status=Goal.Status.archived).exclude(
+                category_id__in=CascadeJob.get_pending_category_ids()
+            ), self.request.user.id
+        ).filter(user_role__isnull=False)
 
     def perform_destroy(self, instance: Goal) -> Goal:
         instance.status = Goal.Status.archived
-        instance.save(update_fields=('status',))
+        instance.save(update_fields=('status', 'updated'))
         return instance
 
 
@@ -185,26 +386,30 @@ class GoalCommentCreateView(generics.CreateAPIView):
     """
     Позволяет пользователю с разрешениями GoalCommentPermissions создать комментарий к цели.
     """
+    query_budget = 5
     serializer_class = GoalCommentCreateSerializer
     permission_classes = [GoalCommentPermissions]
 
 
-class GoalCommentListView(generics.ListAPIView):
+class GoalCommentListView(SparseFieldsMixin, ValuesListMixin, generics.ListAPIView):
     """
     Позволяет пользователю с разрешениями GoalCommentPermissions видеть список своих комментариев и комментарии к целям,
     в досках, в которых он является участником.
     """
+    query_budget = 5
     model = GoalComment
     permission_classes = [GoalCommentPermissions]
     serializer_class = GoalCommentSerializer
+    values_serializer_class = GoalCommentValuesSerializer
+    pagination_class = LimitOffsetKeysetPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['goal']
     ordering = ['-created']
 
     def get_queryset(self):
         # return GoalComment.objects.filter(user_id=self.request.user.id)
-        return GoalComment.objects.filter(
-            goal__category__board__participants__user_id=self.request.user.id,
+        return GoalComment.objects.select_related('user').filter(
+            board_id__in=membership.get_board_ids(self.request.user.id),
         )
 
 
@@ -215,11 +420,55 @@ class GoalCommentView(generics.RetrieveUpdateDestroyAPIView):
     комментарий в зависимости от ролей доступа и ролей участия в доске. Комментарии удаляются полностью при удалении
     Пользователя или Цели.
     """
+    # Удаление с записью об удаленном объекте для синхронизации
+    query_budget = 5
     model = GoalComment
     permission_classes = [GoalCommentPermissions]
     serializer_class = GoalCommentSerializer
 
     def get_queryset(self):
-        return GoalComment.objects.filter(
+        return GoalComment.objects.select_related('user').filter(
             user_id=self.request.user.id
         )
+
+
+class AutocompleteView(generics.GenericAPIView):
+    """
+    Позволяет пользователю со статусом IsAuthenticated получить подсказки по названиям целей и категорий в досках,
+    в которых он является участником. Параметры: q - начало или часть названия, допускаются опечатки; type - goal или
+    category, по умолчанию оба типа; limit - число подсказок каждого типа (по умолчанию 10, не более 50). Архивные цели
+    и удаленные категории не выводятся, как и в списках целей и категорий.
+    """
+    query_budget = 5
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = AutocompleteSerializer
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data['q']
+        limit = serializer.validated_data['limit']
+        kind = serializer.validated_data.get('type')
+        board_ids = membership.get_board_ids(request.user.id)
+
+        data = {}
+        if kind in (None, 'goal'):
+            goals = membership.get_visible_goals(request.user.id)
+            data['goals'] = list(autocomplete(goals, query, limit).values('id', 'title', 'category'))
+        if kind in (None, 'category'):
+            categories = GoalCategory.objects.filter(board_id__in=board_ids, is_deleted=False)
+            data['categories'] = list(autocomplete(categories, query, limit).values('id', 'title', 'board'))
+        return Response(data)
+
+
+class CascadeJobView(generics.RetrieveAPIView):
+    """
+    Позволяет участнику доски видеть ход фонового каскада после удаления доски или категории: статус задачи, число
+    обработанных записей из общего числа.
+    """
+    query_budget = 3
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = CascadeJobSerializer
+
+    def get_queryset(self):
+        return CascadeJob.objects.filter(board__participants__user_id=self.request.user.id)
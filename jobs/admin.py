@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from jobs.models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'priority', 'attempts', 'run_at', 'locked_by')
+    list_filter = ('status', 'name')
+    readonly_fields = ('created', 'updated',)
@@ -0,0 +1,62 @@
+import logging
+import signal
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import close_old_connections
+
+from jobs import pgqueue
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Исполнитель отложенных задач из очереди jobs. Несколько исполнителей можно запускать параллельно: задачи
+    распределяются между ними через SELECT ... FOR UPDATE SKIP LOCKED. Процесс завершается после текущей задачи
+    по SIGTERM/SIGINT.
+    """
+    help = 'Run the database-backed job queue worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--burst', action='store_true', help='Завершиться, когда в очереди не останется задач')
+        parser.add_argument('--sleep', type=float, default=settings.JOBS_POLL_INTERVAL,
+                            help='Пауза между опросами пустой очереди, секунды')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Завершиться после указанного числа задач')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        worker = pgqueue.get_worker_name()
+        logger.info('Worker %s starts handling', worker)
+        processed, next_maintenance = 0, 0.0
+        while not self.stopping:
+            if time.monotonic() >= next_maintenance:
+                self.maintenance()
+                next_maintenance = time.monotonic() + settings.JOBS_MAINTENANCE_INTERVAL
+
+            job = pgqueue.run(pgqueue.claim(worker))
+            close_old_connections()
+            if job is None:
+                if options['burst']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            processed += 1
+            if processed == options['max_jobs']:
+                break
+
+        logger.info('Worker %s stopped after %s jobs', worker, processed)
+
+    def maintenance(self) -> None:
+        if requeued := pgqueue.requeue_stale():
+            logger.warning('Requeued %s stale jobs', requeued)
+        pgqueue.purge(timedelta(days=settings.JOBS_KEEP_DONE_DAYS))
+
+    def stop(self, signum, frame) -> None:
+        self.stopping = True
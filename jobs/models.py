@@ -0,0 +1,87 @@
+from django.db import models
+from django.utils import timezone
+
+
+# Статусы объявлены вне модели, чтобы на них можно было сослаться в условиях индексов Job.Meta
+class JobStatus(models.IntegerChoices):
+    queued = 1, 'В очереди'
+    running = 2, 'Выполняется'
+    done = 3, 'Выполнена'
+    failed = 4, 'Ошибка'
+
+
+class Job(models.Model):
+    """
+    Модель данных для отложенных задач. Задачи выбираются исполнителями (manage.py runworker) по убыванию приоритета
+    и времени запуска через SELECT ... FOR UPDATE SKIP LOCKED, поэтому несколько исполнителей не получают одну задачу.
+    """
+    Status = JobStatus
+
+    name = models.CharField(
+        verbose_name='Задача',
+        max_length=255,
+    )
+    payload = models.JSONField(
+        verbose_name='Параметры',
+        default=dict,
+        blank=True,
+    )
+    priority = models.SmallIntegerField(
+        verbose_name='Приоритет',
+        default=0,
+    )
+    status = models.PositiveSmallIntegerField(
+        verbose_name='Статус',
+        choices=Status.choices,
+        default=Status.queued,
+    )
+    run_at = models.DateTimeField(
+        verbose_name='Время запуска',
+        default=timezone.now,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток',
+        default=0,
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name='Максимум попыток',
+        default=5,
+    )
+    locked_at = models.DateTimeField(
+        verbose_name='Время захвата',
+        null=True,
+        blank=True,
+    )
+    locked_by = models.CharField(
+        verbose_name='Исполнитель',
+        max_length=255,
+        blank=True,
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True,
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата создания',
+        auto_now_add=True,
+    )
+    updated = models.DateTimeField(
+        verbose_name='Дата последнего обновления',
+        auto_now=True,
+    )
+
+    class Meta:
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        indexes = [
+            # Очередь: выборка следующей задачи читает только строки в статусе queued в порядке выдачи
+            models.Index(
+                models.F('priority').desc(), 'run_at', 'id',
+                condition=models.Q(status=JobStatus.queued),
+                name='job_queue_idx',
+            ),
+            models.Index(fields=['locked_at'], condition=models.Q(status=JobStatus.running), name='job_running_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.id}'
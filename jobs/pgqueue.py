@@ -0,0 +1,131 @@
+"""
+Очередь отложенных задач в PostgreSQL, без внешнего брокера.
+
+Обработчик регистрируется декоратором @task('имя') в модуле tasks.py приложения, задача ставится в очередь функцией
+enqueue() в той же транзакции, что и изменения, которые она обрабатывает. Исполнители (manage.py runworker) выбирают
+задачи через SELECT ... FOR UPDATE SKIP LOCKED: захват задачи фиксируется отдельной короткой транзакцией, обработчик
+выполняется вне ее. Упавшая задача повторяется с экспоненциальной задержкой до max_attempts попыток. Задачи, захват
+которых старше JOBS_LOCK_TIMEOUT (исполнитель остановлен), возвращаются в очередь, поэтому обработчики должны быть
+идемпотентными.
+"""
+import logging
+import os
+import socket
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry: dict[str, Callable[..., object]] = {}
+
+
+def task(name: str) -> Callable:
+    """
+    Регистрирует обработчик задачи name. Обработчик получает параметры задачи как именованные аргументы.
+    """
+    def decorator(func: Callable) -> Callable:
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(
+    name: str, payload: dict | None = None, priority: int = 0, run_at: datetime | None = None,
+    max_attempts: int | None = None,
+) -> Job:
+    """
+    Ставит задачу в очередь. При JOBS_EAGER задача выполняется в текущем процессе после фиксации транзакции (тесты,
+    локальный запуск без исполнителя).
+    """
+    if name not in _registry:
+        raise KeyError(f'Unknown job "{name}"')
+
+    job = Job.objects.create(
+        name=name,
+        payload=payload or {},
+        priority=priority,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+    if settings.JOBS_EAGER:
+        transaction.on_commit(lambda: run(claim(job_id=job.id)))
+    return job
+
+
+def get_worker_name() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(worker: str | None = None, job_id: int | None = None) -> Job | None:
+    """
+    Захватывает следующую готовую задачу с наибольшим приоритетом: строки, заблокированные другими исполнителями,
+    пропускаются (SKIP LOCKED). Возвращает None, если готовых задач нет.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = Job.objects.select_for_update(skip_locked=True).filter(status=Job.Status.queued, run_at__lte=now)
+        if job_id is not None:
+            queryset = queryset.filter(id=job_id)
+        job = queryset.order_by('-priority', 'run_at', 'id').first()
+        if job is None:
+            return None
+
+        job.status = Job.Status.running
+        job.attempts += 1
+        job.locked_at = now
+        job.locked_by = worker or get_worker_name()
+        job.save(update_fields=('status', 'attempts', 'locked_at', 'locked_by', 'updated'))
+    return job
+
+
+def run(job: Job | None) -> Job | None:
+    """
+    Выполняет захваченную задачу и сохраняет результат: done, повтор с задержкой или failed после последней попытки.
+    """
+    if job is None:
+        return None
+
+    try:
+        _registry[job.name](**job.payload)
+    except Exception as error:
+        logger.exception('Job %s failed (attempt %s of %s)', job, job.attempts, job.max_attempts)
+        job.last_error = repr(error)
+        if job.attempts < job.max_attempts:
+            job.status = Job.Status.queued
+            job.run_at = timezone.now() + get_backoff(job.attempts)
+        else:
+            job.status = Job.Status.failed
+    else:
+        job.status = Job.Status.done
+
+    job.locked_at, job.locked_by = None, ''
+    job.save(update_fields=('status', 'run_at', 'last_error', 'locked_at', 'locked_by', 'updated'))
+    return job
+
+
+def get_backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(settings.JOBS_RETRY_BASE_DELAY * 2 ** (attempts - 1), settings.JOBS_RETRY_MAX_DELAY))
+
+
+def requeue_stale() -> int:
+    """
+    Возвращает в очередь задачи, захваченные исполнителями, которые не завершили их за JOBS_LOCK_TIMEOUT секунд.
+    """
+    deadline = timezone.now() - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    return Job.objects.filter(status=Job.Status.running, locked_at__lt=deadline).update(
+        status=Job.Status.queued, locked_at=None, locked_by='', run_at=timezone.now(), updated=timezone.now(),
+    )
+
+
+def purge(older_than: timedelta) -> int:
+    """
+    Удаляет выполненные задачи старше older_than.
+    """
+    deleted, _ = Job.objects.filter(status=Job.Status.done, updated__lt=timezone.now() - older_than).delete()
+    return deleted
@@ -0,0 +1,36 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from benchmarks.tg_stub import tg_stub
+from bot.models import TgUser
+
+
+@pytest.mark.django_db()
+class TestVerificationView:
+    @pytest.fixture(autouse=True)
+    def setup(self, settings):  # noqa: PT004
+        self.url = reverse('bot:verify-user')
+        self.tg_user = TgUser.objects.create(chat_id=42, verification_code='code')
+        with tg_stub() as self.stub:
+            settings.TG_API_URL = self.stub.url
+            yield
+
+    def test_auth_required(self, client):
+        response = client.patch(self.url, {'verification_code': 'code'})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_verify(self, auth_client, user):
+        response = auth_client.patch(self.url, {'verification_code': 'code'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'tg_id': '42', 'verification_code': 'code', 'user_id': user.id}
+        self.tg_user.refresh_from_db()
+        assert self.tg_user.user == user
+        assert self.stub.calls == [('sendMessage', {'chat_id': '42', 'text': '[verification has been completed]'})]
+
+    def test_wrong_code(self, auth_client):
+        response = auth_client.patch(self.url, {'verification_code': 'wrong'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert self.stub.calls == []
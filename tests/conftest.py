@@ -1,9 +1,40 @@
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
 pytest_plugins = 'tests.factories'
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def membership_cache(settings):
+    """
+    Тесты выполняются в одном процессе, поэтому кэш участия в досках включается и с кэшем в памяти процесса.
+    """
+    settings.GOALS_MEMBERSHIP_CACHE_TIMEOUT = 300
+
+
+@pytest.fixture(autouse=True)
+def eager_jobs(settings):
+    """
+    Задачи очереди jobs выполняются в том же процессе после коммита (см. django_capture_on_commit_callbacks).
+    """
+    settings.JOBS_EAGER = True
+
+
+@pytest.fixture(autouse=True)
+def query_budget(settings):
+    """
+    Запрос к представлению сверх его бюджета query_budget или с повторяющимися запросами к БД (N+1) завершается
+    ошибкой core.querybudget.QueryBudgetExceededError.
+    """
+    settings.QUERY_BUDGET_MODE = 'raise'
+
+
 @pytest.fixture()
 def client() -> APIClient:
     return APIClient()
@@ -13,3 +44,12 @@ def client() -> APIClient:
 def auth_client(client, user):
     client.force_login(user)
     return client
+
+
+@pytest.fixture()
+def force_auth_client(client, user):
+    """
+    Клиент без сессии: запросы не обращаются к таблицам сессий и пользователей, что удобно для подсчета запросов к БД.
+    """
+    client.force_authenticate(user)
+    return client
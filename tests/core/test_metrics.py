@@ -0,0 +1,89 @@
+import json
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from core.metrics import Counter, Gauge, Histogram, Registry, serve
+
+
+def test_render():
+    registry = Registry()
+    Counter('requests_total', 'Requests', ['view'], registry=registry).inc(view='goal')
+    Histogram('duration_seconds', 'Duration', buckets=(0.1, 1), registry=registry).observe(0.5)
+
+    assert registry.render().splitlines() == [
+        '# HELP requests_total Requests',
+        '# TYPE requests_total counter',
+        'requests_total{view="goal"} 1',
+        '# HELP duration_seconds Duration',
+        '# TYPE duration_seconds histogram',
+        'duration_seconds_bucket{le="0.1"} 0',
+        'duration_seconds_bucket{le="1"} 1',
+        'duration_seconds_bucket{le="+Inf"} 1',
+        'duration_seconds_sum 0.5',
+        'duration_seconds_count 1',
+    ]
+
+
+def test_merge_processes(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    registry = Registry()
+    Counter('requests_total', 'Requests', registry=registry).inc(2)
+    Gauge('connections', 'Connections', registry=registry).set(1)
+    # Файл завершившегося процесса: его счетчики учитываются, значения Gauge - нет
+    (tmp_path / '999999999.json').write_text(json.dumps({
+        'requests_total': {'kind': 'counter', 'documentation': 'Requests', 'samples': [['', [], 3]]},
+        'connections': {'kind': 'gauge', 'documentation': 'Connections', 'samples': [['', [], 5]]},
+    }))
+
+    metrics = registry.collect_all()
+
+    assert metrics['requests_total']['samples'] == [('', (), 5)]
+    assert [value for _, _, value in metrics['connections']['samples']] == [1]
+
+
+def test_serve_token(settings):
+    settings.METRICS_TOKEN = 'secret'
+    server = serve(0)
+    url = f'http://127.0.0.1:{server.server_address[1]}/'
+    try:
+        with pytest.raises(HTTPError) as error:
+            urlopen(url, timeout=5)
+        assert error.value.code == status.HTTP_403_FORBIDDEN
+        with urlopen(Request(url, headers={'Authorization': 'Bearer secret'}), timeout=5) as response:
+            assert response.status == status.HTTP_200_OK
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.django_db()
+class TestMetricsView:
+    url = reverse('metrics')
+
+    def test_metrics(self, auth_client, settings):
+        settings.DEBUG = True
+        auth_client.get(reverse('goals:list-goals'))
+
+        response = auth_client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        body = response.content.decode()
+        assert 'http_requests_total{view="goals:list-goals",method="GET",status="200"}' in body
+        assert 'db_queries_per_request_count{view="goals:list-goals"}' in body
+        assert 'cache_requests_total{cache="membership",result="miss"}' in body
+        assert 'db_server_connections{state="active"}' in body
+
+    def test_token(self, client, settings):
+        settings.METRICS_TOKEN = 'secret'
+
+        assert client.get(self.url).status_code == status.HTTP_403_FORBIDDEN
+        assert client.get(self.url, HTTP_AUTHORIZATION='Bearer secret').status_code == status.HTTP_200_OK
+
+    def test_token_required_without_debug(self, client, settings):
+        settings.DEBUG, settings.METRICS_TOKEN = False, ''
+
+        assert client.get(self.url).status_code == status.HTTP_403_FORBIDDEN
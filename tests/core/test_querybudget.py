@@ -0,0 +1,43 @@
+import logging
+
+import pytest
+from django.urls import reverse
+from rest_framework import generics, status
+
+from core.querybudget import QueryBudgetExceededError, fingerprint
+from goals.models import GoalComment
+from goals.views import BoardListView, GoalCommentListView
+
+
+def test_fingerprint_collapses_parameter_lists():
+    assert fingerprint('SELECT 1 FROM t WHERE id IN (%s, %s, %s)') == 'SELECT 1 FROM t WHERE id IN (%s)'
+    assert fingerprint('INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)') == 'INSERT INTO t (a, b) VALUES (%s)'
+
+
+@pytest.mark.django_db()
+class TestQueryBudgetMiddleware:
+    def test_over_budget(self, auth_client, monkeypatch):
+        monkeypatch.setattr(BoardListView, 'query_budget', 1)
+
+        with pytest.raises(QueryBudgetExceededError, match='budget 1'):
+            auth_client.get(reverse('goals:list-boards'))
+
+    def test_repeated_queries(self, auth_client, goal_comment_factory, monkeypatch):
+        # Пользователь сессии и авторы трех комментариев, выведенных через ModelSerializer без select_related
+        goal_comment_factory.create_batch(3)
+        monkeypatch.setattr(GoalCommentListView, 'get_queryset', lambda view: GoalComment.objects.all())
+        monkeypatch.setattr(GoalCommentListView, 'list', generics.ListAPIView.list)
+
+        with pytest.raises(QueryBudgetExceededError, match='4 x SELECT "core_user"'):
+            auth_client.get(reverse('goals:list-comment'))
+
+    def test_log_mode(self, auth_client, settings, monkeypatch, caplog):
+        settings.QUERY_BUDGET_MODE = 'log'
+        settings.QUERY_BUDGET_SAMPLE_RATE = 1
+        monkeypatch.setattr(BoardListView, 'query_budget', 1)
+
+        with caplog.at_level(logging.WARNING, logger='core.querybudget'):
+            response = auth_client.get(reverse('goals:list-boards'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert 'budget 1 (BoardListView)' in caplog.text
@@ -0,0 +1,147 @@
+import datetime
+import decimal
+import io
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import get_resolver, reverse
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+from goals.models import (BoardParticipant, CascadeJob, Goal, GoalCategory,
+                          GoalComment)
+
+PASSWORD = 'Pa55-word-for-tests'
+
+# Запрос к каждому URL из goals/urls.py и core/urls.py: метод, аргументы URL и тело запроса (для GET - параметры) по
+# объектам из fixture objects
+CASES = {
+    'goals:create-board': ('post', None, lambda o: {'title': 'Доска'}),
+    'goals:list-boards': ('get', None, None),
+    'goals:retrieve-update-destroy-boards': ('get', lambda o: [o['board'].id], None),
+    'goals:board-changes': ('get', lambda o: [o['board'].id], None),
+    'goals:board-stats': ('get', lambda o: [o['board'].id], None),
+    'goals:create-participant': ('post', lambda o: [o['board'].id], lambda o: {
+        'user': o['outsider'].username, 'role': BoardParticipant.Role.writer}),
+    'goals:participant': ('patch', lambda o: [o['board'].id, o['reader'].username], lambda o: {
+        'role': BoardParticipant.Role.writer}),
+    'goals:create-category': ('post', None, lambda o: {'title': 'Категория', 'board': o['board'].id}),
+    'goals:list-categories': ('get', None, lambda o: {'ordering': '-created'}),
+    'goals:category': ('get', lambda o: [o['category'].id], None),
+    'goals:create-goal': ('post', None, lambda o: {
+        'title': 'Цель\u2028', 'category': o['category'].id, 'due_date': '2026-01-31',
+        'priority': Goal.Priority.high}),
+    'goals:list-goals': ('get', None, lambda o: {'category': o['category'].id}),
+    'goals:export-goals': ('get', None, None),
+    'goals:import-goals': ('post', None, lambda o: {
+        'file': SimpleUploadedFile('goals.ndjson', json.dumps({'title': 'x', 'category': o['category'].id}).encode()),
+        'file_format': 'ndjson'}),
+    'goals:bulk-goals': ('post', None, lambda o: {'operations': [
+        {'op': 'create', 'data': {'title': 'Новая', 'category': o['category'].id}},
+        {'op': 'update', 'id': o['goal'].id, 'data': {'status': Goal.Status.in_progress}},
+        {'op': 'archive', 'id': 0}]}),
+    'goals:goal': ('get', lambda o: [o['goal'].id], None),
+    'goals:create-comment': ('post', None, lambda o: {'goal': o['goal'].id, 'text': 'Комментарий'}),
+    'goals:list-comment': ('get', None, None),
+    'goals:comment': ('get', lambda o: [o['comment'].id], None),
+    'goals:cascade': ('get', lambda o: [o['cascade'].id], None),
+    'goals:autocomplete': ('get', None, lambda o: {'q': 'Ц'}),
+    'core:signup': ('post', None, lambda o: {
+        'username': 'new-user', 'password': PASSWORD, 'password_repeat': PASSWORD}),
+    'core:login': ('post', None, lambda o: {'username': o['user'].username, 'password': PASSWORD}),
+    'core:profile': ('get', None, None),
+    'core:update-password': ('patch', None, lambda o: {'old_password': PASSWORD, 'new_password': PASSWORD[::-1]}),
+}
+
+ANONYMOUS = {'core:signup', 'core:login'}
+
+
+def url_names(namespace: str) -> set[str]:
+    resolver = get_resolver().namespace_dict[namespace][1]
+    return {f'{namespace}:{name}' for name in resolver.reverse_dict if isinstance(name, str)}
+
+
+def test_cases_cover_urls():
+    assert set(CASES) == url_names('goals') | url_names('core')
+
+
+@pytest.fixture()
+def objects(user, user_factory, board_factory, board_participant_factory, goal_category_factory, goal_factory):
+    user.set_password(PASSWORD)
+    user.save()
+    board = board_factory.create(with_owner=user)
+    category = goal_category_factory.create(board=board, user=user, title='Цели на год')
+    goal = goal_factory.create(user=user, category=category, title='Цель «первая»', description='Описание',
+                               due_date=datetime.datetime(2026, 1, 31, tzinfo=datetime.timezone.utc),
+                               priority=Goal.Priority.critical)
+    return {
+        'user': user,
+        'board': board,
+        'outsider': user_factory.create(),
+        'reader': board_participant_factory.create(board=board, role=BoardParticipant.Role.reader).user,
+        'category': category,
+        'goal': goal,
+        'comment': GoalComment.objects.create(goal=goal, user=user, text='Текст\u2029'),
+        'cascade': CascadeJob.objects.create(
+            board=board, category=GoalCategory.objects.create(board=board, user=user, title='Удалена', is_deleted=True),
+            total=10, processed=3,
+        ),
+    }
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize('name', list(CASES))
+def test_same_output_as_json_renderer(objects, auth_client, name):
+    method, get_args, get_data = CASES[name]
+    url = reverse(name, args=get_args(objects) if get_args else None)
+    data = get_data(objects) if get_data else None
+    request_format = 'multipart' if name == 'goals:import-goals' else 'json'
+    if name in ANONYMOUS:
+        auth_client.logout()
+
+    response = getattr(auth_client, method)(url, data, format=None if method == 'get' else request_format)
+
+    assert response.status_code < status.HTTP_400_BAD_REQUEST, response.content
+    if response.streaming or response.status_code == status.HTTP_204_NO_CONTENT:
+        return
+    assert response['Content-Type'] == 'application/json'
+    assert response.content == JSONRenderer().render(response.data)
+
+
+def test_render_types():
+    data = {
+        'decimal': decimal.Decimal('1.50'),
+        'datetime': datetime.datetime(2026, 1, 31, 12, 30, tzinfo=datetime.timezone.utc),
+        'date': datetime.date(2026, 1, 31),
+        'priority': Goal.Priority.critical,
+        'text': 'Текст \u2028 "кавычки"',
+        'big': 2 ** 70,
+        'nested': [(1, 2), None, True, 1.5],
+    }
+
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+    assert FastJSONRenderer().render(data, 'application/json; indent=2') == JSONRenderer().render(
+        data, 'application/json; indent=2')
+
+
+@pytest.mark.parametrize('body', [
+    b'{"title": "\xd0\xa6\xd0\xb5\xd0\xbb\xd1\x8c", "items": [1, 2.5, null, true]}',
+    b'{"big": 18446744073709551616}',
+])
+def test_parse(body):
+    assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+
+@pytest.mark.parametrize('body', [b'{"title": ', b'{"value": NaN}'])
+def test_parse_error(body):
+    with pytest.raises(ParseError) as fast_error:
+        FastJSONParser().parse(io.BytesIO(body))
+    with pytest.raises(ParseError) as error:
+        JSONParser().parse(io.BytesIO(body))
+
+    assert str(fast_error.value) == str(error.value)
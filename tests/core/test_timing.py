@@ -0,0 +1,41 @@
+import logging
+import pstats
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+
+@pytest.mark.django_db()
+class TestServerTimingMiddleware:
+    url = reverse('goals:list-goals')
+
+    def test_header(self, auth_client):
+        response = auth_client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        phases = {entry.split(';')[0]: entry for entry in response['Server-Timing'].split(', ')}
+        assert {'auth', 'perm', 'db', 'orm', 'serialize', 'render', 'total'} <= phases.keys()
+        assert phases['db'].endswith(' queries"')
+
+    def test_log(self, auth_client, settings, caplog):
+        settings.SERVER_TIMING_LOG_THRESHOLD_MS = 0
+
+        with caplog.at_level(logging.INFO, logger='core.timing'):
+            auth_client.get(self.url)
+
+        record = caplog.records[-1]
+        assert (record.view, record.status) == ('goals:list-goals', status.HTTP_200_OK)
+        assert record.server_timing['total'] >= record.server_timing['db']
+
+    def test_profile(self, auth_client, settings, user, tmp_path):
+        settings.PROFILE_DIR = str(tmp_path)
+        assert 'X-Profile-File' not in auth_client.get(self.url, HTTP_X_PROFILE='1')
+
+        user.is_staff = True
+        user.save(update_fields=('is_staff',))
+        response = auth_client.get(self.url, HTTP_X_PROFILE='1')
+
+        assert response.status_code == status.HTTP_200_OK
+        stats = pstats.Stats(str(tmp_path / response['X-Profile-File']))
+        assert stats.total_calls > 0
@@ -0,0 +1,95 @@
+import pytest
+from django.db import transaction
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import BoardParticipant, BoardVersion, Goal, GoalCategory
+
+
+@pytest.mark.django_db()
+class TestConditionalGet:
+    @pytest.fixture(autouse=True)
+    def setup(self, board_factory, goal_category_factory, goal_factory, user):
+        self.board = board_factory.create(with_owner=user)
+        self.category = goal_category_factory.create(board=self.board, user=user)
+        self.goal = goal_factory.create(category=self.category, user=user)
+        self.urls = [
+            reverse('goals:list-goals'),
+            reverse('goals:list-categories'),
+            reverse('goals:retrieve-update-destroy-boards', args=[self.board.id]),
+        ]
+
+    def get_etags(self, client) -> list[str]:
+        etags = []
+        for url in self.urls:
+            response = client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            etags.append(response['ETag'])
+        return etags
+
+    def test_not_modified(self, force_auth_client, django_assert_num_queries):
+        for url, etag in zip(self.urls, self.get_etags(force_auth_client)):
+            with django_assert_num_queries(1):
+                response = force_auth_client.get(url, HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+            assert response['ETag'] == etag
+            assert response.content == b''
+
+    def test_query_string(self, force_auth_client):
+        url = self.urls[0]
+        etag = force_auth_client.get(url)['ETag']
+
+        response = force_auth_client.get(url, {'ordering': 'title'}, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+
+    @pytest.mark.parametrize('change', ['goal', 'category', 'author', 'participant', 'board'])
+    def test_modified(self, force_auth_client, user_factory, change):
+        etags = self.get_etags(force_auth_client)
+        version = BoardVersion.objects.get(board=self.board).version
+        match change:
+            case 'goal':
+                Goal.objects.filter(id=self.goal.id).update(status=Goal.Status.done)
+            case 'category':
+                GoalCategory.objects.filter(id=self.category.id).update(title='Новое название')
+            case 'author':
+                self.category.user.first_name = 'Имя'
+                self.category.user.save()
+            case 'participant':
+                BoardParticipant.objects.create(board=self.board, user=user_factory.create())
+            case 'board':
+                self.board.title = 'Новое название'
+                self.board.save()
+
+        assert BoardVersion.objects.get(board=self.board).version == version + 1
+        for url, etag in zip(self.urls, etags):
+            assert force_auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+    def test_unchanged_profile(self, user):
+        version = BoardVersion.objects.get(board=self.board).version
+        user.last_name = user.last_name
+        user.save()
+
+        assert BoardVersion.objects.get(board=self.board).version == version
+
+    def test_not_participant(self, client, user_factory):
+        client.force_authenticate(user_factory.create())
+
+        response = client.get(self.urls[2], HTTP_IF_NONE_MATCH='*')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert not response.has_header('ETag')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_hard_delete_board(board_factory):
+    # Связанные объекты доски защищены от удаления (PROTECT), удаляется только пустая доска
+    board = board_factory.create()
+    assert BoardVersion.objects.filter(board=board).exists()
+
+    with transaction.atomic():
+        board.delete()
+
+    assert not BoardVersion.objects.exists()
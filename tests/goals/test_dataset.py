@@ -0,0 +1,42 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+
+from goals.models import Board, BoardParticipant, Goal, GoalComment
+
+
+def generate(prefix: str, *args) -> list[tuple]:
+    goal_ids = set(Goal.objects.values_list('id', flat=True))
+    call_command(
+        'generate_dataset', '--users', '20', '--boards', '10', '--goals', '500', '--chunk-size', '200',
+        '--prefix', prefix, *args, stdout=StringIO(),
+    )
+    return list(Goal.objects.exclude(id__in=goal_ids).order_by('id').values_list('title', 'status', 'priority'))
+
+
+@pytest.mark.django_db()
+def test_generate_dataset():
+    first = generate('first', '--seed', '1')
+
+    assert len(first) == 500
+    assert Board.objects.count() == 10
+    assert BoardParticipant.objects.filter(role=BoardParticipant.Role.owner).count() == 10
+    assert GoalComment.objects.exists()
+    assert not Goal.objects.exclude(board_id=F('category__board_id')).exists()
+    assert not GoalComment.objects.exclude(board_id=F('goal__board_id')).exists()
+    assert Goal.objects.filter(search_vector__isnull=False).count() == 500
+
+    assert generate('second', '--seed', '1') == first
+    assert generate('third', '--seed', '2') != first
+
+
+@pytest.mark.django_db(transaction=True)
+def test_generate_dataset_defer_indexes():
+    generate('deferred', '--defer-indexes')
+
+    with connection.cursor() as cursor:
+        indexes = connection.introspection.get_constraints(cursor, Goal._meta.db_table)
+    assert {index.name for index in Goal._meta.indexes} <= set(indexes)
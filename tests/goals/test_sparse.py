@@ -0,0 +1,76 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+
+def get_sql(context: CaptureQueriesContext, table: str) -> str:
+    return next(query['sql'] for query in context.captured_queries if f'FROM "{table}"' in query['sql'])
+
+
+@pytest.mark.django_db()
+class TestSparseFields:
+    @pytest.fixture(autouse=True)
+    def setup(self, board_factory, goal_category_factory, goal_factory, goal_comment_factory, user):
+        self.board = board_factory.create(with_owner=user)
+        self.category = goal_category_factory.create(board=self.board, user=user)
+        self.goals = goal_factory.create_batch(3, category=self.category, user=user, description='Описание')
+        self.comment = goal_comment_factory.create(goal=self.goals[0], user=user, text='Текст')
+
+    def test_goal_list(self, force_auth_client):
+        with CaptureQueriesContext(connection) as context:
+            response = force_auth_client.get(reverse('goals:list-goals'), {'fields': 'priority,title,status'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [list(item) for item in response.data] == [['title', 'status', 'priority']] * 3
+        assert '"description"' not in get_sql(context, 'goals_goal')
+
+    def test_goal_list_cursor(self, force_auth_client):
+        url = reverse('goals:list-goals')
+        response = force_auth_client.get(url, {'fields': 'title', 'ordering': 'title', 'cursor': '', 'limit': 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'] == [{'title': goal.title} for goal in sorted(self.goals, key=lambda g: g.title)[:2]]
+
+        response = force_auth_client.get(response.data['next'])
+
+        assert [item['title'] for item in response.data['results']] == [max(goal.title for goal in self.goals)]
+
+    def test_goal(self, force_auth_client):
+        with CaptureQueriesContext(connection) as context:
+            response = force_auth_client.get(reverse('goals:goal', args=[self.goals[0].id]), {'fields': 'id,due_date'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {'id': self.goals[0].id, 'due_date': None}
+        assert '"description"' not in get_sql(context, 'goals_goal')
+
+    def test_comment_list(self, force_auth_client):
+        with CaptureQueriesContext(connection) as context:
+            response = force_auth_client.get(reverse('goals:list-comment'), {'fields': 'id,user'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.data[0]) == ['id', 'user']
+        assert response.data[0]['user']['id'] == self.comment.user_id
+        assert '"text"' not in get_sql(context, 'goals_goalcomment')
+
+    def test_category_list(self, force_auth_client):
+        response = force_auth_client.get(reverse('goals:list-categories'), {'fields': 'id,title'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == [{'id': self.category.id, 'title': self.category.title}]
+
+    @pytest.mark.parametrize('fields', ['title,unknown', 'is_deleted'])
+    def test_unknown_field(self, force_auth_client, fields):
+        response = force_auth_client.get(reverse('goals:list-categories'), {'fields': fields})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'fields' in response.data
+
+    def test_update_ignores_fields(self, force_auth_client):
+        url = reverse('goals:goal', args=[self.goals[0].id]) + '?fields=title'
+        response = force_auth_client.patch(url, {'status': 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['status'] == 2
+        assert 'description' in response.data
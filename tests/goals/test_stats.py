@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from goals import stats
+from goals.models import Goal, GoalCounter, GoalDueCounter
+
+
+@pytest.mark.django_db()
+class TestBoardStatsView:
+    @pytest.fixture(autouse=True)
+    def setup(self, board_factory, goal_category_factory, goal_factory, user):
+        self.board = board_factory.create(with_owner=user)
+        self.url = reverse('goals:board-stats', args=[self.board.id])
+        self.categories = goal_category_factory.create_batch(2, board=self.board, user=user)
+        self.categories.sort(key=lambda category: (category.title, category.id))
+        yesterday = timezone.now() - timedelta(days=1)
+        first, second = self.categories
+        self.goals = [
+            goal_factory.create(category=first, user=user, priority=Goal.Priority.high, due_date=yesterday),
+            goal_factory.create(category=first, user=user, status=Goal.Status.in_progress),
+            goal_factory.create(category=first, user=user, status=Goal.Status.done, due_date=yesterday),
+            goal_factory.create(category=second, user=user, due_date=timezone.now() + timedelta(days=1)),
+            goal_factory.create(category=second, user=user, status=Goal.Status.archived, due_date=yesterday),
+        ]
+        # Цели других досок не учитываются
+        goal_factory.create(user=user, due_date=yesterday)
+
+    def get_stats(self, client) -> dict:
+        response = client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK, response.data
+        return response.json()
+
+    def test_success(self, force_auth_client, django_assert_num_queries):
+        with django_assert_num_queries(4):
+            data = self.get_stats(force_auth_client)
+
+        assert data == {
+            'board': self.board.id,
+            'total': 4,
+            'by_status': {'to_do': 2, 'in_progress': 1, 'done': 1},
+            'by_priority': {'low': 0, 'medium': 3, 'high': 1, 'critical': 0},
+            'overdue': 1,
+            'categories': [
+                {'id': self.categories[0].id, 'title': self.categories[0].title, 'total': 3, 'overdue': 1},
+                {'id': self.categories[1].id, 'title': self.categories[1].title, 'total': 1, 'overdue': 0},
+            ],
+        }
+
+    def test_not_participant(self, client, user_factory):
+        client.force_authenticate(user_factory.create())
+
+        response = client.get(self.url)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_goal_changes(self, force_auth_client, auth_client, goal_factory):
+        goal_factory.create(category=self.categories[1], user=self.categories[1].user, priority=Goal.Priority.low)
+        auth_client.patch(reverse('goals:goal', args=[self.goals[0].id]), {'status': Goal.Status.done})
+        auth_client.delete(reverse('goals:goal', args=[self.goals[1].id]))
+        Goal.objects.filter(id=self.goals[3].id).update(due_date=timezone.now() - timedelta(days=2))
+
+        data = self.get_stats(force_auth_client)
+
+        assert data['by_status'] == {'to_do': 2, 'in_progress': 0, 'done': 2}
+        assert data['by_priority'] == {'low': 1, 'medium': 2, 'high': 1, 'critical': 0}
+        assert data['overdue'] == 1
+        assert [(category['total'], category['overdue']) for category in data['categories']] == [(2, 0), (2, 1)]
+
+    def test_category_cascade(self, force_auth_client, auth_client, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            auth_client.delete(reverse('goals:category', args=[self.categories[0].id]))
+
+        data = self.get_stats(force_auth_client)
+
+        assert data['total'] == 1
+        assert [category['id'] for category in data['categories']] == [self.categories[1].id]
+        assert GoalCounter.objects.filter(category=self.categories[0]).exclude(status=Goal.Status.archived).filter(
+            count__gt=0).count() == 0
+
+    def test_moved_and_deleted_goals(self, force_auth_client, auth_client, goal_category_factory, user):
+        other = goal_category_factory.create(user=user)
+        auth_client.patch(reverse('goals:goal', args=[self.goals[0].id]), {'category': other.id})
+        self.goals[1].delete()
+
+        data = self.get_stats(force_auth_client)
+
+        assert data['total'] == 2
+        assert data['overdue'] == 0
+        assert stats.reconcile_counters([self.board.id, other.board_id]) == set()
+
+    def test_rebuild(self, force_auth_client, capsys):
+        expected = self.get_stats(force_auth_client)
+        GoalCounter.objects.filter(board=self.board).update(count=100)
+        GoalDueCounter.objects.filter(board=self.board).delete()
+
+        call_command('rebuild_goal_counters')
+
+        assert capsys.readouterr().out.strip().endswith('rebuilt counters of 1')
+        assert self.get_stats(force_auth_client) == expected
+        assert stats.reconcile_counters([self.board.id]) == set()
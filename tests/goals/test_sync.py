@@ -0,0 +1,129 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from goals import sync
+from goals.models import BoardParticipant, Goal, GoalCategory, GoalComment
+from goals.serializers import GoalSerializer
+
+
+@pytest.mark.django_db()
+class TestBoardChangesView:
+    @pytest.fixture(autouse=True)
+    def setup(self, board_factory, goal_category_factory, goal_factory, user, settings):
+        settings.GOALS_SYNC_LAG = 0
+        self.board = board_factory.create(with_owner=user)
+        self.url = reverse('goals:board-changes', args=[self.board.id])
+        self.category = goal_category_factory.create(board=self.board, user=user)
+        self.goals = goal_factory.create_batch(3, category=self.category, user=user)
+        self.comment = GoalComment.objects.create(goal=self.goals[0], user=user, text='Комментарий')
+
+    def sync(self, client, cursor: str | None = None, **params) -> dict:
+        response = client.get(self.url, {'cursor': cursor, **params} if cursor else params)
+        assert response.status_code == status.HTTP_200_OK, response.data
+        return response.json()
+
+    def test_full_and_empty(self, force_auth_client, user):
+        data = self.sync(force_auth_client)
+
+        assert data['board']['id'] == self.board.id
+        assert [participant['user'] for participant in data['participants']] == [user.username]
+        assert [category['id'] for category in data['categories']] == [self.category.id]
+        assert data['categories'][0]['is_deleted'] is False
+        assert data['goals'] == GoalSerializer(self.goals, many=True).data
+        assert [comment['id'] for comment in data['comments']] == [self.comment.id]
+        assert data['has_more'] is False
+
+        data = self.sync(force_auth_client, data['cursor'])
+
+        assert (data['participants'], data['categories'], data['goals'], data['comments']) == ([], [], [], [])
+        assert data['deleted'] == {'participants': [], 'categories': [], 'goals': [], 'comments': []}
+
+    def test_changes(self, force_auth_client, auth_client, user_factory, goal_factory):
+        cursor = self.sync(force_auth_client)['cursor']
+        reader = BoardParticipant.objects.create(board=self.board, user=user_factory.create(),
+                                                 role=BoardParticipant.Role.reader)
+        auth_client.delete(reverse('goals:goal', args=[self.goals[1].id]))
+        auth_client.delete(reverse('goals:comment', args=[self.comment.id]))
+        new_goal = goal_factory.create(category=self.category, user=self.category.user)
+        auth_client.put(reverse('goals:retrieve-update-destroy-boards', args=[self.board.id]),
+                        {'title': 'Новая доска', 'participants': []}, format='json')
+
+        data = self.sync(force_auth_client, cursor)
+
+        assert data['board']['title'] == 'Новая доска'
+        assert data['participants'] == []
+        assert [(goal['id'], goal['status']) for goal in data['goals']] == [
+            (self.goals[1].id, Goal.Status.archived), (new_goal.id, Goal.Status.to_do),
+        ]
+        assert data['deleted'] == {
+            'participants': [reader.id], 'categories': [], 'goals': [], 'comments': [self.comment.id],
+        }
+
+    def test_moved_goal(self, force_auth_client, board_factory, goal_category_factory, user):
+        cursor = self.sync(force_auth_client)['cursor']
+        other_category = goal_category_factory.create(board=board_factory.create(with_owner=user), user=user)
+        goal = self.goals[0]
+        goal.category = other_category
+        goal.save()
+
+        data = self.sync(force_auth_client, cursor)
+
+        assert data['goals'] == []
+        assert data['deleted']['goals'] == [goal.id]
+        assert data['deleted']['comments'] == [self.comment.id]
+        assert GoalComment.objects.get(id=self.comment.id).board_id == other_category.board_id
+
+    def test_pages(self, force_auth_client, django_assert_max_num_queries):
+        Goal.objects.filter(board=self.board).update(updated=timezone.now())
+        data, goal_ids = {'cursor': None, 'has_more': True}, []
+        while data['has_more']:
+            with django_assert_max_num_queries(7):
+                data = self.sync(force_auth_client, data['cursor'], limit=2)
+            goal_ids.extend(goal['id'] for goal in data['goals'])
+
+        assert goal_ids == [goal.id for goal in self.goals]
+
+    def test_cascade(self, force_auth_client, auth_client, django_capture_on_commit_callbacks):
+        cursor = self.sync(force_auth_client)['cursor']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            auth_client.delete(reverse('goals:category', args=[self.category.id]))
+
+        data = self.sync(force_auth_client, cursor)
+        assert [(category['id'], category['is_deleted']) for category in data['categories']] == [
+            (self.category.id, True),
+        ]
+        assert {goal['status'] for goal in data['goals']} == {Goal.Status.archived}
+        assert len(data['goals']) == len(self.goals)
+
+    def test_invalid_cursor(self, force_auth_client, board_factory, user):
+        other_board = board_factory.create(with_owner=user)
+        cursor = sync.encode_cursor(other_board.id, dict.fromkeys([*sync.SOURCES, sync.DELETED], sync.START))
+
+        for value in (cursor, 'garbage'):
+            response = force_auth_client.get(self.url, {'cursor': value})
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_expired_cursor(self, force_auth_client):
+        expired = (timezone.now() - timedelta(days=31), 0)
+        cursor = sync.encode_cursor(self.board.id, dict.fromkeys(sync.SOURCES, expired) | {sync.DELETED: expired})
+
+        response = force_auth_client.get(self.url, {'cursor': cursor})
+
+        assert response.status_code == status.HTTP_410_GONE
+
+    def test_not_participant(self, client, user_factory):
+        client.force_authenticate(user_factory.create())
+
+        assert client.get(self.url).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_deleted_board(self, force_auth_client):
+        GoalCategory.objects.filter(board=self.board).update(is_deleted=True)
+        self.board.is_deleted = True
+        self.board.save()
+
+        assert force_auth_client.get(self.url).status_code == status.HTTP_404_NOT_FOUND
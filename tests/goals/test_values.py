@@ -0,0 +1,33 @@
+import datetime
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from goals.models import Goal, GoalCategory, GoalComment
+from goals.serializers import (GoalCategorySerializer,
+                               GoalCategoryValuesSerializer,
+                               GoalCommentSerializer,
+                               GoalCommentValuesSerializer, GoalSerializer,
+                               GoalValuesSerializer)
+
+
+@pytest.mark.django_db()
+@pytest.mark.parametrize(('model', 'serializer_class', 'values_serializer_class'), [
+    (Goal, GoalSerializer, GoalValuesSerializer),
+    (GoalComment, GoalCommentSerializer, GoalCommentValuesSerializer),
+    (GoalCategory, GoalCategorySerializer, GoalCategoryValuesSerializer),
+], ids=['goal', 'comment', 'category'])
+def test_same_json_as_serializer(goal_factory, goal_comment_factory, user, model, serializer_class,
+                                 values_serializer_class):
+    goal = goal_factory.create(user=user, description='Описание', due_date=datetime.date(2026, 1, 31),
+                               priority=Goal.Priority.critical)
+    goal_factory.create(user=user, category=goal.category, created=goal.created.replace(microsecond=0))
+    goal_comment_factory.create_batch(2, goal=goal, user=user)
+    goal_comment_factory.create(goal=goal)
+    queryset = model.objects.order_by('id')
+
+    values_serializer = values_serializer_class()
+    expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+    actual = JSONRenderer().render(values_serializer.to_representation(values_serializer.get_queryset(queryset)))
+
+    assert actual == expected
@@ -0,0 +1,58 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import Goal, GoalCategory
+from tests.utils import BaseTestCase
+
+
+@pytest.mark.django_db()
+class TestAutocompleteView(BaseTestCase):
+    @pytest.fixture(autouse=True)
+    def setup(self, board_factory, goal_category_factory, user):
+        self.url = reverse('goals:autocomplete')
+        self.board = board_factory.create(with_owner=user)
+        self.cat: GoalCategory = goal_category_factory.create(board=self.board, user=user, title='Покупки')
+
+    def test_auth_required(self, client):
+        response = client.get(self.url, {'q': 'пок'})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_query_required(self, auth_client):
+        response = auth_client.get(self.url)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_prefix_and_typo(self, auth_client, goal_factory, user):
+        milk = goal_factory.create(user=user, category=self.cat, title='Молоко')
+        goal_factory.create(user=user, category=self.cat, title='Хлеб')
+
+        response = auth_client.get(self.url, {'q': 'мол'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            'goals': [{'id': milk.id, 'title': 'Молоко', 'category': self.cat.id}],
+            'categories': [],
+        }
+
+        response = auth_client.get(self.url, {'q': 'ПОКУПКИ', 'type': 'category'})
+        assert response.json() == {'categories': [{'id': self.cat.id, 'title': 'Покупки', 'board': self.board.id}]}
+
+        response = auth_client.get(self.url, {'q': 'малоко', 'type': 'goal'})
+        assert [goal['title'] for goal in response.json()['goals']] == ['Молоко']
+
+    def test_prefix_matches_first(self, auth_client, goal_factory, user):
+        goal_factory.create(user=user, category=self.cat, title='Сыр и молоко')
+        goal_factory.create(user=user, category=self.cat, title='Молоко')
+        for i in range(3):
+            goal_factory.create(user=user, category=self.cat, title=f'Молоко {i}')
+
+        response = auth_client.get(self.url, {'q': 'молоко', 'type': 'goal', 'limit': 2})
+        assert [goal['title'] for goal in response.json()['goals']] == ['Молоко', 'Молоко 0']
+
+    def test_board_scope(self, auth_client, goal_category_factory, goal_factory, user, user_factory):
+        other_user = user_factory.create()
+        other_cat = goal_category_factory.create(board__with_owner=other_user, user=other_user)
+        goal_factory.create(user=other_user, category=other_cat, title='Молоко')
+        goal_factory.create(user=user, category=self.cat, title='Молоко в архиве', status=Goal.Status.archived)
+
+        response = auth_client.get(self.url, {'q': 'молоко'})
+        assert response.json() == {'goals': [], 'categories': []}
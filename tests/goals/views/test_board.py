@@ -1,8 +1,14 @@
+from io import StringIO
+
 import pytest
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.db.models import QuerySet
 from django.urls import reverse
 from rest_framework import status
 
-from goals.models import BoardParticipant, Goal, GoalCategory
+from goals import cascade
+from goals.models import BoardParticipant, CascadeJob, Goal, GoalCategory
 from tests.utils import BaseTestCase
 
 
@@ -55,6 +61,12 @@ class TestRetrieveBoardView(BaseTestCase):
             'is_deleted': False
         }
 
+    def test_retrieve_queries(self, force_auth_client, django_assert_num_queries):
+        # Версия доски для ETag, SELECT доски вместе с ролью пользователя и SELECT участников вместе с пользователями
+        with django_assert_num_queries(3):
+            response = force_auth_client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+
 
 @pytest.mark.django_db()
 class TestDestroyBoardView(BaseTestCase):
@@ -74,11 +86,15 @@ class TestDestroyBoardView(BaseTestCase):
         response = client.delete(self.url)
         assert response.status_code == status.HTTP_403_FORBIDDEN
 
-    def test_success(self, auth_client):
+    def test_success(self, auth_client, django_capture_on_commit_callbacks):
         assert self.participant.role == BoardParticipant.Role.owner
 
-        response = auth_client.delete(self.url)
-        assert response.status_code == status.HTTP_204_NO_CONTENT
+        with django_capture_on_commit_callbacks(execute=True):
+            response = auth_client.delete(self.url)
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        job = CascadeJob.objects.get(board=self.board)
+        assert response.json()['id'] == job.id
+        assert (job.status, job.total, job.processed) == (CascadeJob.Status.done, 2, 2)
 
         self.board.refresh_from_db(fields=('is_deleted',))
         self.cat.refresh_from_db(fields=('is_deleted',))
@@ -87,6 +103,48 @@ class TestDestroyBoardView(BaseTestCase):
         assert self.cat.is_deleted
         assert self.goal.status == Goal.Status.archived
 
+    def test_flag_flip_is_synchronous(self, auth_client, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=False):
+            response = auth_client.delete(self.url)
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json()['status'] == CascadeJob.Status.pending
+
+        self.goal.refresh_from_db(fields=('status',))
+        assert self.goal.status != Goal.Status.archived
+        response = auth_client.get(reverse('goals:goal', args=[self.goal.id]))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        response = auth_client.get(reverse('goals:category', args=[self.cat.id]))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        response = auth_client.get(reverse('goals:cascade', args=[CascadeJob.objects.get().id]))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['processed'] == 0
+
+    def test_cascade_is_chunked_and_resumable(self, goal_factory, user, settings, monkeypatch):
+        settings.GOALS_CASCADE_CHUNK_SIZE = 2
+        goal_factory.create_batch(4, category=self.cat, user=user)
+        job = CascadeJob.objects.create(board=self.board)
+
+        # Сбой на третьем шаге: первая порция целей уже архивирована и сохранена в позиции задачи
+        original_update, calls = QuerySet.update, []
+
+        def failing_update(queryset, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 3:
+                raise DatabaseError('connection lost')
+            return original_update(queryset, **kwargs)
+
+        monkeypatch.setattr(QuerySet, 'update', failing_update)
+        job = cascade.run_job(job.id)
+        assert job.status == CascadeJob.Status.failed
+        assert (job.step, job.processed) == (1, 3)
+        monkeypatch.undo()
+
+        call_command('resume_cascades', '--retry-failed', stdout=StringIO())
+        job.refresh_from_db()
+        assert (job.status, job.total, job.processed) == (CascadeJob.Status.done, 6, 6)
+        assert not Goal.objects.filter(board=self.board).exclude(status=Goal.Status.archived).exists()
+
 
 @pytest.mark.django_db()
 class TestUpdateBoardView(BaseTestCase):
@@ -126,7 +184,97 @@ class TestUpdateBoardView(BaseTestCase):
             role=BoardParticipant.Role.writer
         )
 
-        response = auth_client.patch(self.url, {'participants': []})
+        response = auth_client.patch(self.url, {'participants': []}, format='json')
 
         assert response.status_code == status.HTTP_200_OK
         assert BoardParticipant.objects.count() == 1
+
+    def test_update_title_keeps_participants(self, auth_client, another_user):
+        BoardParticipant.objects.create(board=self.board, user=another_user, role=BoardParticipant.Role.writer)
+
+        response = auth_client.patch(self.url, {'title': 'New title'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert self.board.participants.count() == 2
+
+    def test_sync_participants(self, auth_client, user_factory):
+        changed, kept, removed, added = user_factory.create_batch(4)
+        BoardParticipant.objects.bulk_create([
+            BoardParticipant(board=self.board, user=changed, role=BoardParticipant.Role.writer),
+            BoardParticipant(board=self.board, user=kept, role=BoardParticipant.Role.reader),
+            BoardParticipant(board=self.board, user=removed, role=BoardParticipant.Role.writer),
+        ])
+        ids_before = dict(self.board.participants.values_list('user_id', 'id'))
+
+        response = auth_client.patch(self.url, {'participants': [
+            {'user': changed.username, 'role': BoardParticipant.Role.reader},
+            {'user': kept.username, 'role': BoardParticipant.Role.reader},
+            {'user': added.username, 'role': BoardParticipant.Role.writer},
+        ]}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        participants = {participant.user_id: participant for participant in self.board.participants.all()}
+        assert {user_id: participant.role for user_id, participant in participants.items()} == {
+            self.participant.user_id: BoardParticipant.Role.owner,
+            changed.id: BoardParticipant.Role.reader,
+            kept.id: BoardParticipant.Role.reader,
+            added.id: BoardParticipant.Role.writer,
+        }
+        assert participants[changed.id].id == ids_before[changed.id]
+        assert participants[kept.id].id == ids_before[kept.id]
+        assert participants[kept.id].updated == BoardParticipant.objects.get(user=kept).updated
+        assert len(response.json()['participants']) == 4
+
+
+@pytest.mark.django_db()
+class TestBoardParticipantViews(BaseTestCase):
+    @pytest.fixture(autouse=True)
+    def setup(self, board_factory, user):  # noqa: PT004
+        self.board = board_factory.create(with_owner=user)
+        self.create_url = reverse('goals:create-participant', args=[self.board.id])
+
+    def url(self, username: str) -> str:
+        return reverse('goals:participant', args=[self.board.id, username])
+
+    def test_add_change_remove(self, auth_client, another_user):
+        response = auth_client.post(self.create_url, {'user': another_user.username, 'role': 3})
+        assert response.status_code == status.HTTP_201_CREATED
+        assert self.board.participants.get(user=another_user).role == BoardParticipant.Role.reader
+
+        response = auth_client.post(self.create_url, {'user': another_user.username, 'role': 2})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = auth_client.patch(self.url(another_user.username), {'role': 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert self.board.participants.get(user=another_user).role == BoardParticipant.Role.writer
+
+        response = auth_client.delete(self.url(another_user.username))
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert self.board.participants.count() == 1
+
+    def test_user_not_editable(self, auth_client, user, another_user, user_factory):
+        BoardParticipant.objects.create(board=self.board, user=another_user, role=BoardParticipant.Role.reader)
+        other = user_factory.create()
+
+        response = auth_client.patch(self.url(another_user.username), {'user': other.username, 'role': 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['user'] == another_user.username
+        assert set(self.board.participants.values_list('user_id', 'role')) == {
+            (user.id, BoardParticipant.Role.owner),
+            (another_user.id, BoardParticipant.Role.writer),
+        }
+
+    def test_owner_not_editable(self, auth_client, user):
+        response = auth_client.delete(self.url(user.username))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_only_owner_can_manage(self, client, another_user, user_factory):
+        BoardParticipant.objects.create(board=self.board, user=another_user, role=BoardParticipant.Role.writer)
+        client.force_login(another_user)
+
+        response = client.post(self.create_url, {'user': user_factory.create().username, 'role': 3})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        response = client.get(self.url(another_user.username))
+        assert response.status_code == status.HTTP_200_OK
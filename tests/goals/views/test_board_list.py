@@ -2,6 +2,8 @@ import pytest
 from django.urls import reverse
 from rest_framework import status
 
+from goals import membership
+from goals.models import BoardParticipant
 from tests.utils import BaseTestCase
 
 
@@ -29,3 +31,41 @@ class TestBoardListView(BaseTestCase):
                 'is_deleted': False
             }
         ]
+
+    def test_membership_cache_invalidated(self, client, user, user_factory, board_factory, faker):
+        board = board_factory.create(with_owner=user)
+        another_user = user_factory.create()
+        client.force_login(another_user)
+        hits = membership.get_stats()['hits']
+
+        assert client.get(self.url).json() == []
+        assert client.get(self.url).json() == []
+        assert membership.get_stats()['hits'] == hits + 1
+
+        client.force_login(user)
+        response = client.patch(
+            reverse('goals:retrieve-update-destroy-boards', args=[board.id]),
+            {'participants': [{'user': another_user.username, 'role': BoardParticipant.Role.reader}]},
+            format='json',
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        client.force_login(another_user)
+        assert [item['id'] for item in client.get(self.url).json()] == [board.id]
+
+        client.force_login(user)
+        response = client.delete(reverse('goals:retrieve-update-destroy-boards', args=[board.id]))
+        assert response.status_code == status.HTTP_202_ACCEPTED
+
+        client.force_login(another_user)
+        assert client.get(self.url).json() == []
+
+    def test_membership_cache_disabled(self, client, user, board_factory, settings):
+        settings.GOALS_MEMBERSHIP_CACHE_TIMEOUT = 0
+        board_factory.create(with_owner=user)
+        client.force_login(user)
+        stats = membership.get_stats()
+
+        assert len(client.get(self.url).json()) == 1
+        assert len(client.get(self.url).json()) == 1
+        assert membership.get_stats() == stats
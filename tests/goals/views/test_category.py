@@ -2,7 +2,7 @@ import pytest
 from django.urls import reverse
 from rest_framework import status
 
-from goals.models import GoalCategory
+from goals.models import BoardParticipant, CascadeJob, Goal, GoalCategory
 from tests.utils import BaseTestCase
 
 
@@ -51,6 +51,40 @@ class TestCategoryListView(BaseTestCase):
         response = auth_client.get(self.url)
         assert response.status_code == status.HTTP_200_OK
 
+    def test_list_queries(self, force_auth_client, board_factory, goal_category_factory, user,
+                          django_assert_num_queries):
+        goal_category_factory.create_batch(3, board=board_factory.create(with_owner=user), user=user)
+        # Версии досок для ETag, участие в досках, COUNT(*) и страница категорий вместе с авторами
+        with django_assert_num_queries(4):
+            response = force_auth_client.get(self.url, {'limit': 10})
+        assert response.json()['count'] == 3
+
+    def test_search(self, auth_client, board_factory, goal_category_factory, user):
+        board = board_factory.create(with_owner=user)
+        goal_category_factory.create(board=board, user=user, title='Домашние дела')
+        goal_category_factory.create(board=board, user=user, title='Работа')
+
+        response = auth_client.get(self.url, {'search': 'ДОМАШ'})
+        assert response.status_code == status.HTTP_200_OK
+        assert [category['title'] for category in response.json()] == ['Домашние дела']
+
+    def test_filter_by_board_and_user(self, auth_client, board_factory, board_participant_factory,
+                                      goal_category_factory, user):
+        first, second = board_factory.create(with_owner=user), board_factory.create(with_owner=user)
+        writer = board_participant_factory.create(board=first, role=BoardParticipant.Role.writer).user
+        own = goal_category_factory.create(board=first, user=user)
+        foreign = goal_category_factory.create(board=first, user=writer)
+        other_board = goal_category_factory.create(board=second, user=user)
+
+        response = auth_client.get(self.url, {'board': first.id})
+        assert {category['id'] for category in response.json()} == {own.id, foreign.id}
+
+        response = auth_client.get(self.url, {'user': user.id})
+        assert {category['id'] for category in response.json()} == {own.id, other_board.id}
+
+        response = auth_client.get(self.url, {'board__in': f'{first.id},{second.id}', 'user': writer.id})
+        assert [category['id'] for category in response.json()] == [foreign.id]
+
 
 @pytest.mark.django_db()
 class TestRetrieveCategoryView(BaseTestCase):
@@ -82,12 +116,36 @@ class TestRetrieveCategoryView(BaseTestCase):
         assert response.status_code == status.HTTP_200_OK
         assert response.json() == expected_response
 
+    def test_retrieve_single_query(self, force_auth_client, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = force_auth_client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+
     def test_update(self, auth_client):
         response = auth_client.put(self.url, data={'board': self.board.pk, 'title': 'test name category'})
 
         assert response.status_code == status.HTTP_200_OK
         assert response.data.get('title') == 'test name category'
 
-    def test_delete(self, auth_client):
-        response = auth_client.delete(self.url)
-        assert response.status_code == status.HTTP_204_NO_CONTENT
+    def test_delete(self, auth_client, goal_factory, user, django_capture_on_commit_callbacks):
+        goal = goal_factory.create(category=self.cat, user=user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = auth_client.delete(self.url)
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.json()['category'] == self.cat.id
+        goal.refresh_from_db(fields=('status',))
+        assert goal.status == Goal.Status.archived
+        assert CascadeJob.objects.get(category=self.cat).status == CascadeJob.Status.done
+
+    def test_goals_hidden_until_cascade_done(self, auth_client, goal_factory, user, settings):
+        settings.JOBS_EAGER = False
+        goal = goal_factory.create(category=self.cat, user=user)
+
+        assert auth_client.delete(self.url).status_code == status.HTTP_202_ACCEPTED
+
+        goal.refresh_from_db(fields=('status',))
+        assert goal.status != Goal.Status.archived
+        assert auth_client.get(reverse('goals:list-goals')).json() == []
+        assert auth_client.get(reverse('goals:goal', args=[goal.id])).status_code == status.HTTP_404_NOT_FOUND
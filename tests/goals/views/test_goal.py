@@ -1,8 +1,16 @@
+import csv
+import datetime
+import io
+import json
+
 import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.exceptions import NotFound, PermissionDenied
 
-from goals.models import Goal, GoalCategory
+from goals.models import BoardParticipant, Goal, GoalCategory
 from tests.utils import BaseTestCase
 
 
@@ -56,6 +64,43 @@ class TestGoalListView(BaseTestCase):
         response = auth_client.get(self.url)
         assert response.status_code == status.HTTP_200_OK
 
+    def test_limit_offset_pagination(self, auth_client, board_factory, goal_category_factory, goal_factory, user):
+        cat: GoalCategory = goal_category_factory.create(board=board_factory.create(with_owner=user), user=user)
+        goal_factory.create_batch(3, user=user, category=cat)
+
+        response = auth_client.get(self.url, {'limit': 2, 'offset': 1})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['count'] == 3
+        assert len(response.json()['results']) == 2
+
+    @pytest.mark.parametrize('ordering', ['title', '-title', 'created', '-created'])
+    def test_cursor_pagination(self, auth_client, goal_category_factory, goal_factory, user, ordering):
+        cat: GoalCategory = goal_category_factory.create(board__with_owner=user, user=user)
+        goal_factory.create_batch(3, user=user, category=cat, title='same title')
+        goal_factory.create_batch(2, user=user, category=cat)
+        expected = list(Goal.objects.order_by(ordering, ordering.replace('title', 'id').replace('created', 'id'))
+                        .values_list('id', flat=True))
+
+        response = auth_client.get(self.url, {'cursor': '', 'limit': 2, 'ordering': ordering})
+        assert response.status_code == status.HTTP_200_OK
+        assert 'count' not in response.json()
+        assert response.json()['previous'] is None
+
+        ids = [goal['id'] for goal in response.json()['results']]
+        pages = [response.json()]
+        while pages[-1]['next']:
+            pages.append(auth_client.get(pages[-1]['next']).json())
+            ids += [goal['id'] for goal in pages[-1]['results']]
+        assert ids == expected
+
+        previous = auth_client.get(pages[-1]['previous']).json()
+        assert previous['results'] == pages[-2]['results']
+
+    def test_cursor_invalid(self, auth_client):
+        response = auth_client.get(self.url, {'cursor': 'invalid'})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
 
 @pytest.mark.django_db()
 class TestRetrieveGoalView(BaseTestCase):
@@ -87,13 +132,340 @@ class TestRetrieveGoalView(BaseTestCase):
             'updated': self.datetime_to_str(self.goal.updated),
         }
 
+    def test_retrieve_single_query(self, force_auth_client, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = force_auth_client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_reader_cannot_update(self, client, board_participant_factory, user_factory, django_assert_num_queries):
+        reader = user_factory.create()
+        board_participant_factory.create(board=self.board, user=reader, role=BoardParticipant.Role.reader)
+        client.force_authenticate(reader)
+
+        with django_assert_num_queries(1):
+            response = client.patch(self.url, data={'title': 'test title update'})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
     def test_update(self, auth_client):
         response = auth_client.put(self.url, data={'title': 'test title update', 'category': self.cat.pk})
 
         assert response.status_code == status.HTTP_200_OK
         assert response.data.get('title') == 'test title update'
 
+    def test_update_category_moves_board(self, auth_client, board_factory, goal_category_factory, goal_comment_factory,
+                                         user):
+        comment = goal_comment_factory.create(goal=self.goal, user=user)
+        other_board = board_factory.create(with_owner=user)
+        other_cat: GoalCategory = goal_category_factory.create(board=other_board, user=user)
+
+        response = auth_client.patch(self.url, data={'category': other_cat.pk})
+
+        assert response.status_code == status.HTTP_200_OK
+        self.goal.refresh_from_db()
+        comment.refresh_from_db()
+        assert self.goal.board_id == other_board.id
+        assert comment.board_id == other_board.id
+
+    def test_update_to_deleted_category(self, auth_client, goal_category_factory, user):
+        deleted_cat: GoalCategory = goal_category_factory.create(board=self.board, user=user, is_deleted=True)
+
+        response = auth_client.patch(self.url, data={'category': deleted_cat.pk})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
     def test_delete(self, auth_client):
         response = auth_client.delete(self.url)
 
         assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    def test_delete_queries(self, force_auth_client, django_assert_num_queries):
+        # SELECT цели вместе с ролью и UPDATE статуса
+        with django_assert_num_queries(2):
+            response = force_auth_client.delete(self.url)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.django_db()
+class TestGoalSearch(BaseTestCase):
+    @pytest.fixture(autouse=True)
+    def setup(self, board_factory, goal_category_factory, user):
+        self.url = reverse('goals:list-goals')
+        self.cat: GoalCategory = goal_category_factory.create(board=board_factory.create(with_owner=user), user=user)
+
+    def search(self, client, query: str, **params) -> list[str]:
+        response = client.get(self.url, {'search': query, **params})
+        assert response.status_code == status.HTTP_200_OK
+        return [goal['title'] for goal in response.json()]
+
+    def test_russian_and_english_stems(self, auth_client, goal_factory, user):
+        goal_factory.create(user=user, category=self.cat, title='Купить молоко')
+        goal_factory.create(user=user, category=self.cat, title='Running every morning')
+        goal_factory.create(user=user, category=self.cat, title='Другая цель')
+
+        assert self.search(auth_client, 'молока') == ['Купить молоко']
+        assert self.search(auth_client, 'runs') == ['Running every morning']
+        assert self.search(auth_client, 'утро morn') == []
+        assert self.search(auth_client, 'morn') == ['Running every morning']
+
+    def test_ranked_by_relevance(self, auth_client, goal_factory, user):
+        goal_factory.create(user=user, category=self.cat, title='A report', description='Quarterly budget')
+        goal_factory.create(user=user, category=self.cat, title='Z budget', description='')
+
+        assert self.search(auth_client, 'budget') == ['Z budget', 'A report']
+        assert self.search(auth_client, 'budget', ordering='title') == ['A report', 'Z budget']
+
+    def test_search_vector_follows_updates(self, auth_client, goal_factory, user):
+        goal = goal_factory.create(user=user, category=self.cat, title='Old title')
+        goal.title = 'Renamed'
+        goal.save()
+
+        assert self.search(auth_client, 'old') == []
+        assert self.search(auth_client, 'renamed') == ['Renamed']
+
+
+@pytest.mark.django_db()
+class TestGoalBulkView(BaseTestCase):
+    @pytest.fixture(autouse=True)
+    def setup(self, board_factory, goal_category_factory, user):
+        self.url = reverse('goals:bulk-goals')
+        self.board = board_factory.create(with_owner=user)
+        self.cat: GoalCategory = goal_category_factory.create(board=self.board, user=user)
+
+    def post(self, client, operations: list) -> list[dict]:
+        response = client.post(self.url, {'operations': operations}, format='json')
+        assert response.status_code == status.HTTP_200_OK, response.data
+        return response.json()['results']
+
+    def test_auth_required(self, client):
+        response = client.post(self.url, {'operations': []}, format='json')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_writer_needs_own_category(self, client, board_participant_factory, goal_factory):
+        writer = board_participant_factory.create(board=self.board, role=BoardParticipant.Role.writer).user
+        own_cat = GoalCategory.objects.create(board=self.board, user=writer, title='Own')
+        goal = goal_factory.create(user=writer, category=own_cat)
+        client.force_authenticate(writer)
+
+        response = client.post(reverse('goals:create-goal'), {'title': 'Single', 'category': self.cat.id})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        results = self.post(client, [
+            {'op': 'create', 'data': {'title': 'Bulk', 'category': self.cat.id}},
+            {'op': 'update', 'id': goal.id, 'data': {'category': self.cat.id}},
+            {'op': 'create', 'data': {'title': 'Own', 'category': own_cat.id}},
+        ])
+
+        assert [result['status'] for result in results] == ['error', 'error', 'created']
+        assert results[0]['errors'] == results[1]['errors'] == {'detail': PermissionDenied.default_detail}
+        goal.refresh_from_db(fields=('category',))
+        assert goal.category_id == own_cat.id
+
+    def test_max_batch(self, auth_client, settings):
+        settings.GOALS_BULK_MAX_BATCH = 2
+        response = auth_client.post(self.url, {'operations': [{'op': 'archive', 'id': 1}] * 3}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_create_update_archive(self, force_auth_client, goal_factory, goal_comment_factory, user,
+                                   django_assert_num_queries):
+        other_cat = GoalCategory.objects.create(board=self.board, user=user, title='Other')
+        updated, archived = goal_factory.create_batch(2, user=user, category=self.cat)
+        comment = goal_comment_factory.create(goal=updated, user=user)
+
+        # Участие в досках, категории, цели с блокировкой, INSERT и UPDATE в транзакции
+        with django_assert_num_queries(7) as captured:
+            results = self.post(force_auth_client, [
+                {'op': 'create', 'data': {'title': 'first', 'category': self.cat.id}},
+                {'op': 'create', 'data': {'title': 'second', 'category': other_cat.id, 'priority': 4}},
+                {'op': 'update', 'id': updated.id, 'data': {'title': 'renamed', 'category': other_cat.id}},
+                {'op': 'archive', 'id': archived.id},
+            ])
+
+        assert any('FOR UPDATE OF "goals_goal"' in query['sql'] for query in captured.captured_queries)
+        created = Goal.objects.filter(title__in=['first', 'second']).order_by('title')
+        assert results == [
+            {'status': 'created', 'id': created[0].id},
+            {'status': 'created', 'id': created[1].id},
+            {'status': 'updated', 'id': updated.id},
+            {'status': 'archived', 'id': archived.id},
+        ]
+        assert created[1].board_id == self.board.id
+        assert created[1].priority == Goal.Priority.critical
+        updated.refresh_from_db()
+        assert (updated.title, updated.category_id) == ('renamed', other_cat.id)
+        assert updated.updated > updated.created
+        comment.refresh_from_db()
+        assert comment.board_id == updated.board_id
+        archived.refresh_from_db()
+        assert archived.status == Goal.Status.archived
+
+    def test_errors_per_item(self, auth_client, board_participant_factory, goal_category_factory, goal_factory, user):
+        reader_board = board_participant_factory.create(user=user, role=BoardParticipant.Role.reader).board
+        reader_cat = goal_category_factory.create(board=reader_board)
+        reader_goal = goal_factory.create(category=reader_cat)
+        goal = goal_factory.create(user=user, category=self.cat)
+
+        results = self.post(auth_client, [
+            {'op': 'create', 'data': {'title': 'ok', 'category': self.cat.id}},
+            {'op': 'create', 'data': {'category': self.cat.id}},
+            {'op': 'create', 'data': {'title': 'reader', 'category': reader_cat.id}},
+            {'op': 'update', 'id': reader_goal.id, 'data': {'title': 'reader'}},
+            {'op': 'archive', 'id': 0},
+            {'op': 'archive'},
+            {'op': 'archive', 'id': goal.id},
+            {'op': 'update', 'id': goal.id, 'data': {'title': 'twice'}},
+        ])
+
+        assert [result['status'] for result in results] == [
+            'created', 'error', 'error', 'error', 'error', 'error', 'archived', 'error',
+        ]
+        assert set(results[1]['errors']) == {'title'}
+        assert results[2]['errors'] == results[3]['errors'] == {'detail': PermissionDenied.default_detail}
+        assert results[4]['errors'] == {'detail': NotFound.default_detail}
+        assert set(results[5]['errors']) == {'id'}
+        assert Goal.objects.filter(title__in=['reader', 'twice']).count() == 0
+
+
+@pytest.mark.django_db()
+class TestGoalExportView(BaseTestCase):
+    @pytest.fixture(autouse=True)
+    def setup(self, board_factory, goal_category_factory, user):
+        self.url = reverse('goals:export-goals')
+        self.board = board_factory.create(with_owner=user)
+        self.cat: GoalCategory = goal_category_factory.create(board=self.board, user=user)
+
+    def export(self, client, **params) -> str:
+        response = client.get(self.url, params)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        return b''.join(response.streaming_content).decode()
+
+    def test_auth_required(self, client):
+        response = client.get(self.url)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_ndjson_with_comments(self, auth_client, goal_factory, goal_comment_factory, user):
+        first, second = goal_factory.create_batch(2, user=user, category=self.cat)
+        comments = goal_comment_factory.create_batch(2, goal=second, user=user)
+        goal_factory.create(user=user, category=self.cat, status=Goal.Status.archived)
+        goal_factory.create()
+
+        records = [json.loads(line) for line in self.export(auth_client, comments='true').splitlines()]
+
+        assert [record['id'] for record in records] == [first.id, second.id]
+        assert records[0]['comments'] == []
+        assert [comment['id'] for comment in records[1]['comments']] == [comment.id for comment in comments]
+        assert records[1]['username'] == records[1]['comments'][0]['username'] == user.username
+        assert records[1]['category'] == self.cat.id
+
+    def test_csv_filtered(self, auth_client, goal_factory, user):
+        goal_factory.create(user=user, category=self.cat, priority=Goal.Priority.low)
+        high = goal_factory.create(user=user, category=self.cat, priority=Goal.Priority.high)
+
+        response = auth_client.get(self.url, {'file_format': 'csv', 'priority': Goal.Priority.high})
+        assert response['Content-Type'] == 'text/csv'
+        assert response['Content-Disposition'] == 'attachment; filename="goals.csv"'
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+        assert [int(row['id']) for row in rows] == [high.id]
+        assert rows[0]['title'] == high.title
+        assert rows[0]['created'] == high.created.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+@pytest.mark.django_db()
+class TestGoalImportView(BaseTestCase):
+    @pytest.fixture(autouse=True)
+    def setup(self, board_factory, goal_category_factory, user):
+        self.url = reverse('goals:import-goals')
+        self.board = board_factory.create(with_owner=user)
+        self.cat: GoalCategory = goal_category_factory.create(board=self.board, user=user)
+
+    def upload(self, client, content: str, file_format: str = 'ndjson'):
+        file = SimpleUploadedFile(f'goals.{file_format}', content.encode())
+        return client.post(self.url, {'file': file, 'file_format': file_format}, format='multipart')
+
+    def test_auth_required(self, client):
+        response = client.post(self.url)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_ndjson_with_comments(self, auth_client, board_participant_factory, user):
+        author = board_participant_factory.create(board=self.board, role=BoardParticipant.Role.reader).user
+        records = [
+            {'title': 'First', 'category': self.cat.id, 'priority': 4, 'created': '2020-01-01T00:00:00Z',
+             'comments': [{'text': 'tab\tand\nnewline \\N'}, {'text': 'second', 'username': author.username}]},
+            {'title': 'Second', 'category': self.cat.id, 'username': author.username, 'due_date': None},
+        ]
+
+        response = self.upload(auth_client, '\n'.join(map(json.dumps, records)))
+
+        assert response.status_code == status.HTTP_201_CREATED, response.data
+        assert (response.data['goals'], response.data['comments'], response.data['errors']) == (2, 2, [])
+        first, second = Goal.objects.order_by('id')
+        assert (first.title, first.priority, first.board_id, first.user_id) == ('First', 4, self.board.id, user.id)
+        assert first.created.year != 2020
+        assert second.user_id == author.id
+        assert [(comment.text, comment.user_id, comment.board_id) for comment in first.comments.order_by('id')] == [
+            ('tab\tand\nnewline \\N', user.id, self.board.id), ('second', author.id, self.board.id),
+        ]
+        assert Goal.objects.filter(search_vector='first').get() == first
+
+    def test_errors_per_row_are_atomic(self, auth_client, board_participant_factory, goal_category_factory,
+                                       user_factory):
+        reader_cat = goal_category_factory.create(
+            board=board_participant_factory.create(user=self.cat.user, role=BoardParticipant.Role.reader).board
+        )
+        content = '\n'.join([
+            json.dumps({'title': 'ok', 'category': self.cat.id}),
+            '{broken',
+            json.dumps({'category': self.cat.id}),
+            json.dumps({'title': 'reader', 'category': reader_cat.id}),
+            json.dumps({'title': 'stranger', 'category': self.cat.id, 'username': user_factory.create().username}),
+            json.dumps({'title': 'missing', 'category': 0}),
+        ])
+
+        response = self.upload(auth_client, content)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert [error['line'] for error in response.data['errors']] == [2, 3, 4, 5, 6]
+        assert set(response.data['errors'][1]['errors']) == {'title'}
+        assert response.data['errors'][2]['errors'] == {'detail': PermissionDenied.default_detail}
+        assert set(response.data['errors'][3]['errors']) == {'username'}
+        assert set(response.data['errors'][4]['errors']) == {'category'}
+        assert not Goal.objects.exists()
+
+    def test_csv_round_trip(self, auth_client, goal_factory, goal_comment_factory, user):
+        due_date = datetime.datetime(2026, 1, 31, 12, 30, tzinfo=datetime.timezone.utc)
+        goal = goal_factory.create(user=user, category=self.cat, description='multi\nline', due_date=due_date)
+        goal_comment_factory.create(goal=goal, user=user)
+        response = auth_client.get(reverse('goals:export-goals'), {'file_format': 'csv', 'comments': 'true'})
+        content = b''.join(response.streaming_content).decode()
+
+        response = self.upload(auth_client, content, 'csv')
+
+        assert response.status_code == status.HTTP_201_CREATED, response.data
+        copy = Goal.objects.exclude(id=goal.id).get()
+        assert (copy.title, copy.description, copy.due_date) == (goal.title, goal.description, due_date)
+        assert copy.comments.get().text == goal.comments.get().text
+        assert copy.created == copy.updated == copy.comments.get().updated > goal.updated
+
+    def test_command(self, user, tmp_path):
+        path = tmp_path / 'goals.ndjson'
+        path.write_text(json.dumps({'title': 'From file', 'category': self.cat.id}))
+        stdout = io.StringIO()
+
+        call_command('import_goals', str(path), '--user', user.username, stdout=stdout)
+
+        assert 'Imported 1 goals and 0 comments' in stdout.getvalue()
+        assert Goal.objects.get().title == 'From file'
+
+    def test_not_utf8(self, auth_client, tmp_path, user):
+        content = f'title,category\nЦель,{self.cat.id}\n'.encode('cp1251')
+        file = SimpleUploadedFile('goals.csv', content)
+
+        response = auth_client.post(self.url, {'file': file, 'file_format': 'csv'}, format='multipart')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['file'][0].code == 'encoding'
+        path = tmp_path / 'goals.csv'
+        path.write_bytes(content)
+        with pytest.raises(CommandError, match='not UTF-8'):
+            call_command('import_goals', str(path), '--user', user.username)
+        assert not Goal.objects.exists()
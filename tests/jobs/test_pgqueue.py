@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from jobs import pgqueue
+from jobs.models import Job
+
+calls = []
+
+
+@pgqueue.task('tests.record')
+def record(value: str, fail: bool = False) -> None:
+    calls.append(value)
+    if fail:
+        raise RuntimeError(value)
+
+
+@pytest.fixture(autouse=True)
+def worker_mode(settings):
+    settings.JOBS_EAGER = False
+    calls.clear()
+
+
+@pytest.mark.django_db()
+class TestJobQueue:
+    def test_priority_order(self):
+        pgqueue.enqueue('tests.record', {'value': 'low'}, priority=-1)
+        pgqueue.enqueue('tests.record', {'value': 'first'})
+        pgqueue.enqueue('tests.record', {'value': 'high'}, priority=5)
+        pgqueue.enqueue('tests.record', {'value': 'later'}, run_at=timezone.now() + timedelta(hours=1))
+        pgqueue.enqueue('tests.record', {'value': 'second'})
+
+        while pgqueue.run(pgqueue.claim('test')):
+            pass
+
+        assert calls == ['high', 'first', 'second', 'low']
+        assert Job.objects.filter(status=Job.Status.queued).get().payload == {'value': 'later'}
+
+    def test_unknown_job(self):
+        with pytest.raises(KeyError):
+            pgqueue.enqueue('tests.unknown')
+
+    def test_retry_with_backoff(self, settings):
+        settings.JOBS_RETRY_BASE_DELAY = 10
+        job = pgqueue.enqueue('tests.record', {'value': 'boom', 'fail': True}, max_attempts=2)
+
+        job = pgqueue.run(pgqueue.claim('test'))
+        assert (job.status, job.attempts) == (Job.Status.queued, 1)
+        assert job.last_error == "RuntimeError('boom')"
+        assert job.run_at > timezone.now() + timedelta(seconds=9)
+        assert pgqueue.claim('test') is None
+
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        job = pgqueue.run(pgqueue.claim('test'))
+        assert (job.status, job.attempts) == (Job.Status.failed, 2)
+        assert pgqueue.get_backoff(3) == timedelta(seconds=40)
+
+    def test_requeue_stale(self, settings):
+        settings.JOBS_LOCK_TIMEOUT = 60
+        job = pgqueue.enqueue('tests.record', {'value': 'stale'})
+        pgqueue.claim('dead worker')
+        Job.objects.filter(id=job.id).update(locked_at=timezone.now() - timedelta(minutes=5))
+
+        assert pgqueue.requeue_stale() == 1
+        job.refresh_from_db()
+        assert (job.status, job.locked_by) == (Job.Status.queued, '')
+
+    def test_runworker_burst(self, monkeypatch):
+        # Тест выполняется в транзакции, которую close_old_connections считает поводом закрыть соединение
+        monkeypatch.setattr('jobs.management.commands.runworker.close_old_connections', lambda: None)
+        for value in 'abc':
+            pgqueue.enqueue('tests.record', {'value': value})
+
+        call_command('runworker', '--burst')
+
+        assert calls == ['a', 'b', 'c']
+        assert not Job.objects.exclude(status=Job.Status.done).exists()
+
+    def test_eager(self, settings, django_capture_on_commit_callbacks):
+        settings.JOBS_EAGER = True
+        with django_capture_on_commit_callbacks(execute=True):
+            job = pgqueue.enqueue('tests.record', {'value': 'eager'})
+
+        job.refresh_from_db()
+        assert job.status == Job.Status.done
+        assert calls == ['eager']
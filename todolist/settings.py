@@ -56,6 +56,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     # Third party apps
     'rest_framework',
     'django_filters',
@@ -64,6 +65,7 @@ INSTALLED_APPS = [
     'core',
     'goals',
     'bot',
+    'jobs',
 ]
 
 if DEBUG:
@@ -72,6 +74,9 @@ if DEBUG:
     ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
+    'core.timing.ServerTimingMiddleware',
+    'core.querybudget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -118,6 +123,68 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Контроль числа SQL-запросов на HTTP-запрос (core.querybudget): off, log - проверять долю
+# QUERY_BUDGET_SAMPLE_RATE запросов и писать нарушения в лог, raise - ошибка на каждое нарушение (тесты)
+QUERY_BUDGET_MODE = env.str('QUERY_BUDGET_MODE', default='log')
+QUERY_BUDGET_SAMPLE_RATE = env.float('QUERY_BUDGET_SAMPLE_RATE', default=0.01)
+QUERY_BUDGET_REPEAT_THRESHOLD = env.int('QUERY_BUDGET_REPEAT_THRESHOLD', default=3)
+
+# Заголовок Server-Timing с временем фаз запроса (core.timing); в лог пишутся запросы не быстрее порога, мс
+SERVER_TIMING_ENABLED = env.bool('SERVER_TIMING_ENABLED', default=True)
+SERVER_TIMING_LOG_THRESHOLD_MS = env.float('SERVER_TIMING_LOG_THRESHOLD_MS', default=200)
+# Профилирование cProfile запросов сотрудников с заголовком X-Profile: каталог профилей (пусто - выключено) и доля
+# профилируемых запросов
+PROFILE_DIR = env.str('PROFILE_DIR', default='')
+PROFILE_SAMPLE_RATE = env.float('PROFILE_SAMPLE_RATE', default=1.0)
+
+# Метрики Prometheus (core.metrics): каталог для сведения метрик рабочих процессов gunicorn (пусто - только метрики
+# процесса, ответившего на /metrics), интервал сохранения в него, секунды, и токен доступа к /metrics (пусто - без
+# проверки)
+METRICS_DIR = env.str('METRICS_DIR', default='')
+METRICS_FLUSH_INTERVAL = env.float('METRICS_FLUSH_INTERVAL', default=5)
+METRICS_TOKEN = env.str('METRICS_TOKEN', default='')
+
+# Время жизни кэша участия пользователей в досках, секунды (0 - без кэша). Кэш сбрасывается сменой версии в кэше,
+# поэтому он должен быть общим для всех процессов (gunicorn, runbot, runworker): с кэшем в памяти процесса сброс виден
+# только одному процессу, и вне DEBUG кэш участия выключается
+GOALS_MEMBERSHIP_CACHE_TIMEOUT = env.int('GOALS_MEMBERSHIP_CACHE_TIMEOUT', default=300)
+if not DEBUG and CACHES['default']['BACKEND'] == 'django.core.cache.backends.locmem.LocMemCache':
+    GOALS_MEMBERSHIP_CACHE_TIMEOUT = 0
+
+# Фоновый каскад при удалении доски или категории: размер шага (задача jobs goals.cascade)
+GOALS_CASCADE_CHUNK_SIZE = env.int('GOALS_CASCADE_CHUNK_SIZE', default=1000)
+
+# Максимальное число операций в одном запросе goals/goal/bulk
+GOALS_BULK_MAX_BATCH = env.int('GOALS_BULK_MAX_BATCH', default=1000)
+
+# Синхронизация изменений досок (goals/board/<id>/changes): наибольшее число объектов каждого типа в ответе, перекрытие
+# окна изменений в секундах (изменения транзакций, зафиксированных позже начала следующего окна, не теряются) и срок
+# хранения записей об удалении в днях (курсор старше срока требует полной загрузки доски)
+GOALS_SYNC_LIMIT = env.int('GOALS_SYNC_LIMIT', default=1000)
+GOALS_SYNC_LAG = env.int('GOALS_SYNC_LAG', default=10)
+GOALS_SYNC_TOMBSTONE_DAYS = env.int('GOALS_SYNC_TOMBSTONE_DAYS', default=30)
+
+# Очередь отложенных задач (manage.py runworker)
+# JOBS_EAGER - выполнять задачи в процессе приложения после коммита, без исполнителя
+JOBS_EAGER = env.bool('JOBS_EAGER', default=False)
+JOBS_MAX_ATTEMPTS = env.int('JOBS_MAX_ATTEMPTS', default=5)
+# Задержка повтора: JOBS_RETRY_BASE_DELAY * 2 ** (попытка - 1), не более JOBS_RETRY_MAX_DELAY секунд
+JOBS_RETRY_BASE_DELAY = env.int('JOBS_RETRY_BASE_DELAY', default=10)
+JOBS_RETRY_MAX_DELAY = env.int('JOBS_RETRY_MAX_DELAY', default=3600)
+# Задача, захваченная дольше JOBS_LOCK_TIMEOUT секунд, считается брошенной и возвращается в очередь
+JOBS_LOCK_TIMEOUT = env.int('JOBS_LOCK_TIMEOUT', default=3600)
+JOBS_POLL_INTERVAL = env.float('JOBS_POLL_INTERVAL', default=1.0)
+JOBS_MAINTENANCE_INTERVAL = env.int('JOBS_MAINTENANCE_INTERVAL', default=60)
+JOBS_KEEP_DONE_DAYS = env.int('JOBS_KEEP_DONE_DAYS', default=7)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -186,9 +253,24 @@ SOCIAL_AUTH_USER_MODEL = 'core.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 BOT_TOKEN = env.str('BOT_TOKEN')
+# Адрес Telegram Bot API, для замеров и тестов без сети подменяется локальной заглушкой (benchmarks.tg_stub)
+TG_API_URL = env.str('TG_API_URL', default='https://api.telegram.org')
+# Адрес и порт HTTP-сервера метрик процесса бота (runbot), порт 0 - не запускать. По умолчанию сервер слушает только
+# локальный адрес; при BOT_METRICS_HOST=0.0.0.0 нужно задать METRICS_TOKEN
+BOT_METRICS_HOST = env.str('BOT_METRICS_HOST', default='127.0.0.1')
+BOT_METRICS_PORT = env.int('BOT_METRICS_PORT', default=9101)
 
 LOGGING: dict[str, Any] = {
     'version': 1,
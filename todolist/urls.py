@@ -2,12 +2,15 @@ from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 
+from core.views import metrics
+
 urlpatterns = [
     path('core/', include(('core.urls', 'core'))),
     path('goals/', include(('goals.urls', 'goals'))),
     path('oauth/', include('social_django.urls', namespace='social')),
     path('bot/', include(('bot.urls', 'bot'))),
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),
 ]
 
 if settings.DEBUG: